@@ -1,13 +1,15 @@
-from groq import Groq
 from datetime import datetime
-import os
-from dotenv import load_dotenv
+from bot.ai_helper.date_rules import parse_date_rules
+from bot.ai_helper.llm_gateway import get_gateway
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
+def _cache_key(input_text: str, now: datetime) -> str:
+    # Відповідь залежить від "сьогодні", тому ключ — нормалізований текст + година
+    normalized = " ".join(input_text.lower().split())
+    return f"date:{now:%Y-%m-%d %H}:{normalized}"
 
-def normalize_date_with_groq(input_text: str) -> datetime | None:
+
+async def normalize_date_with_groq(input_text: str) -> datetime | None:
     now: datetime = datetime.now()
     prompt = f"""
 Сьогодні: {now.strftime("%Y-%m-%d %H:%M")}
@@ -20,21 +22,20 @@ def normalize_date_with_groq(input_text: str) -> datetime | None:
 Поверни лише результат, без коментарів.
 """
 
-    response = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama-3.3-70b-versatile",
-        stream=False,
-    )
-
-    raw_output = response.choices[0].message.content.strip()
+    raw_output = await get_gateway().complete(prompt, cache_key=_cache_key(input_text, now))
+    if raw_output is None:
+        return None
 
     try:
-        print(datetime.strptime(raw_output, "%Y-%m-%d %H:%M"))
         return datetime.strptime(raw_output, "%Y-%m-%d %H:%M")
     except ValueError:
         print(f"⛔️ Не вдалося розпарсити дату: {raw_output}")
         return None
 
 
-test_data = "20 липня до 10:00"
-normalize_date_with_groq(test_data)
+async def normalize_date(input_text: str) -> datetime | None:
+    # Спершу локальні правила, LLM — лише якщо правила не впорались
+    parsed = parse_date_rules(input_text)
+    if parsed is not None:
+        return parsed
+    return await normalize_date_with_groq(input_text)
@@ -0,0 +1,292 @@
+# bot/ai_helper/date_rules.py
+#
+# Локальний парсер дат без звернення до LLM.
+# Розуміє укр/рос назви місяців у будь-якому відмінку, відносні дні
+# ("завтра", "через 3 дні", "у пʼятницю"), числові формати
+# ("25.07", "25.07.2025", "2025-07-25") та час з маркерами "о/до/після".
+# Якщо у тексті є хоч одне незрозуміле слово — повертаємо None,
+# і дата йде на LLM (краще зайвий запит, ніж неправильна дата).
+
+import re
+from datetime import datetime, timedelta, time
+
+DEFAULT_TIME = time(9, 0)
+
+# (основа, номер місяця) — довші основи першими
+_MONTH_STEMS = (
+    ("листоп", 11),
+    ("верес", 9),
+    ("берез", 3),
+    ("січ", 1),
+    ("лют", 2),
+    ("квіт", 4),
+    ("трав", 5),
+    ("черв", 6),
+    ("лип", 7),
+    ("серп", 8),
+    ("жовт", 10),
+    ("груд", 12),
+    ("янв", 1),
+    ("фев", 2),
+    ("мар", 3),
+    ("апр", 4),
+    ("мая", 5),
+    ("май", 5),
+    ("мае", 5),
+    ("июн", 6),
+    ("июл", 7),
+    ("авг", 8),
+    ("сен", 9),
+    ("окт", 10),
+    ("ноя", 11),
+    ("дек", 12),
+)
+
+_WEEKDAY_STEMS = (
+    ("понеділ", 0),
+    ("понедельн", 0),
+    ("вівтор", 1),
+    ("вторн", 1),
+    ("серед", 2),
+    ("сред", 2),
+    ("четвер", 3),
+    ("п'ятниц", 4),
+    ("пятниц", 4),
+    ("субот", 5),
+    ("суббот", 5),
+    ("неділ", 6),
+    ("воскресен", 6),
+)
+
+_RELATIVE_DAYS = {
+    "сьогодні": 0,
+    "сегодня": 0,
+    "завтра": 1,
+    "післязавтра": 2,
+    "послезавтра": 2,
+}
+
+_DAY_WORDS = {"день", "дні", "днів", "дня", "дней", "доби", "діб", "суток"}
+_HOUR_WORDS = {"год", "година", "годині", "годину", "годин", "ч", "час", "часа", "часов"}
+_YEAR_WORDS = {"р", "рік", "року", "г", "год", "года", "году"}
+_TIME_MARKERS = {"о", "об", "до", "після", "после", "к", "з", "с", "в", "у", "на", "близько", "около"}
+_DAYPARTS = {
+    "ранку": "am",
+    "утра": "am",
+    "вечора": "pm",
+    "вечера": "pm",
+    "дня": "day",
+    "ночі": "night",
+    "ночи": "night",
+}
+_FILLER = {"числа", "дата", "подачі", "подача", "приблизно", "орієнтовно", "ориентировочно", "не", "пізніше", "позже", "раніше", "раньше", "і", "и", "або", "или"}
+
+_TOKEN_RE = re.compile(r"\d{1,4}(?:[.:/-]\d{1,4})*|[^\W\d_]+(?:'[^\W\d_]+)?")
+_APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "`": "'", "´": "'"})
+
+_ISO_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_FULL_DATE = re.compile(r"(\d{1,2})[./-](\d{1,2})[./-](\d{2}|\d{4})")
+_SHORT_DATE = re.compile(r"(\d{1,2})[./](\d{1,2})")
+_CLOCK = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def _month(word: str) -> int | None:
+    if len(word) < 3:
+        return None
+    for stem, number in _MONTH_STEMS:
+        if word.startswith(stem):
+            return number
+    return None
+
+
+def _weekday(word: str) -> int | None:
+    for stem, number in _WEEKDAY_STEMS:
+        if word.startswith(stem):
+            return number
+    return None
+
+
+class _Parsed:
+    __slots__ = ("day", "month", "year", "hour", "minute", "daypart", "rel_days", "weekday")
+
+    def __init__(self):
+        self.day = self.month = self.year = None
+        self.hour = self.minute = None
+        self.daypart = None
+        self.rel_days = None
+        self.weekday = None
+
+    def set_date(self, day: int, month: int, year: int | None = None) -> bool:
+        if self.day is not None:
+            return False
+        self.day, self.month, self.year = day, month, year
+        return True
+
+    def set_time(self, hour: int, minute: int = 0) -> bool:
+        if self.hour is not None or hour > 24 or minute > 59:
+            return False
+        self.hour, self.minute = hour, minute
+        return True
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower().translate(_APOSTROPHES))
+
+
+def _scan(tokens: list[str]) -> _Parsed | None:
+    parsed = _Parsed()
+    i = 0
+    n = len(tokens)
+
+    while i < n:
+        token = tokens[i]
+        prev = tokens[i - 1] if i else ""
+        nxt = tokens[i + 1] if i + 1 < n else ""
+
+        if token[0].isdigit():
+            if m := _ISO_DATE.fullmatch(token):
+                ok = parsed.set_date(int(m[3]), int(m[2]), int(m[1]))
+            elif m := _FULL_DATE.fullmatch(token):
+                year = int(m[3])
+                ok = parsed.set_date(int(m[1]), int(m[2]), year + 2000 if year < 100 else year)
+            elif m := _CLOCK.fullmatch(token):
+                ok = parsed.set_time(int(m[1]), int(m[2]))
+            elif m := _SHORT_DATE.fullmatch(token):
+                # "о 9.30" — це час, "25.07" — дата
+                as_time = prev in ("о", "об") or (
+                    prev in _TIME_MARKERS and parsed.day is not None
+                )
+                if "." in token and as_time:
+                    ok = parsed.set_time(int(m[1]), int(m[2]))
+                else:
+                    ok = parsed.set_date(int(m[1]), int(m[2]))
+            elif token.isdigit():
+                value = int(token)
+                month = _month(nxt) if nxt else None
+                if month and parsed.day is None:
+                    ok = parsed.set_date(value, month)
+                    i += 1
+                    # "20 липня 2025 року"
+                    if i + 1 < n and len(tokens[i + 1]) == 4 and tokens[i + 1].isdigit():
+                        parsed.year = int(tokens[i + 1])
+                        i += 1
+                elif prev == "через" and nxt in _DAY_WORDS:
+                    if parsed.rel_days is not None:
+                        return None
+                    parsed.rel_days = value
+                    ok = True
+                    i += 1
+                elif nxt in _HOUR_WORDS or prev in _TIME_MARKERS or nxt in _DAYPARTS:
+                    ok = parsed.set_time(value)
+                else:
+                    ok = False
+            else:
+                ok = False
+            if not ok:
+                return None
+        elif token in _RELATIVE_DAYS:
+            if parsed.rel_days is not None:
+                return None
+            parsed.rel_days = _RELATIVE_DAYS[token]
+        elif token == "через":
+            # "через 2 дні" — обробляється на числі
+            if not nxt.isdigit():
+                return None
+        elif token in _DAYPARTS:
+            parsed.daypart = _DAYPARTS[token]
+        elif (wd := _weekday(token)) is not None:
+            if parsed.weekday is not None:
+                return None
+            parsed.weekday = wd
+        elif token in _TIME_MARKERS or token in _FILLER:
+            pass
+        elif token in _HOUR_WORDS or token in _YEAR_WORDS:
+            pass
+        else:
+            return None
+        i += 1
+
+    return parsed
+
+
+def _apply_daypart(hour: int, daypart: str | None) -> int:
+    if daypart == "pm" and hour < 12:
+        return hour + 12
+    # "о 2 дня" — 14:00, "об 11 дня" — 11:00
+    if daypart == "day" and hour < 7:
+        return hour + 12
+    # "об 11 ночі" — 23:00, "о 2 ночі" — 02:00
+    if daypart == "night" and 6 <= hour < 12:
+        return hour + 12
+    if daypart in ("am", "night") and hour == 12:
+        return 0
+    return hour
+
+
+def parse_date_rules(input_text: str, now: datetime | None = None) -> datetime | None:
+    now = now or datetime.now()
+    tokens = _tokenize(input_text)
+    if not tokens:
+        return None
+
+    parsed = _scan(tokens)
+    if parsed is None:
+        return None
+
+    anchors = sum(x is not None for x in (parsed.day, parsed.rel_days, parsed.weekday))
+    if anchors > 1:
+        return None
+
+    # "до 24:00" — кінець дня, тобто 00:00 наступного
+    midnight = timedelta(0)
+    if parsed.hour is not None:
+        hour = _apply_daypart(parsed.hour, parsed.daypart)
+        if hour == 24:
+            hour, midnight = 0, timedelta(days=1)
+        at = time(hour, parsed.minute or 0)
+    else:
+        at = None
+
+    try:
+        if parsed.day is not None:
+            year = parsed.year or now.year
+            result = datetime.combine(
+                datetime(year, parsed.month, parsed.day).date(), at or DEFAULT_TIME
+            ) + midnight
+            if result < now:
+                if parsed.year is not None:
+                    return None
+                # Правило "не в минулому": переносимо на наступний рік
+                result = datetime.combine(
+                    datetime(year + 1, parsed.month, parsed.day).date(), at or DEFAULT_TIME
+                ) + midnight
+            return result
+
+        if parsed.rel_days is not None:
+            day = now.date() + timedelta(days=parsed.rel_days)
+            if at is None:
+                if parsed.rel_days == 0:
+                    # "сьогодні" без часу — найближча повна година
+                    return now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+                at = DEFAULT_TIME
+            result = datetime.combine(day, at) + midnight
+            return result if result >= now else None
+
+        if parsed.weekday is not None:
+            days_ahead = (parsed.weekday - now.weekday()) % 7
+            result = datetime.combine(
+                now.date() + timedelta(days=days_ahead), at or DEFAULT_TIME
+            ) + midnight
+            if result <= now:
+                result += timedelta(days=7)
+            return result
+
+        if at is not None:
+            result = datetime.combine(now.date(), at) + midnight
+            if result <= now:
+                result += timedelta(days=1)
+            return result
+    except ValueError:
+        return None
+
+    return None
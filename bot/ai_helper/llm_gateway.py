@@ -0,0 +1,235 @@
+# bot/ai_helper/llm_gateway.py
+#
+# Єдина точка для всіх запитів до Groq.
+# - обмеження кількості одночасних запитів (семафор)
+# - таймаут на кожен виклик
+# - circuit breaker: після серії помилок перестаємо ходити в мережу на якийсь час
+# - однакові запити, що вже в дорозі, об'єднуються в один
+# - TTL-кеш результатів
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from bot import config
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# результат запиту, лідера якого скасували: ті, хто до нього приєднався, питають знову
+_ABANDONED = object()
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError
+        if state == "half_open":
+            # у напіввідкритому стані пропускаємо лише один пробний запит
+            if self._trial_in_flight:
+                raise CircuitOpenError
+            self._trial_in_flight = True
+
+    def on_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def on_cancel(self):
+        # запит скасували ззовні — про upstream нічого не дізнались, але пробний слот звільняємо
+        self._trial_in_flight = False
+
+    def on_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class TTLCache:
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        client: "AsyncGroq | None" = None,
+        model: str | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        cache_ttl: float | None = None,
+        cache_size: int | None = None,
+        breaker_threshold: int | None = None,
+        breaker_reset: float | None = None,
+    ):
+        self._client = client
+        self.model = model or config.GROQ_MODEL
+        self.timeout = timeout if timeout is not None else config.LLM_TIMEOUT
+        self._semaphore = asyncio.Semaphore(max_concurrency or config.LLM_MAX_CONCURRENCY)
+        self.cache = TTLCache(
+            cache_ttl if cache_ttl is not None else config.LLM_CACHE_TTL,
+            cache_size or config.LLM_CACHE_SIZE,
+        )
+        self.breaker = CircuitBreaker(
+            breaker_threshold or config.LLM_BREAKER_THRESHOLD,
+            breaker_reset if breaker_reset is not None else config.LLM_BREAKER_RESET,
+        )
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.stats = {
+            "calls": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "upstream": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "rejected": 0,
+        }
+
+    @property
+    def client(self) -> "AsyncGroq":
+        if self._client is None:
+            # groq тягне httpx/anyio/pydantic-моделі (~0.1 с) — імпортуємо при першому запиті
+            from groq import AsyncGroq
+
+            self._client = AsyncGroq(
+                api_key=config.GROQ_API_KEY,
+                base_url=config.GROQ_BASE_URL,
+                max_retries=0,
+            )
+        return self._client
+
+    async def complete(self, prompt: str, cache_key: str | None = None) -> str | None:
+        # None — якщо LLM недоступна (таймаут, помилка, відкритий breaker)
+        self.stats["calls"] += 1
+        key = cache_key or prompt
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            result = await asyncio.shield(pending)
+            if result is not _ABANDONED:
+                return result
+            # лідера скасували — питаємо самі, а не падаємо разом з ним
+            return await self.complete(prompt, cache_key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._call(prompt)
+            if result is not None:
+                self.cache.set(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # cancel() підняв би CancelledError у всіх, хто чекає на цей запит
+            future.set_result(_ABANDONED)
+            raise
+        except Exception:
+            # ті, хто чекає на цей запит, не повинні зависнути назавжди
+            future.set_result(None)
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _call(self, prompt: str) -> str | None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.stats["rejected"] += 1
+            return None
+
+        try:
+            async with self._semaphore:
+                self.stats["upstream"] += 1
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        messages=[{"role": "user", "content": prompt}],
+                        model=self.model,
+                        stream=False,
+                    ),
+                    timeout=self.timeout,
+                )
+            # порожня чи зламана відповідь — така сама відмова, як і помилка запиту
+            content = response.choices[0].message.content.strip()
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self.breaker.on_failure()
+            return None
+        except asyncio.CancelledError:
+            # інакше скасований пробний запит лишив би breaker напіввідкритим назавжди
+            self.breaker.on_cancel()
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.breaker.on_failure()
+            print(f"⛔️ Помилка LLM: {e!r}")
+            return None
+
+        self.breaker.on_success()
+        return content
+
+
+_gateway: LLMGateway | None = None
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
+
+
+def set_gateway(gateway: LLMGateway | None):
+    # для бенчмарків і stub-сервера
+    global _gateway
+    _gateway = gateway
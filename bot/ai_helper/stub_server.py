@@ -0,0 +1,108 @@
+# bot/ai_helper/stub_server.py
+#
+# Локальний stub, що говорить Groq/OpenAI chat API — для навантажувальних тестів
+# без мережі та без витрат токенів.
+# Запуск: python -m bot.ai_helper.stub_server --port 8090 --latency 300
+# Потім: GROQ_BASE_URL=http://127.0.0.1:8090 GROQ_API_KEY=stub python main.py
+
+import argparse
+import asyncio
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from bot.ai_helper.date_rules import parse_date_rules
+
+_TODAY_RE = re.compile(r"Сьогодні: (\d{4}-\d{2}-\d{2} \d{2}:\d{2})")
+_INPUT_RE = re.compile(r'Введена дата: "(.*)"')
+
+
+def _answer(prompt: str) -> str:
+    today = _TODAY_RE.search(prompt)
+    text = _INPUT_RE.search(prompt)
+    now = datetime.strptime(today[1], "%Y-%m-%d %H:%M") if today else datetime.now()
+    parsed = parse_date_rules(text[1], now) if text else None
+    if parsed is None:
+        # на нерозпізнане відповідаємо "завтра о 9:00", як зробила б модель
+        parsed = (now + timedelta(days=1)).replace(hour=9, minute=0)
+    return parsed.strftime("%Y-%m-%d %H:%M")
+
+
+def create_app(latency: float = 0.3, jitter: float = 0.1, error_rate: float = 0.0) -> web.Application:
+    app = web.Application()
+    app["requests"] = 0
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        app["requests"] += 1
+        body = await request.json()
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+        if error_rate and random.random() < error_rate:
+            return web.json_response(
+                {"error": {"message": "stub overloaded", "type": "server_error"}},
+                status=503,
+            )
+
+        prompt = body["messages"][-1]["content"]
+        content = _answer(prompt)
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": 2,
+                    "total_tokens": len(prompt.split()) + 2,
+                },
+            }
+        )
+
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+class InProcessStubClient:
+    # те саме без HTTP: підставляється в LLMGateway(client=...) замість AsyncGroq
+    def __init__(self, latency: float = 0.3, jitter: float = 0.1):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, messages: list[dict], model: str = "stub", stream: bool = False, **kwargs):
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        content = _answer(messages[-1]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=300, help="мс")
+    parser.add_argument("--jitter", type=float, default=100, help="мс")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency / 1000, args.jitter / 1000, args.error_rate)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bot/benchmarks/broadcast_bench.py
+#
+# Розсилка на N перевізників через фейкову сесію Telegram:
+# старий послідовний цикл vs Broadcaster.
+# Запуск: python -m bot.benchmarks.broadcast_bench --carriers 300 --latency 50
+
+import argparse
+import asyncio
+import random
+import time
+
+from aiogram.exceptions import TelegramAPIError
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot
+from bot.services.broadcast import Broadcaster, OutgoingMessage
+
+TEXT = "📦 <b>Нова заявка на перевезення:</b>\nМаршрут: Київ → Львів"
+
+
+async def sequential(bot, chat_ids: list[int]) -> tuple[int, float, str | None]:
+    sent = 0
+    started = time.perf_counter()
+    try:
+        for chat_id in chat_ids:
+            await bot.send_message(chat_id, TEXT)
+            sent += 1
+    except TelegramAPIError as e:
+        return sent, time.perf_counter() - started, type(e).__name__
+    return sent, time.perf_counter() - started, None
+
+
+async def run(args):
+    chat_ids = list(range(1_000_000, 1_000_000 + args.carriers))
+    blocked = set(random.sample(chat_ids, int(len(chat_ids) * args.blocked)))
+
+    session = FakeTelegramSession(
+        latency=args.latency / 1000, random_429=args.random_429, blocked=blocked
+    )
+    bot = make_bot(session)
+
+    sent, elapsed, error = await sequential(bot, chat_ids)
+    print(f"Послідовно:  {sent}/{len(chat_ids)} за {elapsed:.2f} с"
+          + (f", зупинились на {error}" if error else ""))
+
+    await asyncio.sleep(1.1)
+    session.reset()
+    broadcaster = Broadcaster(bot, workers=args.workers)
+    stats = await broadcaster.broadcast([OutgoingMessage(chat_id, TEXT) for chat_id in chat_ids])
+    print(f"Broadcaster: {stats}")
+    print(f"  викликів API: {sum(session.calls.values())}, відповідей з помилкою: {dict(session.errors)}")
+
+    await bot.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=50, help="мс на запит")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--blocked", type=float, default=0.05, help="частка, що заблокувала бота")
+    parser.add_argument("--random-429", type=float, default=0.01)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
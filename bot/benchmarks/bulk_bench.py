@@ -0,0 +1,77 @@
+# bot/benchmarks/bulk_bench.py
+#
+# Рядків/с для масового імпорту/експорту (bot/models/scripts/bulk.py) по бекендах:
+# SQLite (тимчасовий файл) і Postgres (--pg-url, COPY через asyncpg).
+# Для порівняння — вставка тих самих рядків через ORM session.add_all.
+# Запуск: python -m bot.benchmarks.bulk_bench [--rows 200000] [--pg-url postgresql://...]
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.models import Carrier, Shipment_request
+from bot.models.scripts.bulk import TABLES, count_rows, export_rows, import_rows
+from bot.models.scripts.fake_data import FakeData
+
+
+class _Null:
+    def write(self, _):
+        pass
+
+
+async def run_backend(name: str, url: str, rows: int, chunk_size: int, orm_rows: int):
+    engine = make_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"▶️ {name}")
+    for table in ("carriers", "shipment_request"):
+        started = time.perf_counter()
+        count = await import_rows(engine, TABLES[table], FakeData(1).rows(table, rows), chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"    імпорт {table:<17} {count / elapsed:>10,.0f} рядків/с")
+
+        started = time.perf_counter()
+        count = await export_rows(engine, TABLES[table], _Null(), "jsonl", chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"    експорт {table:<16} {count / elapsed:>10,.0f} рядків/с")
+
+    # ORM-базова лінія: так працював create_fake_request.py
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    started = time.perf_counter()
+    async with sessionmaker() as session:
+        for row in FakeData(2).requests(orm_rows, first_telegram_id=900_000_000):
+            session.add(Shipment_request(**row))
+        await session.commit()
+    elapsed = time.perf_counter() - started
+    print(f"    ORM add_all shipment_request   {orm_rows / elapsed:>10,.0f} рядків/с")
+    print(f"    разом у БД: {await count_rows(engine, Carrier.__table__):,} перевізників, "
+          f"{await count_rows(engine, Shipment_request.__table__):,} заявок")
+    await engine.dispose()
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_bulk_bench_")
+    await run_backend("sqlite", f"sqlite+aiosqlite:///{tmp}/bulk.db", args.rows, args.chunk_size, args.orm_rows)
+    if args.pg_url:
+        await run_backend("postgres", args.pg_url, args.rows, args.chunk_size, args.orm_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--orm-rows", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--pg-url", default=os.getenv("DB_BENCH_PG_URL"))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# bot/benchmarks/capacity_bench.py
+#
+# Підбір заявок під місткість авто на --rows заявок:
+# - як було: прочитати рядки volume/weight і розібрати їх у Python;
+# - як стало: діапазонний запит по weight_kg/volume_m3/pallets з індексами.
+# Плюс швидкість розбору колонки: парсер на кожен рядок проти parse_batch,
+# і бекфіл міграції 0003 на тих самих даних.
+# Запуск: python -m bot.benchmarks.capacity_bench [--rows 200000]
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.database.migrations import _0003_typed_units
+from bot.models import Shipment_request
+from bot.models.scripts.bulk import TABLES, import_rows
+from bot.models.scripts.fake_data import FakeData
+from bot.services.capacity import loads_within
+from bot.services.units import parse_batch, parse_volume, parse_weight
+
+# під 10-тонник підходить більшість заявок, під бус — одиниці
+TRUCKS = {
+    "10-тонник": {"max_kg": 10_000, "max_pallets": 18},
+    "бус 1.5 т": {"max_kg": 1_500, "max_pallets": 4},
+}
+
+
+def best_of(rounds: int, fn):
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def abest_of(rounds: int, fn):
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_capacity_bench_")
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp}/capacity.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await import_rows(engine, TABLES["shipment_request"], FakeData(3).requests(args.rows))
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    weights = [f"{w / 10:.1f} т" for w in range(1, 250)] * (args.rows // 249 + 1)
+    weights = weights[: args.rows]
+    per_row, _ = best_of(args.rounds, lambda: [parse_weight(w) for w in weights])
+    batch, _ = best_of(args.rounds, lambda: parse_batch(weights, parse_weight))
+    print(f"розбір колонки ваги:   по рядку {args.rows / per_row:>12,.0f} рядків/с, "
+          f"parse_batch {args.rows / batch:>12,.0f} рядків/с ({per_row / batch:.1f}×)")
+
+    async def scan(truck):
+        # старий шлях: тягнемо сирі рядки й фільтруємо в Python
+        async with sessionmaker() as session:
+            rows = await session.execute(
+                select(Shipment_request.id, Shipment_request.weight, Shipment_request.volume)
+            )
+            found = []
+            for row_id, weight, volume in rows:
+                kg, pallets = parse_weight(weight), parse_volume(volume).pallets
+                if kg is not None and kg <= truck["max_kg"] and pallets is not None and pallets <= truck["max_pallets"]:
+                    found.append(row_id)
+            return sorted(found, reverse=True)[: args.limit]
+
+    async def indexed(truck):
+        async with sessionmaker() as session:
+            return [r.id for r in await loads_within(session, **truck, limit=args.limit)]
+
+    ok = True
+    for name, truck in TRUCKS.items():
+        scan_time, scanned = await abest_of(args.rounds, lambda: scan(truck))
+        index_time, loads = await abest_of(args.rounds, lambda: indexed(truck))
+        ok = ok and loads == scanned
+        async with engine.connect() as conn:
+            plan = await conn.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM shipment_request "
+                    "WHERE weight_kg <= :kg AND pallets <= :p ORDER BY id DESC LIMIT :n"
+                ),
+                {"kg": truck["max_kg"], "p": truck["max_pallets"], "n": args.limit},
+            )
+            plan = "; ".join(row[-1] for row in plan)
+        print(f"заявки під {name:<10} скан+розбір {scan_time * 1000:8.1f} мс, "
+              f"діапазонний запит {index_time * 1000:8.2f} мс ({scan_time / index_time:.0f}×)  [{plan}]")
+
+    async with engine.begin() as conn:
+        await conn.execute(update(Shipment_request).values(weight_kg=None, volume_m3=None, pallets=None))
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(_0003_typed_units)
+    elapsed = time.perf_counter() - started
+    print(f"бекфіл міграції 0003:  {args.rows / elapsed:>12,.0f} рядків/с")
+
+    print("✅ результати збігаються" if ok else "⛔️ результати розходяться")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# bot/benchmarks/claim_bench.py
+#
+# Шквал «Прийняти рейс»: на кожну з --requests заявок --carriers перевізників
+# одночасно викликають claim_request (bot/services/claims.py), кожен у своїй сесії.
+# Перевіряє:
+# - рівно один переможець на заявку, решта — "taken", у БД — саме переможець;
+# - повторне натискання переможця — "repeat", без другого запису;
+# - після розсилки edit-ів кожен, хто отримав картку, крім переможця,
+#   бачить її відредагованою на "рейс взято" рівно раз.
+# Міряє латентність claim (p50/p95/p99/max) під конкуренцією.
+# Запуск: python -m bot.benchmarks.claim_bench --carriers 300 --requests 20
+#         DATABASE_URL=postgresql://... python -m bot.benchmarks.claim_bench
+# (БД — DATABASE_URL, за замовчуванням тимчасовий SQLite-файл)
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_claim_bench.db",
+)
+os.environ.setdefault("DB_SLOW_QUERY_SAMPLE", "0")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.database.database import Base, async_session, engine  # noqa: E402
+from bot.database.engine import pool_metrics  # noqa: E402
+from bot.database.migrations import upgrade  # noqa: E402
+from bot.geo.routes import route_key  # noqa: E402
+from bot.models import Carrier, NotificationOutbox, Shipment_request  # noqa: E402
+from bot.services.broadcast import ChatLimiter, TokenBucket, get_broadcaster  # noqa: E402
+from bot.services.claims import REPEAT, TAKEN, WON, claim_request  # noqa: E402
+from bot.services.notifier import notify_carriers  # noqa: E402
+from bot.services.outbox import OutboxDispatcher  # noqa: E402
+
+ROUTE = "Київ → Львів"
+FIRST_CARRIER = 1_000_000
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def reset_db(carriers: int, requests: int) -> list[int]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+    async with async_session() as session:
+        await session.execute(
+            insert(Carrier),
+            [
+                {
+                    "telegram_id": FIRST_CARRIER + i,
+                    "full_name": f"Перевізник {i}",
+                    "phone": "+380",
+                    "route": ROUTE,
+                    "route_key": route_key(ROUTE),
+                }
+                for i in range(carriers)
+            ],
+        )
+        ids = []
+        for i in range(requests):
+            request = Shipment_request(
+                client_telegram_id=500_000,
+                route=ROUTE,
+                date=datetime.now() + timedelta(days=3),
+                cargo_type="Побутова техніка",
+                volume="6 палет",
+                weight="2.2 т",
+                loading="рампа",
+                unloading="ручне",
+                price=8000,
+            )
+            session.add(request)
+            await notify_carriers(session, request)
+            ids.append(request.id)
+        await session.commit()
+    return ids
+
+
+async def drain(dispatcher: OutboxDispatcher):
+    while await dispatcher.drain_once():
+        pass
+
+
+async def storm(request_id: int, carriers: int, latencies: list[float]) -> Counter:
+    start = asyncio.Event()
+
+    async def tap(carrier_id: int):
+        await start.wait()
+        started = time.perf_counter()
+        async with async_session() as session:
+            result = await claim_request(session, request_id, carrier_id)
+        latencies.append(time.perf_counter() - started)
+        return carrier_id, result.outcome
+
+    tasks = [asyncio.create_task(tap(FIRST_CARRIER + i)) for i in range(carriers)]
+    await asyncio.sleep(0)
+    start.set()
+    return Counter(dict(await asyncio.gather(*tasks)))
+
+
+async def run(args) -> bool:
+    print(f"▶️ {engine.dialect.name}: {args.requests} заявок × {args.carriers} перевізників")
+    request_ids = await reset_db(args.carriers, args.requests)
+
+    telegram = FakeTelegramSession(latency=0, jitter=0, global_rate=None, per_chat_interval=None)
+    bot = make_bot(telegram)
+    broadcaster = get_broadcaster(bot)
+    broadcaster.bucket = TokenBucket(rate=1_000_000)
+    broadcaster.chat_limiter = ChatLimiter(interval=0)
+    broadcaster.workers = 64
+    dispatcher = OutboxDispatcher(bot, batch_size=1000)
+    await drain(dispatcher)
+    cards = telegram.calls["sendMessage"]
+
+    latencies: list[float] = []
+    violations = []
+    winners = {}
+    started = time.perf_counter()
+    for request_id in request_ids:
+        outcomes = await storm(request_id, args.carriers, latencies)
+        won = [carrier for carrier, outcome in outcomes.items() if outcome == WON]
+        lost = sum(1 for outcome in outcomes.values() if outcome == TAKEN)
+        if len(won) != 1 or lost != args.carriers - 1:
+            violations.append(f"заявка {request_id}: переможців {len(won)}, програли {lost}")
+            continue
+        winners[request_id] = won[0]
+    elapsed = time.perf_counter() - started
+
+    # повторні натискання переможців — ідемпотентні
+    for request_id, carrier in winners.items():
+        async with async_session() as session:
+            if (await claim_request(session, request_id, carrier)).outcome != REPEAT:
+                violations.append(f"заявка {request_id}: повтор переможця не впізнано")
+
+    async with async_session() as session:
+        stored = dict(
+            (await session.execute(select(Shipment_request.id, Shipment_request.carrier_telegram_id))).all()
+        )
+        versions = set(await session.scalars(select(Shipment_request.version)))
+    for request_id, carrier in winners.items():
+        if stored.get(request_id) != carrier:
+            violations.append(f"заявка {request_id}: у БД {stored.get(request_id)}, переміг {carrier}")
+    if versions != {2}:
+        violations.append(f"версії заявок {versions}, очікувалась 2 (рівно один успішний UPDATE)")
+
+    telegram.reset()
+    await drain(dispatcher)
+    edits = Counter(chat_id for _, chat_id, method in telegram.sent if method == "editMessageText")
+    expected_edits = cards - len(winners)
+    if sum(edits.values()) != expected_edits:
+        violations.append(f"редагувань {sum(edits.values())}, очікувалось {expected_edits}")
+    wins = Counter(winners.values())
+    for i in range(args.carriers):
+        chat_id = FIRST_CARRIER + i
+        if edits[chat_id] != len(winners) - wins[chat_id]:
+            violations.append(f"перевізник {chat_id}: редагувань {edits[chat_id]}, очікувалось {len(winners) - wins[chat_id]}")
+            break
+    async with async_session() as session:
+        leftover = await session.scalar(
+            select(func.count()).select_from(NotificationOutbox).where(NotificationOutbox.status == "pending")
+        )
+    if leftover:
+        violations.append(f"у outbox лишилось {leftover} pending")
+
+    db = pool_metrics(engine).snapshot()
+    total = len(latencies)
+    print(f"   claim: {total:,} натискань за {elapsed:.2f} с ({total / elapsed:,.0f}/с)")
+    print(
+        f"   латентність p50 {percentile(latencies, 0.5) * 1000:.2f}  p95 {percentile(latencies, 0.95) * 1000:.2f}  "
+        f"p99 {percentile(latencies, 0.99) * 1000:.2f}  max {max(latencies) * 1000:.2f} мс"
+    )
+    print(
+        f"   пул: пік з'єднань {db['peak_in_use']}, очікування макс {db['wait_max_ms']:.1f} мс; "
+        f"карток {cards}, редагувань «рейс взято» {sum(edits.values())}"
+    )
+    for violation in violations[:10]:
+        print(f"   ⛔️ {violation}")
+    print("✅ рівно один переможець на кожну заявку" if not violations else f"⛔️ порушень: {len(violations)}")
+    await bot.session.close()
+    await engine.dispose()
+    return not violations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=20)
+    ok = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bot/benchmarks/corridor_bench.py
+#
+# Пошук перевізників, чий коридор проходить повз pickup і dropoff заявки,
+# на синтетичних даних 1k/10k/100k перевізників.
+# Звіряє результат з повним перебором і міряє латентність запиту.
+# Запуск: python -m bot.benchmarks.corridor_bench [--scales 1000 10000 100000]
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from bot.geo.corridors import CorridorIndex, _distance_to_segment, project
+from bot.geo.gazetteer import get_gazetteer
+
+
+def brute_force(segments, pickup, dropoff, radius):
+    px, py = project(*pickup)
+    dx, dy = project(*dropoff)
+    result = []
+    for carrier_id, (a, b) in segments.items():
+        ax, ay = project(*a)
+        bx, by = project(*b)
+        dist_p, t_p = _distance_to_segment(px, py, ax, ay, bx, by)
+        dist_d, t_d = _distance_to_segment(dx, dy, ax, ay, bx, by)
+        if dist_p <= radius and dist_d <= radius and t_p <= t_d:
+            result.append(carrier_id)
+    return result
+
+
+def run_scale(n: int, queries: int, radius: float, cities: list) -> bool:
+    rng = random.Random(n)
+    segments = {}
+    for carrier_id in range(n):
+        a, b = rng.sample(cities, 2)
+        segments[carrier_id] = (a, b)
+
+    index = CorridorIndex(buffer_km=radius)
+    started = time.perf_counter()
+    for carrier_id, (a, b) in segments.items():
+        index.add(carrier_id, a, b)
+    index.freeze()
+    build = time.perf_counter() - started
+
+    requests = [tuple(rng.sample(cities, 2)) for _ in range(queries)]
+    latencies = []
+    matched = 0
+    for pickup, dropoff in requests:
+        started = time.perf_counter()
+        result = index.match(pickup, dropoff)
+        latencies.append(time.perf_counter() - started)
+        matched += len(result)
+
+    ok = True
+    for pickup, dropoff in requests[:20]:
+        if sorted(index.match(pickup, dropoff)) != sorted(brute_force(segments, pickup, dropoff, radius)):
+            ok = False
+
+    brute_started = time.perf_counter()
+    for pickup, dropoff in requests[:5]:
+        brute_force(segments, pickup, dropoff, radius)
+    brute = (time.perf_counter() - brute_started) / 5
+
+    latencies.sort()
+    print(
+        f"{n:>7} перевізників: побудова {build:.2f} с, "
+        f"запит p50 {statistics.median(latencies) * 1e6:.0f} мкс / "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} мкс, "
+        f"перебір {brute * 1e3:.1f} мс, "
+        f"в середньому {matched / queries:.0f} збігів, "
+        f"{'✅ збігається з перебором' if ok else '⛔️ розбіжність з перебором'}"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--radius", type=float, default=70)
+    args = parser.parse_args()
+
+    cities = [(lat, lon) for _, lat, lon in get_gazetteer()]
+    ok = all(run_scale(n, args.queries, args.radius, cities) for n in args.scales)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bot/benchmarks/date_parser_bench.py
+#
+# Точність і швидкість локального парсера дат на корпусі реальних введень.
+# Запуск: python -m bot.benchmarks.date_parser_bench [--corpus path] [--repeat N]
+# Код виходу 1, якщо парсер повернув неправильну дату хоча б для одного рядка.
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bot.ai_helper.date_rules import parse_date_rules
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "date_corpus.jsonl"
+FMT = "%Y-%m-%d %H:%M"
+
+
+def load_corpus(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    resolved = correct = 0
+    wrong = []
+
+    for row in corpus:
+        now = datetime.strptime(row["now"], FMT)
+        result = parse_date_rules(row["text"], now)
+        expected = row["expected"]
+        if result is None:
+            continue
+        resolved += 1
+        if expected is not None and result.strftime(FMT) == expected:
+            correct += 1
+        else:
+            wrong.append((row["text"], expected, result.strftime(FMT)))
+
+    inputs = [(row["text"], datetime.strptime(row["now"], FMT)) for row in corpus]
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for text, now in inputs:
+            parse_date_rules(text, now)
+    elapsed = time.perf_counter() - started
+    per_call_us = elapsed / (args.repeat * len(inputs)) * 1e6
+
+    total = len(corpus)
+    print(f"Рядків у корпусі:      {total}")
+    print(f"Розпізнано локально:   {resolved} ({resolved / total:.1%}) — без запиту до LLM")
+    print(f"Пішло б на LLM:        {total - resolved}")
+    print(f"Точність локальних:    {correct}/{resolved}")
+    print(f"Середній час розбору:  {per_call_us:.1f} мкс")
+
+    for text, expected, got in wrong:
+        print(f"⛔️ {text!r}: очікували {expected}, отримали {got}")
+
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
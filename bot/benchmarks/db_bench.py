@@ -0,0 +1,117 @@
+# bot/benchmarks/db_bench.py
+#
+# Мікробенчмарк БД по профілях двигуна: вставки по одному рядку з комітом
+# (як у хендлерах), пакетна вставка, вибірка за ключем — послідовно і з
+# --concurrency паралельними задачами. Поруч — метрики пулу (очікування
+# з'єднання, пік використання).
+# Профілі: sqlite-default (create_async_engine без тюнінгу),
+# sqlite-tuned (make_engine: WAL, NORMAL, mmap), postgres (якщо задано --pg-url).
+# Запуск: python -m bot.benchmarks.db_bench [--rows 2000] [--pg-url postgresql://...]
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import BigInteger, Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from bot.database.engine import make_engine, pool_metrics
+
+metadata = MetaData()
+bench_kv = Table(
+    "bench_kv",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("telegram_id", BigInteger, index=True),
+    Column("route", String(128)),
+)
+
+
+async def timed(label: str, ops: int, coro) -> float:
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    print(f"    {label:<34} {ops / elapsed:>10,.0f} оп./с")
+    return elapsed
+
+
+async def run_profile(name: str, engine, rows: int, concurrency: int):
+    print(f"▶️ {name}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+    async def insert_one(i: int):
+        async with engine.begin() as conn:
+            await conn.execute(insert(bench_kv).values(telegram_id=i, route="kyiv:lviv"))
+
+    async def inserts(start: int, count: int):
+        for i in range(start, start + count):
+            await insert_one(i)
+
+    async def select_one(i: int):
+        async with engine.connect() as conn:
+            await conn.execute(select(bench_kv.c.route).where(bench_kv.c.telegram_id == i))
+
+    async def selects(count: int):
+        for _ in range(count):
+            await select_one(random.randrange(rows))
+
+    async def bulk():
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(bench_kv),
+                [{"telegram_id": rows * 10 + i, "route": "odesa:dnipro"} for i in range(rows * 10)],
+            )
+
+    per_task = rows // concurrency
+    await timed("вставка + commit, послідовно", rows, inserts(0, rows))
+    await timed(
+        f"вставка + commit, {concurrency} задач",
+        per_task * concurrency,
+        asyncio.gather(*(inserts(rows + t * per_task, per_task) for t in range(concurrency))),
+    )
+    await timed("пакетна вставка (executemany)", rows * 10, bulk())
+    await timed("select за індексом, послідовно", rows, selects(rows))
+    await timed(
+        f"select за індексом, {concurrency} задач",
+        per_task * concurrency,
+        asyncio.gather(*(selects(per_task) for _ in range(concurrency))),
+    )
+    try:
+        m = pool_metrics(engine).snapshot()
+        print(
+            f"    пул: видач {m['checkouts']}, пік {m['peak_in_use']}, "
+            f"очікування сер. {m['wait_avg_ms']:.2f} мс / макс {m['wait_max_ms']:.1f} мс, "
+            f"таймаутів {m['timeouts']}, повільних запитів {m['slow_queries']}"
+        )
+    except KeyError:
+        pass
+    await engine.dispose()
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_db_bench_")
+    profiles = [
+        ("sqlite-default", create_async_engine(f"sqlite+aiosqlite:///{tmp}/default.db")),
+        ("sqlite-tuned", make_engine(f"sqlite+aiosqlite:///{tmp}/tuned.db")),
+    ]
+    if args.pg_url:
+        profiles.append(("postgres", make_engine(args.pg_url)))
+    for name, engine in profiles:
+        await run_profile(name, engine, args.rows, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pg-url", default=os.getenv("DB_BENCH_PG_URL"))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# bot/benchmarks/digest_sim.py
+#
+# Симуляція зведень (bot/services/digest.py) на сплесках заявок: --carriers
+# перевізників на одному маршруті, заявки приходять пачками (сплеск — від
+# --burst-min до --burst-max заявок за хвилину, сплески — пуассонівський
+# потік --bursts-per-hour). Справжній OutboxDispatcher на SQLite і фейковий
+# Telegram, час — віртуальний (крок OUTBOX_POLL_INTERVAL), тож година
+# трафіку проганяється за секунди.
+# Порівнює виклики Bot API без зведень (картка на заявку × перевізника) і з
+# ними (≈ перевізники × вікна), перевіряє, що кожна заявка потрапила в
+# зведення кожного перевізника і жоден рядок outbox не лишився в черзі.
+# Запуск: python -m bot.benchmarks.digest_sim [--carriers 200] [--minutes 120]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_digest_sim.db",
+)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from bot import config  # noqa: E402
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.database.database import Base, async_session, engine  # noqa: E402
+from bot.database.migrations import upgrade  # noqa: E402
+from bot.geo.routes import route_key  # noqa: E402
+from bot.models import Carrier, NotificationDigest, NotificationOutbox, Shipment_request  # noqa: E402
+from bot.services.broadcast import ChatLimiter, TokenBucket, get_broadcaster  # noqa: E402
+from bot.services.digest import parse_ids  # noqa: E402
+from bot.services.notifier import notify_carriers  # noqa: E402
+from bot.services.outbox import OutboxDispatcher  # noqa: E402
+
+ROUTE = "Київ → Львів"
+
+
+def arrivals(args, start: datetime) -> list[datetime]:
+    # моменти появи заявок: сплески по хвилині, між ними — тиша
+    rng = random.Random(args.seed)
+    times = []
+    t = rng.expovariate(args.bursts_per_hour / 3600)
+    while t < args.minutes * 60:
+        for _ in range(rng.randint(args.burst_min, args.burst_max)):
+            times.append(start + timedelta(seconds=t + rng.uniform(0, 60)))
+        t += 60 + rng.expovariate(args.bursts_per_hour / 3600)
+    return sorted(times)
+
+
+async def reset_db(carriers: int, digest: bool):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+    async with async_session() as session:
+        await session.execute(
+            insert(Carrier),
+            [
+                {
+                    "telegram_id": 1_000_000 + i,
+                    "full_name": f"Перевізник {i}",
+                    "phone": "+380",
+                    "route": ROUTE,
+                    "route_key": route_key(ROUTE),
+                    "digest_mode": digest,
+                }
+                for i in range(carriers)
+            ],
+        )
+        await session.commit()
+
+
+async def simulate(args, times: list[datetime], start: datetime, digest: bool) -> dict:
+    await reset_db(args.carriers, digest)
+    telegram = FakeTelegramSession(latency=0, jitter=0, global_rate=None, per_chat_interval=None)
+    bot = make_bot(telegram)
+    broadcaster = get_broadcaster(bot)
+    broadcaster.bucket = TokenBucket(rate=1_000_000)
+    broadcaster.chat_limiter = ChatLimiter(interval=0)
+    broadcaster.workers = 64
+    dispatcher = OutboxDispatcher(bot, batch_size=args.batch)
+
+    step = timedelta(seconds=config.OUTBOX_POLL_INTERVAL)
+    end = start + timedelta(minutes=args.minutes) + timedelta(seconds=config.DIGEST_WINDOW + config.DIGEST_EDIT_INTERVAL)
+    now, i = start, 0
+    started = time.perf_counter()
+    while now <= end:
+        if i < len(times) and times[i] <= now:
+            async with async_session() as session:
+                while i < len(times) and times[i] <= now:
+                    request = Shipment_request(
+                        client_telegram_id=500_000 + i,
+                        route=ROUTE,
+                        date=times[i] + timedelta(days=3),
+                        cargo_type="Побутова техніка",
+                        volume="6 палет",
+                        weight="2.2 т",
+                        loading="рампа",
+                        unloading="ручне",
+                        price=8000 + i,
+                    )
+                    session.add(request)
+                    await notify_carriers(session, request)
+                    i += 1
+                await session.commit()
+        while await dispatcher.drain_once(now):
+            pass
+        now += step
+    elapsed = time.perf_counter() - started
+
+    async with async_session() as session:
+        pending = await session.scalar(
+            select(func.count()).select_from(NotificationOutbox).where(NotificationOutbox.status == "pending")
+        )
+        digests = (await session.execute(select(NotificationDigest.chat_id, NotificationDigest.request_ids))).all()
+        all_ids = set(await session.scalars(select(Shipment_request.id)))
+    covered: dict[int, set[int]] = {}
+    for chat_id, ids in digests:
+        covered.setdefault(chat_id, set()).update(parse_ids(ids))
+    complete = all(covered.get(1_000_000 + c) == all_ids for c in range(args.carriers)) if digest else True
+
+    await bot.session.close()
+    return {
+        "send": telegram.calls["sendMessage"],
+        "edit": telegram.calls["editMessageText"],
+        "digests": len(digests),
+        "pending": pending,
+        "complete": complete,
+        "elapsed": elapsed,
+    }
+
+
+async def run(args) -> bool:
+    start = datetime.now().replace(microsecond=0)
+    times = arrivals(args, start)
+    print(f"▶️ {len(times)} заявок за {args.minutes} хв сплесками по {args.burst_min}–{args.burst_max}, "
+          f"{args.carriers} перевізників на маршруті; вікно {config.DIGEST_WINDOW:.0f} с, "
+          f"редагування не частіше ніж раз на {config.DIGEST_EDIT_INTERVAL:.0f} с")
+
+    ok = True
+    results = {}
+    for label, digest in (("картка на заявку", False), ("зведення", True)):
+        result = results[label] = await simulate(args, times, start, digest)
+        calls = result["send"] + result["edit"]
+        print(f"\n{label}: {calls:,} викликів API (sendMessage {result['send']:,}, editMessageText "
+              f"{result['edit']:,}), {calls / args.carriers:.1f} на перевізника; симуляція {result['elapsed']:.1f} с")
+        if digest:
+            windows = result["digests"] / args.carriers
+            bound = result["digests"] * (1 + config.DIGEST_WINDOW / config.DIGEST_EDIT_INTERVAL)
+            print(f"   вікон на перевізника: {windows:.1f}; межа 1 + вікно / інтервал на вікно — {bound:,.0f} викликів")
+            ok &= calls <= bound and result["complete"]
+            print(f"   {'✅' if result['complete'] else '⛔️'} кожна заявка є в зведеннях кожного перевізника")
+        if result["pending"]:
+            ok = False
+            print(f"   ⛔️ у черзі лишилось {result['pending']} рядків outbox")
+
+    plain = results["картка на заявку"]["send"] + results["картка на заявку"]["edit"]
+    coalesced = results["зведення"]["send"] + results["зведення"]["edit"]
+    print(f"\n{'✅' if ok else '⛔️'} зведення: {plain:,} → {coalesced:,} викликів "
+          f"(−{(1 - coalesced / plain) * 100:.1f}%, у {plain / coalesced:.1f}× менше)")
+    await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=200)
+    parser.add_argument("--minutes", type=int, default=120)
+    parser.add_argument("--bursts-per-hour", type=float, default=4)
+    parser.add_argument("--burst-min", type=int, default=5)
+    parser.add_argument("--burst-max", type=int, default=40)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=3)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# bot/benchmarks/fake_session.py
+#
+# Фейкова aiogram-сесія: нічого не йде в мережу, але відповіді проходять через
+# той самий check_response, що й у справжньої AiohttpSession, тож 429/403
+# перетворюються на TelegramRetryAfter/TelegramForbiddenError як у проді.
+# Імітує латентність, глобальний ліміт (~30 повід./с), ліміт на чат і
+# користувачів, що заблокували бота.
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+from typing import Any, AsyncGenerator
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Message, User
+
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "Logisterium", "username": "logisterium_bot"}
+
+
+class FakeTelegramSession(BaseSession):
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.01,
+        global_rate: int | None = 30,
+        per_chat_interval: float | None = 1.0,
+        retry_after: int = 1,
+        random_429: float = 0.0,
+        blocked: set[int] | None = None,
+    ):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self.retry_after = retry_after
+        self.random_429 = random_429
+        self.blocked = blocked or set()
+
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[int] = Counter()
+        self.sent: list[tuple[float, int, str]] = []
+        self._window: deque[float] = deque()
+        self._last_chat: dict[int, float] = {}
+        self._message_id = 0
+
+    def reset(self):
+        self.calls.clear()
+        self.errors.clear()
+        self.sent.clear()
+        self._window.clear()
+        self._last_chat.clear()
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, url: str, headers=None, timeout: int = 30, chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: int | None = None) -> TelegramType:
+        name = method.__api_method__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        status, payload = self._respond(method)
+        if status != 200:
+            self.errors[status] += 1
+        response = self.check_response(bot=bot, method=method, status_code=status, content=json.dumps(payload))
+        return response.result
+
+    def _respond(self, method: TelegramMethod) -> tuple[int, dict[str, Any]]:
+        now = time.monotonic()
+        chat_id = getattr(method, "chat_id", None)
+
+        if chat_id is not None and chat_id in self.blocked:
+            return 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+
+        if method.__api_method__ in ("sendMessage", "editMessageText", "editMessageReplyMarkup"):
+            if self._flooded(now, chat_id):
+                return 429, {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }
+            self.sent.append((now, chat_id, method.__api_method__))
+
+        return 200, {"ok": True, "result": self._result(method, chat_id)}
+
+    def _flooded(self, now: float, chat_id: int | None) -> bool:
+        if self.random_429 and random.random() < self.random_429:
+            return True
+        if self.global_rate:
+            while self._window and now - self._window[0] > 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.global_rate:
+                return True
+        if self.per_chat_interval and chat_id is not None:
+            last = self._last_chat.get(chat_id)
+            if last is not None and now - last < self.per_chat_interval * 0.9:
+                return True
+            self._last_chat[chat_id] = now
+        self._window.append(now)
+        return False
+
+    def _result(self, method: TelegramMethod, chat_id: int | None) -> Any:
+        returning = method.__returning__
+        args = getattr(returning, "__args__", (returning,))
+        if Message in args:
+            self._message_id += 1
+            return {
+                "message_id": getattr(method, "message_id", None) or self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id or 0, "type": "private"},
+                "from": BOT_USER,
+                "text": getattr(method, "text", None) or "",
+            }
+        if User in args:
+            return BOT_USER
+        return True
+
+
+def make_bot(session: FakeTelegramSession | None = None) -> Bot:
+    return Bot(
+        token="42:FAKE-TOKEN-FOR-BENCHMARKS",
+        session=session or FakeTelegramSession(),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
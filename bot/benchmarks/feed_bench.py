@@ -0,0 +1,144 @@
+# bot/benchmarks/feed_bench.py
+#
+# Стрічка відкритих заявок: keyset (bot/services/feed.py) проти OFFSET
+# на --rows заявок у SQLite. Час однієї сторінки на глибині 1, 10, 100, …
+# для найпопулярнішого маршруту і для стрічки без фільтра маршруту.
+# Перевіряє і коректність: прохід усіма сторінками keyset уперед і назад
+# дає ті самі заявки, що й OFFSET, без пропусків і дублів (дати з однаковою
+# годиною — типовий випадок, порядок тримає id).
+# Запуск: python -m bot.benchmarks.feed_bench [--rows 300000] [--page-size 5]
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.models import Shipment_request
+from bot.models.scripts.bulk import TABLES, import_rows
+from bot.models.scripts.fake_data import FakeData
+from bot.services.feed import open_loads
+
+WINDOW_DAYS = 31
+
+
+def in_window(query, now: datetime):
+    return query.where(Shipment_request.date >= now, Shipment_request.date < now + timedelta(days=WINDOW_DAYS))
+
+
+def offset_query(route_key: str | None, now: datetime, page: int, size: int):
+    query = in_window(select(Shipment_request), now)
+    if route_key:
+        query = query.where(Shipment_request.route_key == route_key)
+    return query.order_by(Shipment_request.date, Shipment_request.id).offset(page * size).limit(size)
+
+
+async def timed(fn, rounds: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def walk_keyset(sessionmaker, route_key, now, size, backwards_from=None) -> list[int]:
+    ids = []
+    async with sessionmaker() as session:
+        if backwards_from is None:
+            page = await open_loads(session, route_key, now=now, days=WINDOW_DAYS, limit=size)
+            ids.extend(r.id for r in page.items)
+            while page.has_next:
+                page = await open_loads(session, route_key, after_id=page.last_id, now=now, days=WINDOW_DAYS, limit=size)
+                ids.extend(r.id for r in page.items)
+        else:
+            page = await open_loads(session, route_key, before_id=backwards_from, now=now, days=WINDOW_DAYS, limit=size)
+            ids[:0] = [r.id for r in page.items]
+            while page.has_prev:
+                page = await open_loads(session, route_key, before_id=page.first_id, now=now, days=WINDOW_DAYS, limit=size)
+                ids[:0] = [r.id for r in page.items]
+    return ids
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_feed_bench_")
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp}/feed.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    fake = FakeData(5)
+    now = fake.now
+    started = time.perf_counter()
+    await import_rows(engine, TABLES["shipment_request"], fake.requests(args.rows))
+    print(f"▶️ {args.rows:,} заявок за {time.perf_counter() - started:.1f} с")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    # сторінки рахуємо лише по заявках у вікні стрічки — решту запити не бачать
+    async with sessionmaker() as session:
+        route_key, route_rows = (
+            await session.execute(
+                in_window(select(Shipment_request.route_key, func.count()), now)
+                .group_by(Shipment_request.route_key)
+                .order_by(func.count().desc())
+                .limit(1)
+            )
+        ).one()
+        window_rows = await session.scalar(in_window(select(func.count()).select_from(Shipment_request), now))
+
+    for label, key, total in (("маршрут " + route_key, route_key, route_rows), ("усі маршрути", None, window_rows)):
+        print(f"\n{label} ({total:,} заявок у вікні {WINDOW_DAYS} дн., сторінка {args.page_size})")
+        pages = total // args.page_size
+        depth = 1
+        while depth <= pages:
+            async with sessionmaker() as session:
+                # курсор для keyset — id останньої заявки попередньої сторінки
+                anchor = (
+                    await session.scalars(offset_query(key, now, depth - 1, args.page_size))
+                ).all()[-1].id if depth > 1 else None
+                offset_time, by_offset = await timed(
+                    lambda: session.scalars(offset_query(key, now, depth, args.page_size))
+                )
+                keyset_time, by_keyset = await timed(
+                    lambda: open_loads(session, key, after_id=anchor, now=now, days=WINDOW_DAYS, limit=args.page_size)
+                    if anchor else open_loads(session, key, now=now, days=WINDOW_DAYS, limit=args.page_size)
+                )
+            print(
+                f"  сторінка {depth:>7,}: OFFSET {offset_time * 1000:8.2f} мс, keyset {keyset_time * 1000:6.2f} мс"
+            )
+            depth *= 10
+
+    async with engine.connect() as conn:
+        plan = await conn.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM shipment_request WHERE route_key = :k "
+                "AND date >= :d AND (date > :d OR id > 1) AND date < :until ORDER BY date, id LIMIT 6"
+            ),
+            {"k": route_key, "d": now, "until": now + timedelta(days=WINDOW_DAYS)},
+        )
+        print("\nплан keyset:", "; ".join(row[-1] for row in plan))
+
+    async with sessionmaker() as session:
+        expected = [
+            r.id for r in (await session.scalars(offset_query(route_key, now, 0, route_rows))).all()
+        ]
+    forward = await walk_keyset(sessionmaker, route_key, now, args.page_size)
+    backward = await walk_keyset(sessionmaker, route_key, now, args.page_size, backwards_from=forward[-1])
+    ok = forward == expected and backward == expected[:-1]
+    print(f"{'✅' if ok else '⛔️'} прохід keyset уперед/назад: {len(forward):,} / {len(backward):,} заявок, "
+          f"дублів {len(forward) - len(set(forward))}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--page-size", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
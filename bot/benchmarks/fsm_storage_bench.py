@@ -0,0 +1,93 @@
+# bot/benchmarks/fsm_storage_bench.py
+#
+# Оновлень FSM за секунду на повному сценарії ClientApplicationFSM
+# (8 кроків: update_data + set_state на кожному, get_data і clear у кінці):
+# MemoryStorage vs SQLAlchemyStorage.
+# Запуск: python -m bot.benchmarks.fsm_storage_bench --users 2000
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_fsm_bench.db",
+)
+
+from aiogram.fsm.context import FSMContext  # noqa: E402
+from aiogram.fsm.storage.base import StorageKey  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+
+from bot.database.database import Base, engine  # noqa: E402
+from bot.fsm.storage import SQLAlchemyStorage  # noqa: E402
+from bot.handlers.client.application import ClientApplicationFSM  # noqa: E402
+
+STEPS = [
+    ("route", "Київ → Львів", ClientApplicationFSM.date),
+    ("date", "2025-07-20T10:00:00", ClientApplicationFSM.cargo_type),
+    ("cargo_type", "Побутова техніка", ClientApplicationFSM.volume),
+    ("volume", "6 палет", ClientApplicationFSM.weight),
+    ("weight", "2.2 т", ClientApplicationFSM.loading),
+    ("loading", "рампа", ClientApplicationFSM.unloading),
+    ("unloading", "ручне", ClientApplicationFSM.price),
+]
+
+
+async def application_flow(storage, user_id: int) -> int:
+    state = FSMContext(storage, StorageKey(bot_id=42, chat_id=user_id, user_id=user_id))
+    ops = 0
+    await state.set_state(ClientApplicationFSM.route)
+    ops += 1
+    for field, value, next_state in STEPS:
+        await state.get_state()
+        await state.update_data({field: value})
+        await state.set_state(next_state)
+        ops += 3
+    await state.get_data()
+    await state.clear()
+    return ops + 2
+
+
+async def measure(name: str, storage, users: int, concurrency: int):
+    started = time.perf_counter()
+    ops = 0
+    for offset in range(0, users, concurrency):
+        batch = range(offset, min(users, offset + concurrency))
+        results = await asyncio.gather(*(application_flow(storage, 10_000 + u) for u in batch))
+        ops += sum(results)
+    if hasattr(storage, "flush"):
+        await storage.flush()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {ops / elapsed:>10,.0f} операцій/с ({users} анкет за {elapsed:.2f} с)")
+    if hasattr(storage, "stats"):
+        s = storage.stats
+        print(f"{'':<22} записів у сховище: {s['writes']}, у БД: {s['db_writes']} за {s['flushes']} flush, "
+              f"читань з БД: {s['db_reads']}")
+
+
+async def run(args):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    await measure("MemoryStorage", MemoryStorage(), args.users, args.concurrency)
+    await measure("SQLAlchemyStorage", SQLAlchemyStorage(engine), args.users, args.concurrency)
+    await measure(
+        "SQLAlchemyStorage (0 мс)",
+        SQLAlchemyStorage(engine, flush_delay=0),
+        args.users,
+        args.concurrency,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
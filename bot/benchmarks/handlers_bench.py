@@ -0,0 +1,348 @@
+# bot/benchmarks/handlers_bench.py
+#
+# Наскрізний бенчмарк хендлерів: синтетичні Update проходять через справжній
+# dp з bot/main.py (middleware, FSM, БД), Telegram — FakeTelegramSession,
+# LLM — InProcessStubClient з налаштовуваною латентністю.
+# Сценарії: /start, реєстрація перевізника, реєстрація клієнта, повна
+# анкета ClientApplicationFSM (останній крок — notify_carriers на --carriers
+# перевізників маршруту).
+# Для кожного: p50/p95/p99 латентності апдейту, апдейтів/с, запитів у БД
+# на апдейт і виділення пам'яті на апдейт (окремий прохід з tracemalloc).
+# Результати — JSON; --baseline порівнює з попереднім прогоном і повертає
+# код 1, якщо p95 або пропускна здатність погіршились більше ніж на --tolerance.
+#
+# Запуск: python -m bot.benchmarks.handlers_bench [--users 500] [--llm-latency 300]
+#         python -m bot.benchmarks.handlers_bench --baseline bench-results/handlers-abc1234.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("BOT_TOKEN", "42:FAKE-TOKEN-FOR-BENCHMARKS")
+os.environ.setdefault("FSM_STORAGE", "memory")
+os.environ.setdefault("DB_SLOW_QUERY_SAMPLE", "0.01")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_handlers_bench.db",
+)
+
+from sqlalchemy import insert  # noqa: E402
+
+from bot.ai_helper.llm_gateway import LLMGateway, set_gateway  # noqa: E402
+from bot.ai_helper.stub_server import InProcessStubClient  # noqa: E402
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.database.database import Base, async_session, engine  # noqa: E402
+from bot.database.engine import pool_metrics  # noqa: E402
+from bot.database.migrations import upgrade  # noqa: E402
+from bot.geo.routes import route_key  # noqa: E402
+from bot.main import dp  # noqa: E402
+from bot.models import Carrier  # noqa: E402
+from bot.services.route_index import route_index  # noqa: E402
+
+ROUTE = "Київ → Львів"
+RULE_DATES = ["завтра о 10:00", "20.11 о 9:00", "в понеділок вранці", "через 3 дні", "післязавтра"]
+LLM_DATES = ["як домовимось", "десь наприкінці місяця", "на початку наступного тижня"]
+
+
+# --- синтетичні апдейти ---
+
+
+class Updates:
+    def __init__(self):
+        self._id = 0
+
+    def _next(self) -> int:
+        self._id += 1
+        return self._id
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": "Bench", "language_code": "uk"}
+
+    def message(self, user_id: int, text: str) -> dict:
+        n = self._next()
+        return {
+            "update_id": n,
+            "message": {
+                "message_id": n,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": self._user(user_id),
+                "text": text,
+            },
+        }
+
+    def callback(self, user_id: int, data: str) -> dict:
+        n = self._next()
+        return {
+            "update_id": n,
+            "callback_query": {
+                "id": str(n),
+                "chat_instance": str(user_id),
+                "from": self._user(user_id),
+                "data": data,
+                "message": {
+                    "message_id": n,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "text": "…",
+                },
+            },
+        }
+
+
+def scenario_start(u: Updates, user_id: int, rng: random.Random, args):
+    return [("start", u.message(user_id, "/start"))]
+
+
+def scenario_carrier(u: Updates, user_id: int, rng: random.Random, args):
+    return [
+        ("role", u.callback(user_id, "role_carrier")),
+        ("full_name", u.message(user_id, "Шевченко Іван")),
+        ("phone", u.message(user_id, "+380501234567")),
+        ("route", u.message(user_id, ROUTE)),
+        ("capacity", u.message(user_id, "20 т, 82 м³, 33 палети")),
+    ]
+
+
+def scenario_client(u: Updates, user_id: int, rng: random.Random, args):
+    return [
+        ("role", u.callback(user_id, "role_client")),
+        ("full_name", u.message(user_id, "Коваленко Олена")),
+        ("phone", u.message(user_id, "+380671234567")),
+    ]
+
+
+def scenario_application(u: Updates, user_id: int, rng: random.Random, args):
+    date = rng.choice(LLM_DATES) if rng.random() < args.llm_share else rng.choice(RULE_DATES)
+    return [
+        ("open", u.callback(user_id, "client_application")),
+        ("confirm", u.callback(user_id, "confirm_start_application")),
+        ("route", u.message(user_id, ROUTE)),
+        ("date", u.message(user_id, date)),
+        ("cargo_type", u.message(user_id, "Побутова техніка")),
+        ("volume", u.message(user_id, "6 палет")),
+        ("weight", u.message(user_id, "2.2 т")),
+        ("loading", u.message(user_id, "рампа")),
+        ("unloading", u.message(user_id, "ручне")),
+        ("price+notify", u.message(user_id, "8000 грн")),
+    ]
+
+
+SCENARIOS = {
+    "start": scenario_start,
+    "carrier_registration": scenario_carrier,
+    "client_registration": scenario_client,
+    "application": scenario_application,
+}
+
+
+# --- вимірювання ---
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_scenario(name: str, bot, first_user: int, args) -> dict:
+    build = SCENARIOS[name]
+    u = Updates()
+    rng = random.Random(first_user)
+    users = [build(u, first_user + i, rng, args) for i in range(args.users)]
+
+    latencies: list[float] = []
+    by_step: dict[str, list[float]] = defaultdict(list)
+    errors = 0
+
+    async def play(flow):
+        nonlocal errors
+        for step, update in flow:
+            started = time.perf_counter()
+            try:
+                await dp.feed_raw_update(bot, update)
+            except Exception as e:
+                errors += 1
+                print(f"⛔️ {name}/{step}: {e!r}")
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            by_step[step].append(elapsed)
+
+    queries_before = pool_metrics(engine).queries
+    started = time.perf_counter()
+    for offset in range(0, len(users), args.concurrency):
+        await asyncio.gather(*(play(flow) for flow in users[offset : offset + args.concurrency]))
+    elapsed = time.perf_counter() - started
+    queries = pool_metrics(engine).queries - queries_before
+
+    alloc = await measure_allocations(name, bot, first_user + args.users, args)
+    return {
+        "updates": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        **summarize(latencies),
+        "queries_per_update": queries / len(latencies),
+        **alloc,
+        "steps": {step: summarize(values) for step, values in by_step.items()},
+    }
+
+
+async def measure_allocations(name: str, bot, first_user: int, args) -> dict:
+    # окремий послідовний прохід: tracemalloc спотворює латентність
+    u = Updates()
+    rng = random.Random(first_user)
+    flows = [SCENARIOS[name](u, first_user + i, rng, args) for i in range(args.alloc_users)]
+    peaks, blocks = [], []
+    tracemalloc.start()
+    try:
+        for flow in flows:
+            for _, update in flow:
+                before_blocks = sys.getallocatedblocks()
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await dp.feed_raw_update(bot, update)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - current)
+                blocks.append(sys.getallocatedblocks() - before_blocks)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb_per_update": sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        "retained_blocks_per_update": sum(blocks) / len(blocks) if blocks else 0.0,
+    }
+
+
+async def seed(carriers: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+    async with async_session() as session:
+        if carriers:
+            await session.execute(
+                insert(Carrier),
+                [
+                    {
+                        "telegram_id": 1_000_000 + i,
+                        "full_name": f"Перевізник {i}",
+                        "phone": "+380",
+                        "route": ROUTE,
+                        "route_key": route_key(ROUTE),
+                    }
+                    for i in range(carriers)
+                ],
+            )
+        await session.commit()
+        await route_index.load(session)
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    print(f"\nПорівняння з {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        p95 = current["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rate = current["throughput"] / before["throughput"] - 1 if before["throughput"] else 0.0
+        regressed = p95 > tolerance or rate < -tolerance
+        ok &= not regressed
+        print(f"  {'⛔️' if regressed else '✅'} {name:<22} p95 {p95:+.0%}, апдейтів/с {rate:+.0%}")
+    return ok
+
+
+async def run(args) -> dict:
+    set_gateway(
+        LLMGateway(
+            client=InProcessStubClient(args.llm_latency / 1000, args.llm_latency / 1000 / 5),
+            cache_ttl=0,
+            timeout=10,
+        )
+    )
+    session = FakeTelegramSession(
+        latency=args.tg_latency / 1000, jitter=0, global_rate=None, per_chat_interval=None
+    )
+    bot = make_bot(session)
+    await seed(args.carriers)
+
+    results = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("baseline", "out")},
+        "scenarios": {},
+    }
+    first_user = 10_000_000
+    for name in args.scenarios:
+        stats = await run_scenario(name, bot, first_user, args)
+        first_user += 1_000_000
+        results["scenarios"][name] = stats
+        print(
+            f"{name:<22} {stats['throughput']:>8,.0f} апд./с  "
+            f"p50 {stats['p50_ms']:6.2f} / p95 {stats['p95_ms']:6.2f} / p99 {stats['p99_ms']:7.2f} мс  "
+            f"запитів/апд. {stats['queries_per_update']:.2f}  "
+            f"пам'ять/апд. {stats['alloc_peak_kb_per_update']:.0f} КБ  "
+            f"помилок {stats['errors']}"
+        )
+    slowest = max(results["scenarios"].get("application", {}).get("steps", {}).items(), key=lambda kv: kv[1]["p95_ms"], default=None)
+    if slowest:
+        print(f"  найповільніший крок анкети: {slowest[0]} (p95 {slowest[1]['p95_ms']:.2f} мс)")
+    await dp.storage.close()
+    await bot.session.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--carriers", type=int, default=1000, help="перевізників на маршруті для fan-out")
+    parser.add_argument("--llm-latency", type=float, default=300, help="мс")
+    parser.add_argument("--llm-share", type=float, default=0.2, help="частка дат, що йдуть у LLM")
+    parser.add_argument("--tg-latency", type=float, default=0, help="мс на виклик Bot API")
+    parser.add_argument("--alloc-users", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    out = Path(args.out or f"bench-results/handlers-{results['commit']}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"💾 {out}")
+
+    ok = all(stats["errors"] == 0 for stats in results["scenarios"].values())
+    if args.baseline:
+        ok &= compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
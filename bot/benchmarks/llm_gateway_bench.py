@@ -0,0 +1,90 @@
+# bot/benchmarks/llm_gateway_bench.py
+#
+# Навантажувальний тест LLMGateway проти локального stub-сервера.
+# Запуск: python -m bot.benchmarks.llm_gateway_bench --requests 2000 --distinct 50
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+
+from aiohttp import web
+from groq import AsyncGroq
+
+from bot.ai_helper.date_parser import _cache_key
+from bot.ai_helper.llm_gateway import LLMGateway
+from bot.ai_helper.stub_server import create_app
+
+INPUTS = [
+    "на вихідних",
+    "в середині серпня",
+    "десь наприкінці місяця",
+    "на початку наступного тижня",
+    "як домовимось",
+    "20-го липня",
+    "Завтра зранку",
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(args):
+    app = create_app(args.latency / 1000, args.jitter / 1000, args.error_rate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    gateway = LLMGateway(
+        client=AsyncGroq(api_key="stub", base_url=f"http://127.0.0.1:{port}", max_retries=0),
+        max_concurrency=args.concurrency,
+        timeout=args.timeout,
+    )
+    texts = [f"{random.choice(INPUTS)} #{i}" for i in range(args.distinct)]
+    now = datetime.now()
+    latencies = []
+
+    async def one(text: str):
+        started = time.perf_counter()
+        await gateway.complete(f'Введена дата: "{text}"', cache_key=_cache_key(text, now))
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(random.choice(texts)) for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    await gateway.client.close()
+    await runner.cleanup()
+
+    print(f"Запитів:            {args.requests} ({args.distinct} унікальних)")
+    print(f"Час:                {elapsed:.2f} с, {args.requests / elapsed:.0f} запитів/с")
+    print(f"Латентність p50/p95/p99: "
+          f"{statistics.median(latencies) * 1000:.1f} / "
+          f"{percentile(latencies, 0.95) * 1000:.1f} / "
+          f"{percentile(latencies, 0.99) * 1000:.1f} мс")
+    print(f"До stub-сервера дійшло: {app['requests']}")
+    for name, value in gateway.stats.items():
+        print(f"  {name:<12} {value}")
+    print(f"Стан breaker:       {gateway.breaker.state}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=300, help="мс")
+    parser.add_argument("--jitter", type=float, default=100, help="мс")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
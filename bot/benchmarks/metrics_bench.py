@@ -0,0 +1,220 @@
+# bot/benchmarks/metrics_bench.py
+#
+# Ціна інструментації (bot/services/metrics.py, bot/middlewares/metrics.py):
+# - HandlerMetrics: виклик через middleware проти прямого виклику хендлера,
+#   і повний прохід апдейта через Dispatcher з нею і без неї;
+# - observe_query на кожен SQL-запит (відбиток з кешу) і перший розбір нового запиту;
+# - TelegramMetrics на кожен виклик Bot API;
+# - рендер /metrics з реалістичною кількістю серій;
+# - відбитки SQL: запити з різною довжиною IN (…) / VALUES у стилі SQLite (?)
+#   і asyncpg ($1) зводяться до одного відбитка — інакше код виходу 1.
+# Накладні — кілька мікросекунд на апдейт, але це різниця двох вимірів, і на
+# зайнятій машині вона гуляє на одиниці мікросекунд; тому бюджет перевіряється
+# лише якщо його задано явно (--budget-us).
+# Запуск: python -m bot.benchmarks.metrics_bench [--updates 20000] [--budget-us 10]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("BOT_TOKEN", "42:FAKE-TOKEN-FOR-BENCHMARKS")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from aiogram import Dispatcher, Router  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+from aiogram.methods import SendMessage  # noqa: E402
+from aiogram.types import Message, Update  # noqa: E402
+
+from bot.benchmarks.fake_session import make_bot  # noqa: E402
+from bot.middlewares.metrics import HandlerMetrics  # noqa: E402
+from bot.services.metrics import TelegramMetrics, fingerprint, observe_query, registry  # noqa: E402
+
+STATEMENT = (
+    "SELECT shipment_request.id, shipment_request.route FROM shipment_request "
+    "WHERE shipment_request.route_key = ? AND shipment_request.id IN (?, ?, ?, ?) LIMIT ? OFFSET ?"
+)
+
+
+# пари запитів, що мають дати один відбиток, і очікувані відбитки окремих запитів
+SAME_FINGERPRINT = [
+    (
+        "SELECT id FROM shipment_request WHERE id IN (?, ?) AND status = ?",
+        "SELECT id FROM shipment_request WHERE id IN (?, ?, ?, ?) AND status = ?",
+    ),
+    (
+        "SELECT id FROM shipment_request WHERE id IN ($1, $2) AND status = $3",
+        "SELECT id FROM shipment_request WHERE id IN ($1, $2, $3, $4, $5) AND status = $6",
+    ),
+    (
+        "INSERT INTO notification_outbox (request_id, chat_id) VALUES ($1, $2), ($3, $4)",
+        "INSERT INTO notification_outbox (request_id, chat_id) VALUES ($1, $2)",
+    ),
+    (
+        "SELECT id FROM shipment_request WHERE price > 8000 AND route_key = 'kyiv:lviv' LIMIT 20",
+        "SELECT id FROM shipment_request WHERE price > 9500.5 AND route_key = 'odesa:dnipro' LIMIT 50",
+    ),
+]
+FINGERPRINTS = {
+    "SELECT id FROM t WHERE a = $1 AND b IN ($2, $3)": "SELECT id FROM t WHERE a = ? AND b IN (…)",
+    "SELECT c_1 FROM shipment_request_202401 WHERE id = 5": "SELECT c_1 FROM shipment_request_202401 WHERE id = ?",
+}
+
+
+def check_fingerprints() -> bool:
+    ok = True
+    for left, right in SAME_FINGERPRINT:
+        if fingerprint(left) != fingerprint(right):
+            print(f"⛔️ різні відбитки: {fingerprint(left)!r} ≠ {fingerprint(right)!r}")
+            ok = False
+    for statement, expected in FINGERPRINTS.items():
+        if fingerprint(statement) != expected:
+            print(f"⛔️ відбиток {statement!r}: {fingerprint(statement)!r}, очікували {expected!r}")
+            ok = False
+    print(f"{'✅' if ok else '⛔️'} відбитки SQL: {len(SAME_FINGERPRINT)} пар і {len(FINGERPRINTS)} зразки")
+    return ok
+
+
+def update(n: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": n,
+            "message": {
+                "message_id": n,
+                "date": 0,
+                "chat": {"id": 1000 + n % 500, "type": "private"},
+                "from": {"id": 1000 + n % 500, "is_bot": False, "first_name": "Bench"},
+                "text": "привіт",
+            },
+        }
+    )
+
+
+def per_call(fn, n: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - started)
+    return best / n * 1e6
+
+
+async def aper_call(fn, n: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        await fn(n)
+        best = min(best, time.perf_counter() - started)
+    return best / n * 1e6
+
+
+async def run(args) -> bool:
+    async def handler(event, data):
+        return None
+
+    middleware = HandlerMetrics()
+    event = update(1).message
+
+    class HandlerObject:
+        callback = handler
+
+    data = {"handler": HandlerObject(), "raw_state": "ClientApplicationFSM:route"}
+
+    async def direct(n):
+        for _ in range(n):
+            await handler(event, data)
+
+    async def wrapped(n):
+        for _ in range(n):
+            await middleware(handler, event, data)
+
+    base = await aper_call(direct, args.updates)
+    with_metrics = await aper_call(wrapped, args.updates)
+    handler_overhead = with_metrics - base
+    print(f"HandlerMetrics: +{handler_overhead:.2f} мкс на виклик хендлера")
+
+    # повний прохід апдейта через Dispatcher — тут шум самого aiogram більший за різницю
+    updates = [update(i) for i in range(args.updates)]
+    bot = make_bot()
+    timings = {}
+    for label, instrument in (("без метрик", False), ("з метриками", True)):
+        dp = Dispatcher(storage=MemoryStorage())
+        router = Router()
+
+        @router.message()
+        async def echo(message: Message):
+            return None
+
+        dp.include_router(router)
+        if instrument:
+            dp.message.middleware(HandlerMetrics())
+
+        async def feed(n, dp=dp):
+            for item in updates[:n]:
+                await dp.feed_update(bot, item)
+
+        timings[label] = await aper_call(feed, args.updates)
+    dispatcher_overhead = timings["з метриками"] - timings["без метрик"]
+    print(
+        f"Dispatcher.feed_update: {timings['без метрик']:.1f} → {timings['з метриками']:.1f} мкс на апдейт "
+        f"({dispatcher_overhead:+.2f} мкс)"
+    )
+
+    fingerprint(STATEMENT)
+    query_cost = per_call(lambda n: [observe_query(STATEMENT, 0.0012) for _ in range(n)], args.updates)
+    fresh = [STATEMENT.replace("LIMIT", f"AND c_{i} = ? LIMIT") for i in range(2000)]
+    started = time.perf_counter()
+    for statement in fresh:
+        fingerprint(statement)
+    cold_cost = (time.perf_counter() - started) / len(fresh) * 1e6
+    print(f"observe_query: {query_cost:.2f} мкс на запит (новий запит вперше — {cold_cost:.1f} мкс)")
+
+    telegram = TelegramMetrics()
+    method = SendMessage(chat_id=1, text="x")
+
+    async def make_request(bot, method):
+        return None
+
+    async def bare(n):
+        for _ in range(n):
+            await make_request(bot, method)
+
+    async def measured(n):
+        for _ in range(n):
+            await telegram(make_request, bot, method)
+
+    api_overhead = await aper_call(measured, args.updates) - await aper_call(bare, args.updates)
+    print(f"TelegramMetrics: +{api_overhead:.2f} мкс на виклик Bot API")
+
+    for i in range(200):
+        observe_query(f"SELECT {i} FROM t WHERE a = ? AND b_{i} = ?", 0.002)
+    registry.render()  # перший рендер імпортує БД і кеш профілів для gauge-ів
+    started = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+    print(f"рендер /metrics: {render_ms:.1f} мс, {len(text.splitlines()):,} рядків, {len(text) / 1024:.0f} КБ")
+
+    await bot.session.close()
+    per_update = handler_overhead + 2 * query_cost + api_overhead
+    ok = check_fingerprints()
+    if args.budget_us is None:
+        print(f"типовий апдейт (хендлер + 2 запити + 1 виклик API): +{per_update:.2f} мкс")
+        return ok
+    within = per_update <= args.budget_us
+    print(
+        f"{'✅' if within else '⛔️'} типовий апдейт (хендлер + 2 запити + 1 виклик API): "
+        f"+{per_update:.2f} мкс (бюджет {args.budget_us} мкс)"
+    )
+    return ok and within
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--budget-us", type=float, default=None)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
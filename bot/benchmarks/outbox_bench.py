@@ -0,0 +1,160 @@
+# bot/benchmarks/outbox_bench.py
+#
+# 1) Час постановки сповіщень у outbox разом із заявкою не залежить від
+#    кількості перевізників на маршруті.
+# 2) Кілька диспетчерів розбирають outbox паралельно, і жодне повідомлення
+#    не надсилається двічі.
+# Запуск: python -m bot.benchmarks.outbox_bench --carriers 2000 --requests 5 --dispatchers 4
+# (БД — DATABASE_URL, за замовчуванням тимчасовий SQLite-файл)
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_outbox_bench.db",
+)
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.database.database import Base, async_session, engine  # noqa: E402
+from bot.database.migrations import upgrade  # noqa: E402
+from bot.geo.routes import route_key  # noqa: E402
+from bot.models import Carrier, NotificationOutbox, Shipment_request  # noqa: E402
+from bot.services.broadcast import ChatLimiter, TokenBucket, get_broadcaster  # noqa: E402
+from bot.services.notifier import notify_carriers  # noqa: E402
+from bot.services.outbox import OutboxDispatcher  # noqa: E402
+
+ROUTE = "Київ → Львів"
+
+
+def make_request(i: int) -> Shipment_request:
+    return Shipment_request(
+        client_telegram_id=500_000 + i,
+        route=ROUTE,
+        date=datetime.now() + timedelta(days=3),
+        cargo_type="Побутова техніка",
+        volume="6 палет",
+        weight="2.2 т",
+        loading="рампа",
+        unloading="ручне",
+        price=8000,
+    )
+
+
+async def reset_db(carriers: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+    async with async_session() as session:
+        if carriers:
+            await session.execute(
+                insert(Carrier),
+                [
+                    {
+                        "telegram_id": 1_000_000 + i,
+                        "full_name": f"Перевізник {i}",
+                        "phone": "+380",
+                        "route": ROUTE,
+                        "route_key": route_key(ROUTE),
+                    }
+                    for i in range(carriers)
+                ],
+            )
+        await session.commit()
+
+
+async def measure_enqueue(carriers: int, samples: int = 5) -> float:
+    await reset_db(carriers)
+    timings = []
+    for i in range(samples):
+        started = time.perf_counter()
+        async with async_session() as session:
+            request = make_request(i)
+            session.add(request)
+            await notify_carriers(session, request)
+            await session.commit()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+async def run(args) -> int:
+    print("Постановка в outbox (медіана на заявку):")
+    for n in (10, 100, 1000, args.carriers):
+        print(f"  {n:>6} перевізників: {await measure_enqueue(n) * 1000:.1f} мс")
+
+    await reset_db(args.carriers)
+    async with async_session() as session:
+        for i in range(args.requests):
+            request = make_request(i)
+            session.add(request)
+            await notify_carriers(session, request)
+        await session.commit()
+        total = await session.scalar(select(func.count()).select_from(NotificationOutbox))
+
+    sessions = []
+    dispatchers = []
+    for _ in range(args.dispatchers):
+        session = FakeTelegramSession(latency=args.latency / 1000, global_rate=None, per_chat_interval=None)
+        bot = make_bot(session)
+        broadcaster = get_broadcaster(bot)
+        broadcaster.bucket = TokenBucket(rate=100_000)
+        broadcaster.chat_limiter = ChatLimiter(interval=0)
+        broadcaster.workers = 64
+        sessions.append(session)
+        dispatchers.append(OutboxDispatcher(bot, batch_size=args.batch, poll_interval=0.05))
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(d.run()) for d in dispatchers]
+    while True:
+        await asyncio.sleep(0.1)
+        async with async_session() as session:
+            pending = await session.scalar(
+                select(func.count()).select_from(NotificationOutbox).where(NotificationOutbox.status == "pending")
+            )
+        if not pending:
+            break
+    elapsed = time.perf_counter() - started
+    for d in dispatchers:
+        d.stop()
+    await asyncio.gather(*tasks)
+
+    deliveries = Counter()
+    for session in sessions:
+        for _, chat_id, _ in session.sent:
+            deliveries[chat_id] += 1
+    sent = sum(deliveries.values())
+    duplicates = sent - total
+    per_dispatcher = [len(s.sent) for s in sessions]
+
+    print(f"\nOutbox: {total} сповіщень, {args.dispatchers} диспетчерів")
+    print(f"  розіслано за {elapsed:.2f} с ({sent / elapsed:.0f} повід./с)")
+    print(f"  по диспетчерах: {per_dispatcher}")
+    print(f"  дублікатів: {duplicates}")
+
+    async with async_session() as session:
+        await session.execute(delete(NotificationOutbox))
+        await session.commit()
+    return 1 if duplicates or sent != total else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--dispatchers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=20, help="мс на запит")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
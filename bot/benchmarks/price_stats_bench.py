@@ -0,0 +1,168 @@
+# bot/benchmarks/price_stats_bench.py
+#
+# Підказка ціни на кроці price (bot/services/price_stats.py) на --scales
+# синтетичних заявок у SQLite:
+# - затримка підказки: перцентилі запитом по маршруту (SELECT price … + NumPy)
+#   проти t-digest у пам'яті — перша росте з таблицею, друга ні;
+# - перебудова з історії без знімка, старт зі знімка (route_price_stats) і додавання однієї заявки;
+# - точність: p25/p75 дайджесту проти точних перцентилів по кожному маршруту
+#   з щонайменше MIN_CHECKED заявок (похибка в рангах), злиття двох половин проти дайджесту всього потоку.
+# Запуск: python -m bot.benchmarks.price_stats_bench [--scales 10000 100000 1000000]
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.models import Shipment_request
+from bot.models.scripts.bulk import TABLES, import_rows
+from bot.models.scripts.fake_data import FakeData
+from bot.services.price_stats import HINT_QUANTILES, PriceStats, TDigest
+
+LOOKUPS = 200
+# на менших маршрутах похибку визначає вже дискретність (один ранг — 1/n), а не дайджест
+MIN_CHECKED = 200
+
+
+def priced(fake: FakeData, rows: int):
+    # ціна з FakeData залежить лише від відстані — додаємо розкид, як у живих клієнтів
+    rng = random.Random(7)
+    for row in fake.requests(rows):
+        row["price"] = int(row["price"] * rng.lognormvariate(0, 0.25))
+        yield row
+
+
+async def sql_suggest(session, route_key: str):
+    # як рахували б без агрегатів: усі ціни маршруту і перцентилі на кожного клієнта
+    prices = (
+        await session.scalars(
+            select(Shipment_request.price).where(Shipment_request.route_key == route_key, Shipment_request.price > 0)
+        )
+    ).all()
+    return np.percentile(prices, [q * 100 for q in HINT_QUANTILES]) if prices else None
+
+
+def rank_error(digest: TDigest, values: np.ndarray) -> float:
+    # наскільки далеко за рангом оцінка від справжнього перцентиля
+    ordered = np.sort(values)
+    estimates = digest.quantile(HINT_QUANTILES)
+    ranks = np.searchsorted(ordered, estimates) / len(ordered)
+    return float(np.max(np.abs(ranks - np.asarray(HINT_QUANTILES))))
+
+
+async def scale(rows: int) -> tuple[dict, bool]:
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_price_stats_bench_")
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp}/prices.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await import_rows(engine, TABLES["shipment_request"], priced(FakeData(5), rows))
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    result = {"rows": rows}
+
+    stats = PriceStats(min_count=1)
+    async with sessionmaker() as session:
+        started = time.perf_counter()
+        await stats.load(session)
+        result["rebuild"] = time.perf_counter() - started
+        await stats.save(session)
+        by_route: dict[str, list[int]] = {}
+        for route_key, price in await session.execute(
+            select(Shipment_request.route_key, Shipment_request.price).where(Shipment_request.price > 0)
+        ):
+            by_route.setdefault(route_key, []).append(price)
+
+    async with sessionmaker() as session:
+        started = time.perf_counter()
+        await PriceStats(min_count=1).load(session)
+        result["snapshot"] = time.perf_counter() - started
+
+    busiest = sorted(by_route, key=lambda key: len(by_route[key]), reverse=True)
+    sample = [busiest[i % min(len(busiest), 20)] for i in range(LOOKUPS)]
+    result["route_rows"] = len(by_route[busiest[0]])
+    async with sessionmaker() as session:
+        timings = []
+        for route_key in sample:
+            started = time.perf_counter()
+            await sql_suggest(session, route_key)
+            timings.append(time.perf_counter() - started)
+        result["sql"] = statistics.median(timings)
+    timings = []
+    for route_key in sample:
+        started = time.perf_counter()
+        stats.suggest(route_key)
+        timings.append(time.perf_counter() - started)
+    result["memory"] = statistics.median(timings)
+
+    errors = [
+        rank_error(stats.stats(route_key).digest, np.asarray(prices, dtype=np.float64))
+        for route_key, prices in by_route.items()
+        if len(prices) >= MIN_CHECKED
+    ]
+    result["rank_error"] = max(errors) if errors else None
+    result["checked"] = len(errors)
+    result["routes"] = len(by_route)
+    result["sketch_bytes"] = statistics.mean(len(stats.stats(key).digest.to_bytes()) for key in by_route)
+
+    started = time.perf_counter()
+    for i, route_key in enumerate(sample):
+        stats.add(route_key, 9000, request_id=10**9 + i)
+    result["add"] = (time.perf_counter() - started) / len(sample)
+    await engine.dispose()
+    return result, not errors or result["rank_error"] <= 0.02
+
+
+def merge_check(count: int = 200_000) -> tuple[float, float]:
+    # дайджести двох процесів, злиті разом, — проти одного на весь потік
+    rng = np.random.default_rng(3)
+    values = rng.lognormal(9, 0.3, count)
+    whole, left, right = TDigest(), TDigest(), TDigest()
+    for chunk in np.array_split(values, 100):
+        whole.add(chunk)
+    for chunk in np.array_split(values[: count // 2], 50):
+        left.add(chunk)
+    for chunk in np.array_split(values[count // 2 :], 50):
+        right.add(chunk)
+    left.merge(right)
+    return rank_error(whole, values), rank_error(left, values)
+
+
+async def run(args) -> bool:
+    ok = True
+    print(f"{'заявок':>10} {'маршрутів':>9} {'на маршруті':>11} {'SQL + NumPy':>12} {'t-digest':>10} "
+          f"{'add':>8} {'перебудова':>11} {'зі знімка':>10} {'похибка рангу':>14}")
+    for rows in args.scales:
+        result, accurate = await scale(rows)
+        ok &= accurate
+        print(
+            f"{result['rows']:>10,} {result['routes']:>9,} {result['route_rows']:>11,} "
+            f"{result['sql'] * 1000:>9.2f} мс {result['memory'] * 1e6:>7.2f} мкс {result['add'] * 1e6:>5.0f} мкс "
+            f"{result['rebuild']:>9.2f} с {result['snapshot']:>8.2f} с "
+            + (f"{result['rank_error'] * 100:>12.2f} %" if result["checked"] else f"{'—':>14}")
+        )
+        print(f"{'':>10} дайджест маршруту в середньому {result['sketch_bytes']:,.0f} Б; "
+              f"точність звірено на {result['checked']:,} маршрутах")
+
+    whole, merged = merge_check()
+    ok &= merged <= 0.02
+    print(f"\nзлиття двох половин: похибка рангу p25/p75 {merged * 100:.2f}% (один дайджест — {whole * 100:.2f}%)")
+    print(f"{'✅' if ok else '⛔️'} похибка рангу p25/p75 не більше 2%")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
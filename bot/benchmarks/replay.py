@@ -0,0 +1,159 @@
+# bot/benchmarks/replay.py
+#
+# Відтворення записаного трафіку (bot/middlewares/recorder.py) через
+# справжній dp: Telegram — FakeTelegramSession, LLM — in-process stub.
+# Темп: --speed 1 (як у записі), --speed 10 (удесятеро швидше) або --speed max.
+# Апдейти одного чату обробляються строго по черзі (як у webhook-воркері),
+# різні чати — паралельно.
+# Звіт: латентність обробки і затримка від запланованого моменту
+# (p50/p95/p99/max), помилки за типами, навантаження на БД.
+#
+# Запуск: python -m bot.benchmarks.replay recordings/ --speed 1
+#         DATABASE_URL=postgresql://... python -m bot.benchmarks.replay peak.jsonl.gz --speed max
+# Без DATABASE_URL — свіжа тимчасова SQLite-база.
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+_FRESH_DB = "DATABASE_URL" not in os.environ
+os.environ.setdefault("BOT_TOKEN", "42:FAKE-TOKEN-FOR-BENCHMARKS")
+os.environ.setdefault("FSM_STORAGE", "memory")
+os.environ.setdefault("DB_SLOW_QUERY_SAMPLE", "0.01")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.gettempdir()}/logistic_bot_replay.db",
+)
+os.environ["RECORD_UPDATES"] = "0"
+
+from bot.ai_helper.llm_gateway import LLMGateway, set_gateway  # noqa: E402
+from bot.ai_helper.stub_server import InProcessStubClient  # noqa: E402
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.database.database import Base, async_session, engine  # noqa: E402
+from bot.database.engine import pool_metrics  # noqa: E402
+from bot.database.migrations import upgrade  # noqa: E402
+from bot.main import dp  # noqa: E402
+from bot.middlewares.recorder import iter_recording, recording_files  # noqa: E402
+from bot.services.route_index import route_index  # noqa: E402
+from bot.webhook import ChatSerializer, chat_of  # noqa: E402
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def describe(label: str, values: list[float]) -> str:
+    return (
+        f"{label:<12} p50 {percentile(values, 0.5) * 1000:8.2f}  p95 {percentile(values, 0.95) * 1000:8.2f}  "
+        f"p99 {percentile(values, 0.99) * 1000:8.2f}  max {max(values, default=0) * 1000:8.2f} мс"
+    )
+
+
+async def prepare_db():
+    async with engine.begin() as conn:
+        if _FRESH_DB:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+    async with async_session() as session:
+        await route_index.load(session)
+
+
+async def replay(args) -> bool:
+    set_gateway(
+        LLMGateway(
+            client=InProcessStubClient(args.llm_latency / 1000, args.llm_latency / 1000 / 5),
+            timeout=10,
+        )
+    )
+    telegram = FakeTelegramSession(latency=args.tg_latency / 1000, jitter=0, global_rate=None, per_chat_interval=None)
+    bot = make_bot(telegram)
+    await prepare_db()
+
+    speed = None if args.speed == "max" else float(args.speed)
+    latencies: list[float] = []
+    lags: list[float] = []
+    errors: Counter[str] = Counter()
+    in_flight = 0
+
+    async def handle(item):
+        nonlocal in_flight
+        update, due = item
+        started = time.perf_counter()
+        lags.append(max(0.0, started - due))
+        try:
+            await dp.feed_raw_update(bot, update)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        finally:
+            latencies.append(time.perf_counter() - started)
+            in_flight -= 1
+
+    serializer = ChatSerializer(handle, args.concurrency)
+    records = iter_recording(recording_files(args.recording))
+    first = next(records, None)
+    if first is None:
+        print("⛔️ Запис порожній")
+        return False
+
+    db_before = pool_metrics(engine).snapshot()
+    t0 = first["t"]
+    started = time.perf_counter()
+    for record in itertools.chain([first], records):
+        due = started
+        if speed:
+            due = started + (record["t"] - t0) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        while in_flight >= args.max_pending:
+            await asyncio.sleep(0.001)
+        in_flight += 1
+        update = record["update"]
+        serializer.submit(chat_of(update), (update, due if speed else time.perf_counter()))
+    await serializer.join()
+    elapsed = time.perf_counter() - started
+    db = pool_metrics(engine).snapshot()
+
+    total = len(latencies)
+    recorded_span = record["t"] - t0
+    print(f"▶️ {total:,} апдейтів за {elapsed:.2f} с ({total / elapsed:,.0f} апд./с); у записі — {recorded_span:.1f} с")
+    print("   " + describe("обробка", latencies))
+    print("   " + describe("затримка", lags))
+    print(
+        f"   БД: {db['queries'] - db_before['queries']:,} запитів "
+        f"({(db['queries'] - db_before['queries']) / total:.2f}/апд.), "
+        f"повільних {db['slow_queries'] - db_before['slow_queries']}, "
+        f"пік з'єднань {db['peak_in_use']}, очікування пулу макс {db['wait_max_ms']:.1f} мс"
+    )
+    telegram_errors = sum(telegram.errors.values())
+    print(
+        f"   Bot API: {sum(telegram.calls.values()):,} викликів, помилок {telegram_errors}; "
+        f"винятків у хендлерах: {sum(errors.values())} {dict(errors) if errors else ''}"
+    )
+    await dp.storage.close()
+    await bot.session.close()
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="файл .jsonl(.gz) або каталог із записами")
+    parser.add_argument("--speed", default="1", help="1, N або max")
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=10_000)
+    parser.add_argument("--llm-latency", type=float, default=300, help="мс")
+    parser.add_argument("--tg-latency", type=float, default=30, help="мс на виклик Bot API")
+    args = parser.parse_args()
+    ok = asyncio.run(replay(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
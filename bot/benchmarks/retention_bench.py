@@ -0,0 +1,202 @@
+# bot/benchmarks/retention_bench.py
+#
+# Архів заявок (bot/services/retention.py, bot/database/partitions.py) на
+# --rows синтетичних заявок у SQLite, з яких живі лише --live-share:
+# - розмір гарячої таблиці з індексами (dbstat) до і після;
+# - затримка типових запитів до і після: стрічка (keyset), пошук за місткістю
+#   (bot/services/capacity.py — без фільтра дати, гортає й мертві рядки),
+#   кількість відкритих заявок, заявка за id;
+# - швидкість перенесення (рядків/с) і найдовша транзакція пачки — стільки
+#   максимум чекає запис бота;
+# - перевірка: view shipment_request_history бачить рівно ті самі заявки.
+# Запуск: python -m bot.benchmarks.retention_bench [--rows 1000000] [--live-share 0.05] [--batch 1000]
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.database.partitions import archive_tables
+from bot.models import Shipment_request, shipment_request_history
+from bot.models.scripts.bulk import TABLES, import_rows
+from bot.models.scripts.fake_data import FakeData
+from bot.services.capacity import loads_within
+from bot.services.feed import open_loads
+from bot.services.retention import archive_batch, compact
+
+
+def aged(fake: FakeData, rows: int, live_share: float):
+    # живі — в найближчі 30 днів, решта — за два роки до now; частина живих уже взята
+    rng = random.Random(11)
+    for row in fake.requests(rows):
+        roll = rng.random()
+        if roll >= live_share:
+            row["date"] = fake.now - timedelta(days=rng.uniform(4, 730))
+            row["status"] = "taken" if rng.random() < 0.6 else "open"
+        elif roll < live_share * 0.2:
+            row["status"] = "taken"
+            row["taken_at"] = fake.now - timedelta(days=rng.uniform(0, 10))
+        if row.get("status") == "taken":
+            row["carrier_telegram_id"] = 700_000_000 + rng.randrange(5000)
+            row.setdefault("taken_at", row["date"] - timedelta(days=1))
+        else:
+            row["status"] = "open"
+            row["carrier_telegram_id"] = None
+            row["taken_at"] = None
+        yield row
+
+
+async def timed(fn, rounds: int = 5):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def hot_size(engine) -> tuple[int, int]:
+    async with engine.connect() as conn:
+        size = await conn.scalar(
+            text(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name = 'shipment_request' "
+                "OR name LIKE 'ix_shipment_request_%' OR name LIKE 'sqlite_autoindex_shipment_request%'"
+            )
+        )
+        rows = await conn.scalar(select(func.count()).select_from(Shipment_request.__table__))
+    return size, rows
+
+
+async def queries(sessionmaker, route_key: str, sample_id: int, now) -> dict[str, float]:
+    result = {}
+    async with sessionmaker() as session:
+        result["стрічка, перша сторінка"], _ = await timed(lambda: open_loads(session, route_key, now=now, days=31))
+        result["пошук за місткістю"], _ = await timed(
+            lambda: loads_within(session, max_kg=20_000, max_pallets=33, route_key=route_key)
+        )
+        result["пошук за місткістю, усі маршрути"], _ = await timed(
+            lambda: loads_within(session, max_kg=5_000, min_kg=4_000)
+        )
+        result["відкритих заявок (count)"], _ = await timed(
+            lambda: session.scalar(
+                select(func.count()).select_from(Shipment_request).where(Shipment_request.status == "open")
+            )
+        )
+        result["заявка за id"], _ = await timed(
+            lambda: session.scalar(select(Shipment_request).where(Shipment_request.id == sample_id))
+        )
+    return result
+
+
+async def run(args) -> bool:
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_retention_bench_")
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp}/retention.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    fake = FakeData(5)
+    now = fake.now
+    started = time.perf_counter()
+    await import_rows(engine, TABLES["shipment_request"], aged(fake, args.rows, args.live_share))
+    print(f"▶️ {args.rows:,} заявок за {time.perf_counter() - started:.1f} с")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with sessionmaker() as session:
+        route_key = await session.scalar(
+            select(Shipment_request.route_key)
+            .group_by(Shipment_request.route_key)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        cutoff = now - timedelta(days=3)
+        live_ids = set(
+            await session.scalars(
+                select(Shipment_request.id).where(
+                    Shipment_request.date >= cutoff,
+                    (Shipment_request.taken_at.is_(None))
+                    | (Shipment_request.taken_at >= cutoff)
+                    | (Shipment_request.date >= now),
+                )
+            )
+        )
+        all_ids_sum, all_count = (
+            await session.execute(select(func.sum(Shipment_request.id), func.count(Shipment_request.id)))
+        ).one()
+    sample_id = next(iter(live_ids))
+
+    size_before, rows_before = await hot_size(engine)
+    before = await queries(sessionmaker, route_key, sample_id, now)
+
+    batches = []
+    moved = 0
+    started = time.perf_counter()
+    while True:
+        batch_started = time.perf_counter()
+        async with sessionmaker() as session:
+            done = await archive_batch(session, now=now, batch_size=args.batch)
+        if not done:
+            break
+        batches.append(time.perf_counter() - batch_started)
+        moved += done
+    elapsed = time.perf_counter() - started
+    await compact(engine)
+
+    size_after, rows_after = await hot_size(engine)
+    after = await queries(sessionmaker, route_key, sample_id, now)
+
+    print(f"\nперенесено {moved:,} рядків за {elapsed:.1f} с — {moved / elapsed:,.0f} рядків/с; "
+          f"пачка {args.batch}: медіана {statistics.median(batches) * 1000:.0f} мс, "
+          f"найдовша {max(batches) * 1000:.0f} мс")
+    async with engine.connect() as conn:
+        months = await conn.run_sync(archive_tables)
+    print(f"місячних таблиць: {len(months)} ({months[0]} … {months[-1]})")
+    print(f"гаряча таблиця з індексами: {size_before / 2**20:,.1f} МБ, {rows_before:,} рядків → "
+          f"{size_after / 2**20:,.1f} МБ, {rows_after:,} рядків")
+
+    print(f"\n{'запит':<36} {'до':>10} {'після':>10}")
+    for name in before:
+        print(f"{name:<36} {before[name] * 1000:8.2f} мс {after[name] * 1000:8.2f} мс")
+
+    ok = True
+    async with sessionmaker() as session:
+        hot_ids = set(await session.scalars(select(Shipment_request.id)))
+        history_sum, history_count = (
+            await session.execute(
+                select(func.sum(shipment_request_history.c.id), func.count(shipment_request_history.c.id))
+            )
+        ).one()
+        archived_route = await session.scalar(
+            select(func.count()).select_from(shipment_request_history).where(
+                shipment_request_history.c.route_key == route_key
+            )
+        )
+    if hot_ids != live_ids:
+        ok = False
+        print(f"⛔️ у гарячій таблиці {len(hot_ids):,} заявок, очікувано {len(live_ids):,}")
+    if (history_sum, history_count) != (all_ids_sum, all_count):
+        ok = False
+        print(f"⛔️ view історії: {history_count:,} заявок замість {all_count:,}")
+    print(f"\n{'✅' if ok else '⛔️'} живих заявок у гарячій таблиці {len(hot_ids):,}; "
+          f"view історії — {history_count:,} з {all_count:,} (маршрут {route_key}: {archived_route:,})")
+    await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--live-share", type=float, default=0.05)
+    parser.add_argument("--batch", type=int, default=1000)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
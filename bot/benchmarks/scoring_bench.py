@@ -0,0 +1,145 @@
+# bot/benchmarks/scoring_bench.py
+#
+# Ранжування перевізників (bot/services/scoring.py) на синтетичних
+# 10k/100k перевізників: мікропачка з --batch заявок за один векторний
+# прохід NumPy проти циклу Python по кожному перевізнику з тією ж формулою.
+# Звіряє top-K обох реалізацій і міряє інкрементальні add/remove.
+# Запуск: python -m bot.benchmarks.scoring_bench [--scales 10000 100000] [--batch 32] [--k 30]
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from bot.geo.gazetteer import get_gazetteer
+from bot.geo.routes import CITY_NAMES, city_key
+from bot.services import scoring
+from bot.services.scoring import CarrierScorer
+
+CAPACITIES = ((1_500, 12, 4), (5_000, 36, 12), (10_000, 50, 18), (20_000, 82, 33), (None, None, None))
+WEIGHTS = (None, 300, 1_200, 2_200, 7_500, 18_000)
+
+
+def python_top_k(carriers: list[tuple], request, k: int, radius: float, now: float) -> list[int]:
+    # той самий бал, але рядок за рядком — як писали б без NumPy
+    req = scoring._endpoints(request.route_key)
+    need = [scoring._need(request.weight_kg), scoring._need(request.volume_m3), scoring._need(request.pallets)]
+    scored = []
+    for telegram_id, route_key, points, capacity, sent, accepted, active in carriers:
+        if any(limit is not None and limit < value for limit, value in zip(capacity, need)):
+            continue
+        distances = []
+        for (lat, lon), (req_lat, req_lon) in zip((points[:2], points[2:]), (req[:2], req[2:])):
+            x = (lon - req_lon) * math.cos((lat + req_lat) * 0.5)
+            distances.append(scoring.EARTH_KM * math.hypot(x, lat - req_lat))
+        same_route = route_key == request.route_key
+        if not same_route and not all(d <= radius for d in distances):
+            continue
+        near = math.exp(-sum(distances) / (2 * radius))
+        if math.isnan(near):
+            near = 0.0
+        score = (
+            scoring.W_ROUTE * same_route
+            + scoring.W_NEAR * near
+            + scoring.W_ACCEPT * (min(accepted, sent) + 1) / (sent + 2)
+            + scoring.W_RECENT * math.exp(-max(now - active, 0) / scoring.RECENT_TAU)
+        )
+        scored.append((score, telegram_id))
+    return [telegram_id for _, telegram_id in heapq.nlargest(k, scored)]
+
+
+def run_scale(n: int, args, cities: list[str]) -> bool:
+    rng = random.Random(n)
+    now = time.time()
+    # популярні міста частіші — як у реальних маршрутах
+    weights = [1 / (i + 1) for i in range(len(cities))]
+    carriers = []
+    for i in range(n):
+        origin, destination = rng.choices(cities, weights, k=2)
+        if origin == destination:
+            continue
+        key = f"{origin}:{destination}"
+        carriers.append(
+            (
+                1_000_000 + i,
+                key,
+                scoring._endpoints(key),
+                rng.choice(CAPACITIES),
+                rng.randint(0, 200),
+                rng.randint(0, 40),
+                now - rng.uniform(0, 60 * 24 * 3600),
+            )
+        )
+
+    scorer = CarrierScorer(radius_km=args.radius, initial=16)
+    started = time.perf_counter()
+    for telegram_id, key, _, capacity, sent, accepted, active in carriers:
+        scorer.add(telegram_id, key, capacity, sent=sent, accepted=accepted, last_active=active)
+    build = time.perf_counter() - started
+
+    requests = []
+    while len(requests) < args.batch:
+        origin, destination = rng.choices(cities, weights, k=2)
+        if origin != destination:
+            weight = rng.choice(WEIGHTS)
+            requests.append(
+                SimpleNamespace(route_key=f"{origin}:{destination}", weight_kg=weight, volume_m3=None, pallets=None)
+            )
+
+    best = float("inf")
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        vectorized = scorer.top_k(requests, args.k, now=now)
+        best = min(best, time.perf_counter() - started)
+
+    loop_requests = requests[: max(1, args.batch // 4)]
+    started = time.perf_counter()
+    looped = [python_top_k(carriers, r, args.k, args.radius, now) for r in loop_requests]
+    loop_per_request = (time.perf_counter() - started) / len(loop_requests)
+
+    # бали float32 проти float64 можуть переставити рівні сусідів — звіряємо множини
+    mismatches = sum(set(a) != set(b) for a, b in zip(vectorized, looped))
+    found = sum(len(ids) for ids in vectorized)
+
+    churn = carriers[: min(1000, len(carriers))]
+    started = time.perf_counter()
+    for telegram_id, *_ in churn:
+        scorer.remove(telegram_id)
+    for telegram_id, key, _, capacity, sent, accepted, active in churn:
+        scorer.add(telegram_id, key, capacity, sent=sent, accepted=accepted, last_active=active)
+    churn_us = (time.perf_counter() - started) / (2 * len(churn)) * 1e6
+
+    per_request = best / len(requests)
+    print(f"\n▶️ {len(carriers):,} перевізників, пачка {len(requests)} заявок, top-{args.k}")
+    print(f"   побудова масивів: {build:.2f} с, add/remove: {churn_us:.1f} мкс; знайдено {found / len(requests):.1f} на заявку")
+    print(
+        f"   NumPy: пачка {best * 1000:.1f} мс ({per_request * 1000:.2f} мс/заявку), "
+        f"цикл Python: {loop_per_request * 1000:.1f} мс/заявку ({loop_per_request / per_request:.0f}×)"
+    )
+    print(f"   {'✅' if not mismatches else '⛔️'} top-K збігається з циклом: {len(looped) - mismatches}/{len(looped)}")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=30)
+    parser.add_argument("--radius", type=float, default=70)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    gazetteer = get_gazetteer()
+    cities = [key for key in map(city_key, CITY_NAMES) if gazetteer.coords(key)]
+    ok = all([run_scale(n, args, cities) for n in args.scales])
+    print(f"\nNumPy: {np.__version__}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
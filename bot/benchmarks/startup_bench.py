@@ -0,0 +1,137 @@
+# bot/benchmarks/startup_bench.py
+#
+# Холодний старт процесу бота (важливо для webhook-воркерів, що
+# масштабуються вгору/вниз):
+# - `python -X importtime -c "import bot.main"`: загальний час і внесок
+#   пакетів верхнього рівня; перевірка, що на імпорті не вантажаться
+#   groq / sentry_sdk (без SENTRY_DSN) / dateparser і немає мережевих викликів;
+# - time-to-first-update: від запуску інтерпретатора до обробленого /start
+#   (імпорт + ensure_schema + один апдейт через Dispatcher з фейковим Telegram)
+#   на новій БД і на вже актуальній (швидка перевірка відбитка схеми).
+# Запуск: python -m bot.benchmarks.startup_bench [--runs 3] [--budget-ms 0]
+# (--budget-ms > 0 — код виходу 1, якщо time-to-first-update на актуальній БД довший)
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+FORBIDDEN = ("groq", "sentry_sdk", "dateparser")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# дочірній процес: старт → перший оброблений апдейт
+CHILD = """
+import asyncio, time
+started = time.perf_counter()
+from bot.main import dp
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot
+from bot.database.database import Base, engine
+from bot.database.migrations import ensure_schema
+from aiogram.types import Update
+imported = time.perf_counter()
+
+async def main():
+    changed = await ensure_schema(engine, Base.metadata)
+    schema = time.perf_counter()
+    bot = make_bot(FakeTelegramSession(latency=0, jitter=0, global_rate=None, per_chat_interval=None))
+    update = Update.model_validate({"update_id": 1, "message": {"message_id": 1, "date": 0,
+        "chat": {"id": 7, "type": "private"}, "from": {"id": 7, "is_bot": False, "first_name": "B"},
+        "text": "/start"}})
+    await dp.feed_update(bot, update)
+    done = time.perf_counter()
+    print(f"RESULT {imported - started} {schema - imported} {done - schema} {int(changed)}")
+    await bot.session.close()
+    await engine.dispose()
+
+asyncio.run(main())
+"""
+
+
+def child_env(db_path: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        BOT_TOKEN="42:FAKE-TOKEN-FOR-BENCHMARKS",
+        DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        FSM_STORAGE="memory",
+        METRICS_PORT="0",
+        # мережа недоступна: будь-який виклик LLM при старті впаде, а не піде в Groq
+        GROQ_BASE_URL="http://127.0.0.1:9",
+    )
+    env.pop("SENTRY_DSN", None)
+    return env
+
+
+def import_breakdown(env: dict, top: int) -> bool:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bot.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    packages: dict[str, int] = defaultdict(int)
+    loaded = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        loaded.add(module.split(".")[0])
+        packages[module.split(".")[0] if not module.startswith("bot.") else ".".join(module.split(".")[:2])] += int(self_us)
+        if module == "bot.main":
+            total = int(cumulative_us)
+
+    print(f"import bot.main (-X importtime): {total / 1000:.0f} мс")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {name:<28} {us / 1000:7.1f} мс")
+    bad = [name for name in FORBIDDEN if name in loaded]
+    print(f"{'⛔️ на імпорті вантажаться: ' + ', '.join(bad) if bad else '✅ groq / sentry_sdk / dateparser не імпортуються на старті'}")
+    return not bad
+
+
+def first_update(env: dict) -> tuple[float, float, float, float, bool]:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    line = next((line for line in result.stdout.splitlines() if line.startswith("RESULT")), None)
+    if line is None:
+        print(result.stdout[-2000:], result.stderr[-2000:])
+        raise SystemExit("⛔️ дочірній процес не обробив апдейт")
+    imported, schema, handled, changed = line.split()[1:]
+    return wall, float(imported), float(schema), float(handled), changed == "1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--budget-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_startup_bench_")
+    env = child_env(f"{tmp}/startup.db")
+    ok = import_breakdown(env, args.top)
+
+    print("\ntime-to-first-update (від запуску інтерпретатора до обробленого /start):")
+    fresh = first_update(env)
+    print(f"   нова БД:      {fresh[0] * 1000:7.0f} мс (імпорт {fresh[1] * 1000:.0f}, схема {fresh[2] * 1000:.0f}, "
+          f"апдейт {fresh[3] * 1000:.0f}; схему створено: {'так' if fresh[4] else 'ні'})")
+    warm = [first_update(env) for _ in range(args.runs)]
+    wall = statistics.median(run[0] for run in warm)
+    print(f"   актуальна БД: {wall * 1000:7.0f} мс медіана з {args.runs} (імпорт "
+          f"{statistics.median(r[1] for r in warm) * 1000:.0f}, схема {statistics.median(r[2] for r in warm) * 1000:.1f}, "
+          f"апдейт {statistics.median(r[3] for r in warm) * 1000:.0f})")
+    if any(run[4] for run in warm):
+        print("⛔️ схема перебудовувалась на актуальній БД")
+        ok = False
+    if args.budget_ms and wall * 1000 > args.budget_ms:
+        print(f"⛔️ довше за бюджет {args.budget_ms:.0f} мс")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
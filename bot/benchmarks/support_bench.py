@@ -0,0 +1,199 @@
+# bot/benchmarks/support_bench.py
+#
+# Чат підтримки (bot/services/support.py) на --sessions сесіях по --messages
+# повідомлень у SQLite:
+# - сторінка історії keyset (session_id, id) проти OFFSET на різній глибині;
+# - пошук активної сесії по (user_id, is_active);
+# - список відкритих сесій з останнім повідомленням: один запит проти 1 + N;
+# - архівація закритих сесій: швидкість, стиснення, розмір гарячих таблиць,
+#   і що історія з архіву збігається з історією до архівації.
+# Запуск: python -m bot.benchmarks.support_bench [--sessions 2000] [--messages 200]
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.database.database import Base
+from bot.database.engine import make_engine
+from bot.models import SupportArchive, SupportMessage, SupportSession
+from bot.services.support import active_session, archive_closed, history, open_sessions
+
+PHRASES = (
+    "Доброго дня, не можу знайти свою заявку",
+    "Перевізник не виходить на зв'язок вже другий день, що робити?",
+    "Дякую, все вирішилось",
+    "Перевірте, будь ласка, номер телефону в профілі",
+    "Як змінити маршрут після реєстрації?",
+)
+
+
+async def timed(fn, rounds: int = 5):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def populate(engine, sessions: int, messages: int):
+    rng = random.Random(1)
+    now = datetime.now()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(SupportSession),
+            [
+                {
+                    "id": i + 1,
+                    "user_id": 10_000 + i,
+                    "is_active": i % 10 == 0,
+                    "created_at": now - timedelta(days=30),
+                    "closed_at": None if i % 10 == 0 else now - timedelta(days=rng.uniform(8, 29)),
+                }
+                for i in range(sessions)
+            ],
+        )
+        batch = []
+        for i in range(sessions * messages):
+            # повідомлення різних сесій перемішані в часі, як у житті
+            batch.append(
+                {
+                    "session_id": rng.randrange(sessions) + 1,
+                    "from_admin": rng.random() < 0.4,
+                    "text": rng.choice(PHRASES),
+                    "created_at": now - timedelta(seconds=sessions * messages - i),
+                }
+            )
+            if len(batch) == 50_000:
+                await conn.execute(insert(SupportMessage), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(SupportMessage), batch)
+
+
+async def run(args) -> bool:
+    tmp = tempfile.mkdtemp(prefix="logistic_bot_support_bench_")
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp}/support.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    started = time.perf_counter()
+    await populate(engine, args.sessions, args.messages)
+    total = args.sessions * args.messages
+    print(f"▶️ {args.sessions:,} сесій, {total:,} повідомлень за {time.perf_counter() - started:.1f} с")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    ok = True
+
+    async with sessionmaker() as session:
+        busiest, count = (
+            await session.execute(
+                select(SupportMessage.session_id, func.count())
+                .group_by(SupportMessage.session_id)
+                .order_by(func.count().desc())
+                .limit(1)
+            )
+        ).one()
+        ids = list(
+            await session.scalars(
+                select(SupportMessage.id).where(SupportMessage.session_id == busiest).order_by(SupportMessage.id.desc())
+            )
+        )
+        print(f"\nісторія сесії #{busiest} ({count} повідомлень, сторінка {args.page_size})")
+        for depth in (0, len(ids) // 2, len(ids) - args.page_size - 1):
+            before = ids[depth - 1] if depth else None
+
+            def by_offset():
+                return session.scalars(
+                    select(SupportMessage)
+                    .where(SupportMessage.session_id == busiest)
+                    .order_by(SupportMessage.id.desc())
+                    .offset(depth)
+                    .limit(args.page_size)
+                )
+
+            offset_time, by_offset_rows = await timed(by_offset)
+            keyset_time, page = await timed(lambda: history(session, busiest, before_id=before, limit=args.page_size))
+            same = [m.id for m in page.items] == [m.id for m in by_offset_rows.all()][::-1]
+            ok &= same
+            print(f"  глибина {depth:>5}: OFFSET {offset_time * 1000:6.2f} мс, keyset {keyset_time * 1000:6.2f} мс"
+                  f"{'' if same else '  ⛔️ сторінки різні'}")
+
+        user_id = 10_000 + (args.sessions // 10) * 10 - 10
+        lookup_time, found = await timed(lambda: active_session(session, user_id))
+        print(f"\nактивна сесія користувача: {lookup_time * 1000:.2f} мс ({'знайдено' if found else '⛔️ немає'})")
+        ok &= found is not None
+
+        joined_time, rows = await timed(lambda: open_sessions(session, limit=50), rounds=3)
+
+        async def n_plus_one():
+            result = []
+            for s in await session.scalars(
+                select(SupportSession).where(SupportSession.is_active).order_by(SupportSession.id.desc()).limit(50)
+            ):
+                last = await session.scalar(
+                    select(SupportMessage)
+                    .where(SupportMessage.session_id == s.id)
+                    .order_by(SupportMessage.id.desc())
+                    .limit(1)
+                )
+                result.append((s, last))
+            return result
+
+        naive_time, naive = await timed(n_plus_one, rounds=3)
+        same = [(s.id, m and m.id) for s, m in rows] == [(s.id, m and m.id) for s, m in naive]
+        ok &= same
+        print(f"відкриті сесії + останнє повідомлення (50): один запит {joined_time * 1000:.1f} мс, "
+              f"1 + N {naive_time * 1000:.1f} мс{'' if same else '  ⛔️ різні'}")
+
+        sample = (await session.scalars(select(SupportSession.id).where(SupportSession.is_active.is_(False)).limit(20))).all()
+        before_archive = {sid: [m.text for m in (await history(session, sid, limit=10_000)).items] for sid in sample}
+
+    async with engine.connect() as conn:
+        raw_bytes = await conn.scalar(select(func.sum(func.length(SupportMessage.text) + 40)))
+    started = time.perf_counter()
+    archived = 0
+    while True:
+        async with sessionmaker() as session:
+            done = await archive_closed(session, datetime.now() - timedelta(days=7), batch_size=args.batch)
+        if not done:
+            break
+        archived += done
+    elapsed = time.perf_counter() - started
+
+    async with sessionmaker() as session:
+        hot = await session.scalar(select(func.count()).select_from(SupportMessage))
+        archive_bytes, archived_messages = (
+            await session.execute(select(func.sum(func.length(SupportArchive.payload)), func.sum(SupportArchive.message_count)))
+        ).one()
+        for sid, texts in before_archive.items():
+            if [m.text for m in (await history(session, sid, limit=10_000)).items] != texts:
+                ok = False
+                print(f"  ⛔️ історія #{sid} після архівації відрізняється")
+                break
+
+    print(f"\nархівація: {archived:,} сесій ({archived_messages:,} повідомлень) за {elapsed:.2f} с, "
+          f"{archived_messages / elapsed:,.0f} повідомлень/с")
+    print(f"   у гарячій таблиці лишилось {hot:,} з {total:,} повідомлень; "
+          f"стиснення ~{raw_bytes * archived_messages / total / archive_bytes:.1f}× ({archive_bytes / 1024:,.0f} КБ)")
+    print("✅ усе збігається" if ok else "⛔️ є розбіжності")
+    await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=200)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# bot/benchmarks/template_bench.py
+#
+# Вартість одного отримувача під час розсилки заявки на --carriers перевізників:
+# старий шлях (f-string + strftime + нова InlineKeyboardMarkup на кожного)
+# проти шаблонів з bot/services/templates.py (текст один раз, клавіатура з кешу).
+# Міряється і сам рендер, і рендер + send_message через FakeTelegramSession
+# (без мережі й лімітів — лишається лише робота aiogram на підготовку запиту).
+# Запуск: python -m bot.benchmarks.template_bench [--carriers 1000] [--rounds 5]
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot
+from bot.services.templates import render_request_card, request_keyboard
+
+
+def legacy_render(request) -> tuple[str, InlineKeyboardMarkup]:
+    # так notifier рендерив повідомлення до появи шаблонів
+    text = f"""📦 <b>Нова заявка на перевезення:</b>
+Маршрут: {request.route}
+Дата подачі: {request.date.strftime("%d %B о %H:%M")}
+Тип вантажу: {request.cargo_type}
+Обʼєм: {request.volume}
+Орієнтовна вага: {request.weight}
+Завантаження: {request.loading}
+Вивантаження: {request.unloading}
+Ціна: {request.price:,} грн"""
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Прийняти рейс", callback_data=f"accept_{request.id}"),
+                InlineKeyboardButton(text="❌ Відмовитись", callback_data=f"decline_{request.id}"),
+            ],
+            [
+                InlineKeyboardButton(
+                    text="💬 Запропонувати іншу ставку",
+                    callback_data=f"negotiate_{request.id}",
+                )
+            ],
+        ]
+    )
+    return text, keyboard
+
+
+def make_request(request_id: int):
+    return SimpleNamespace(
+        id=request_id,
+        route="Київ → Львів",
+        date=datetime(2025, 7, 20, 10, 0),
+        cargo_type="Побутова техніка, упакована на палетах",
+        volume="6 палет",
+        weight="2.2 т",
+        loading="Рокла, рампа",
+        unloading="Ручне",
+        price=8000,
+        version=1,
+    )
+
+
+def per_recipient(fn, carriers: int, rounds: int) -> float:
+    best = float("inf")
+    for r in range(rounds):
+        started = time.perf_counter()
+        fn(make_request(r + 1), carriers)
+        best = min(best, time.perf_counter() - started)
+    return best / carriers
+
+
+def render_legacy(request, carriers: int):
+    for _ in range(carriers):
+        legacy_render(request)
+
+
+def render_templates(request, carriers: int):
+    for _ in range(carriers):
+        render_request_card(request), request_keyboard(request.id, request.version)
+
+
+async def send_all(bot, carriers: int, rounds: int, render) -> float:
+    best = float("inf")
+    for r in range(rounds):
+        request = make_request(1000 + r)
+        started = time.perf_counter()
+        for chat_id in range(carriers):
+            text, keyboard = render(request)
+            await bot.send_message(chat_id, text, reply_markup=keyboard)
+        best = min(best, time.perf_counter() - started)
+    return best / carriers
+
+
+async def run(args):
+    legacy = per_recipient(render_legacy, args.carriers, args.rounds)
+    templated = per_recipient(render_templates, args.carriers, args.rounds)
+    print(f"рендер на отримувача:          було {legacy * 1e6:7.2f} мкс, стало {templated * 1e6:7.2f} мкс ({legacy / templated:.1f}×)")
+
+    bot = make_bot(FakeTelegramSession(latency=0, jitter=0, global_rate=None, per_chat_interval=None))
+    legacy = await send_all(bot, args.carriers, args.rounds, legacy_render)
+    templated = await send_all(
+        bot, args.carriers, args.rounds, lambda r: (render_request_card(r), request_keyboard(r.id, r.version))
+    )
+    print(f"рендер + send_message:         було {legacy * 1e6:7.2f} мкс, стало {templated * 1e6:7.2f} мкс ({legacy / templated:.1f}×)")
+    print(f"розсилка на {args.carriers} перевізників: було {legacy * args.carriers * 1e3:.1f} мс CPU, стало {templated * args.carriers * 1e3:.1f} мс")
+    print(f"приклад: {render_request_card(make_request(1)).splitlines()[2]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
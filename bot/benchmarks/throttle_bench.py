@@ -0,0 +1,224 @@
+# bot/benchmarks/throttle_bench.py
+#
+# Ліміт апдейтів на користувача (bot/services/throttle.py, bot/middlewares/throttle.py)
+# з --users відстежуваними користувачами:
+# - пам'ять таблиці відер проти OrderedDict {id: (токени, час)} тієї ж місткості;
+# - acquire() для нового і для вже відомого користувача;
+# - ThrottleMiddleware на апдейт і повний прохід через Dispatcher з нею і без неї;
+# - збіг рішень GCRA з класичним token bucket на випадковому потоці;
+# - флуд кроком дати анкети: скільки апдейтів доходить до хендлера.
+# Понад --budget-us на апдейт — код виходу 1.
+# Запуск: python -m bot.benchmarks.throttle_bench [--users 1000000] [--budget-us 5]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+os.environ.setdefault("BOT_TOKEN", "42:FAKE-TOKEN-FOR-BENCHMARKS")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from aiogram import Dispatcher, Router  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+from aiogram.types import Message, Update  # noqa: E402
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot  # noqa: E402
+from bot.middlewares.throttle import EXPENSIVE, ThrottleMiddleware  # noqa: E402
+from bot.services.throttle import TokenBuckets  # noqa: E402
+
+BASE_ID = 300_000_000
+
+
+def update(n: int, user_id: int, text: str = "привіт") -> Update:
+    return Update.model_validate(
+        {
+            "update_id": n,
+            "message": {
+                "message_id": n,
+                "date": 0,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+                "text": text,
+            },
+        }
+    )
+
+
+def memory(users: int) -> tuple[int, int]:
+    tracemalloc.start()
+    buckets = TokenBuckets(capacity=users)
+    for i in range(users):
+        buckets.acquire(BASE_ID + i, 1, now=1.0)
+    table = tracemalloc.get_traced_memory()[0]
+    del buckets
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    naive: OrderedDict[int, tuple[float, float]] = OrderedDict()
+    for i in range(users):
+        naive[BASE_ID + i] = (9.0, 1.0 + i * 1e-9)
+    ordered = tracemalloc.get_traced_memory()[0]
+    del naive
+    tracemalloc.stop()
+    return table, ordered
+
+
+class ClassicBucket:
+    # еталон: явні токени і час останнього поповнення
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.state: dict[int, tuple[float, float]] = {}
+
+    def acquire(self, user_id, cost, now) -> bool:
+        tokens, last = self.state.get(user_id, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens + 1e-9 < cost:
+            self.state[user_id] = (tokens, now)
+            return False
+        self.state[user_id] = (tokens - cost, now)
+        return True
+
+
+def equivalence(events: int) -> int:
+    rng = random.Random(7)
+    buckets, classic = TokenBuckets(rate=1.0, burst=10, capacity=4096), ClassicBucket(1.0, 10)
+    now, mismatches = 100.0, 0
+    for _ in range(events):
+        now += rng.expovariate(8)
+        user_id = BASE_ID + rng.randrange(50)
+        cost = rng.choice((1, 1, 1, 2, 5))
+        mismatches += (buckets.acquire(user_id, cost, now=now) == 0) != classic.acquire(user_id, cost, now)
+    return mismatches
+
+
+async def run(args) -> bool:
+    ok = True
+    table, ordered = memory(args.users)
+    print(f"пам'ять на {args.users:,} користувачів: таблиця відер {table / 2**20:.1f} МБ "
+          f"({table / args.users:.0f} Б/користувача), OrderedDict {ordered / 2**20:.1f} МБ "
+          f"({ordered / args.users:.0f} Б/користувача)")
+
+    buckets = TokenBuckets(capacity=args.users)
+    ids = [BASE_ID + i for i in range(args.users)]
+    started = time.perf_counter()
+    for user_id in ids:
+        buckets.acquire(user_id, 1)
+    new_cost = (time.perf_counter() - started) / len(ids) * 1e6
+    sample = random.Random(3).sample(ids, min(len(ids), 200_000))
+    started = time.perf_counter()
+    for user_id in sample:
+        buckets.acquire(user_id, 1)
+    known_cost = (time.perf_counter() - started) / len(sample) * 1e6
+    print(f"acquire(): новий користувач {new_cost:.2f} мкс, відомий {known_cost:.2f} мкс; "
+          f"витіснено {buckets.stats['evicted']:,} з {args.users:,} (набори по 4 слоти)")
+
+    middleware = ThrottleMiddleware(buckets)
+    events = [update(i, user_id) for i, user_id in enumerate(sample[: args.updates])]
+
+    class User:
+        def __init__(self, id):
+            self.id = id
+
+    datas = [{"event_from_user": User(e.message.from_user.id), "raw_state": None} for e in events]
+
+    async def handler(event, data):
+        return None
+
+    async def direct():
+        for event, data in zip(events, datas):
+            await handler(event, data)
+
+    async def wrapped():
+        for event, data in zip(events, datas):
+            await middleware(handler, event, data)
+
+    def best(values):
+        return min(values) / len(events) * 1e6
+
+    base, with_throttle = [], []
+    for _ in range(5):
+        started = time.perf_counter()
+        await direct()
+        base.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        await wrapped()
+        with_throttle.append(time.perf_counter() - started)
+    overhead = best(with_throttle) - best(base)
+    print(f"ThrottleMiddleware: +{overhead:.2f} мкс на апдейт (таблиця з {args.users:,} користувачами)")
+
+    bot = make_bot(FakeTelegramSession(latency=0, jitter=0, global_rate=None, per_chat_interval=None))
+    timings = {}
+    for label, throttle in (("без ліміту", False), ("з лімітом", True)):
+        dp = Dispatcher(storage=MemoryStorage())
+        router = Router()
+
+        @router.message()
+        async def echo(message: Message):
+            return None
+
+        dp.include_router(router)
+        if throttle:
+            dp.update.outer_middleware(ThrottleMiddleware(buckets))
+        runs = []
+        for _ in range(3):
+            started = time.perf_counter()
+            for item in events[:5000]:
+                await dp.feed_update(bot, item)
+            runs.append(time.perf_counter() - started)
+        timings[label] = min(runs) / 5000 * 1e6
+    print(f"Dispatcher.feed_update: {timings['без ліміту']:.1f} → {timings['з лімітом']:.1f} мкс на апдейт")
+
+    mismatches = equivalence(args.events)
+    ok &= mismatches == 0
+    print(f"{'✅' if not mismatches else '⛔️'} GCRA проти класичного token bucket: "
+          f"{mismatches} розбіжностей на {args.events:,} запитах")
+
+    # флуд кроком дати: 100 повідомлень за мить, кожне коштувало б виклик LLM
+    handled = 0
+    flood = TokenBuckets(capacity=1024)
+    dp = Dispatcher(storage=MemoryStorage())
+    router = Router()
+
+    @router.message()
+    async def date_step(message: Message):
+        nonlocal handled
+        handled += 1
+
+    dp.include_router(router)
+    dp.update.outer_middleware(ThrottleMiddleware(flood))
+    session = bot.session
+    flooder = 777
+    await dp.storage.set_state(
+        key=dp.fsm.get_context(bot, chat_id=flooder, user_id=flooder).key, state="ClientApplicationFSM:date"
+    )
+    replies = len(session.sent)
+    for i in range(100):
+        await dp.feed_update(bot, update(i, flooder, "20 липня"))
+    replies = len(session.sent) - replies
+    expected = int(flood.burst // EXPENSIVE)
+    ok &= handled == expected and replies == 1
+    print(f"{'✅' if handled == expected and replies == 1 else '⛔️'} флуд кроком дати: 100 повідомлень → "
+          f"{handled} до хендлера (очікувано {expected}), {replies} відповідь \"зачекайте\"")
+
+    await bot.session.close()
+    ok &= overhead <= args.budget_us
+    print(f"{'✅' if overhead <= args.budget_us else '⛔️'} накладні витрати +{overhead:.2f} мкс "
+          f"(бюджет {args.budget_us} мкс)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--budget-us", type=float, default=5.0)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
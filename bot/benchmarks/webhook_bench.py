@@ -0,0 +1,187 @@
+# bot/benchmarks/webhook_bench.py
+#
+# Навантажувальний тест webhook-режиму: піднімає python -m bot.webhook
+# з 1/2/4/8 воркерами, шле синтетичні Update JSON і міряє, скільки
+# апдейтів за секунду обробляється від першого POST до останнього feed_update.
+# Воркери використовують фейкову Telegram-сесію і хендлер з CPU-навантаженням
+# (парсер дат + --cpu-ms "бізнес-логіки"); порядок апдейтів кожного чату
+# перевіряється номером у тексті.
+# Запуск: python -m bot.benchmarks.webhook_bench [--workers 1 2 4 8] [--updates 20000]
+#
+# Масштабування упирається в кількість ядер машини: на 1 ядрі більше
+# воркерів лише додають накладні витрати.
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from bot.benchmarks.fake_session import FakeTelegramSession, make_bot
+
+TEXTS = ["завтра", "20.07 о 10:00", "в понеділок вранці", "через 3 дні", "post-jump 14:30", "/start"]
+
+
+@asynccontextmanager
+async def bench_worker():
+    # фабрика воркера для bot/webhook.py: окремий dp без БД
+    from aiogram import Dispatcher, F
+    from aiogram.types import Message
+
+    from bot.ai_helper.date_rules import parse_date_rules
+
+    cpu_seconds = float(os.getenv("WEBHOOK_BENCH_CPU_MS", "1")) / 1000
+    last_seq: dict[int, int] = {}
+    stats = {"violations": 0}
+
+    dp = Dispatcher()
+
+    @dp.message(F.text)
+    async def handle(message: Message):
+        seq, _, text = message.text.partition("|")
+        seq = int(seq)
+        if seq != last_seq.get(message.chat.id, -1) + 1:
+            stats["violations"] += 1
+        last_seq[message.chat.id] = seq
+
+        parsed = parse_date_rules(text)
+        deadline = time.perf_counter() + cpu_seconds
+        while time.perf_counter() < deadline:
+            pass
+        await message.answer(f"📅 {parsed:%d.%m.%Y %H:%M}" if parsed else "⛔️ Не вдалося розпізнати дату")
+
+    session = FakeTelegramSession(latency=0.02, jitter=0.005, global_rate=None, per_chat_interval=None)
+    bot = make_bot(session)
+    try:
+        yield bot, dp
+    finally:
+        print(f"BENCH violations={stats['violations']} chats={len(last_seq)}", flush=True)
+
+
+def make_update(update_id: int, chat_id: int, seq: int, text: str) -> dict:
+    user = {"id": chat_id, "is_bot": False, "first_name": "Bench"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": user,
+            "text": f"{seq}|{text}",
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until(session, url, check, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                data = await response.json()
+                if check(response.status, data):
+                    return data
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.05)
+    raise TimeoutError(url)
+
+
+async def load(port: int, updates: int, chats: int, concurrency: int) -> tuple[float, float]:
+    base = f"http://127.0.0.1:{port}"
+    rng = random.Random(updates)
+    seq: dict[int, int] = {}
+    payloads = []
+    for update_id in range(updates):
+        chat_id = 100_000 + rng.randrange(chats)
+        seq[chat_id] = seq.get(chat_id, -1) + 1
+        payloads.append(make_update(update_id, chat_id, seq[chat_id], rng.choice(TEXTS)))
+
+    async with aiohttp.ClientSession() as session:
+        await wait_until(session, f"{base}/readyz", lambda status, _: status == 200, 60)
+        started = time.perf_counter()
+        # один відправник на чат-шард клієнта, щоб зберегти порядок POST-ів у межах чату,
+        # як це робить Telegram (наступний апдейт чату — після відповіді на попередній)
+        by_lane: dict[int, list[dict]] = {}
+        for payload in payloads:
+            by_lane.setdefault(payload["message"]["chat"]["id"] % concurrency, []).append(payload)
+
+        async def sender(lane: list[dict]):
+            for payload in lane:
+                while True:
+                    async with session.post(f"{base}/webhook", json=payload) as response:
+                        if response.status == 200:
+                            break
+                    await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(sender(lane) for lane in by_lane.values()))
+        accepted = time.perf_counter() - started
+
+        def done(_, data):
+            return sum(w["processed"] for w in data["workers"]) >= updates
+
+        await wait_until(session, f"{base}/healthz", done, 600)
+        processed = time.perf_counter() - started
+    return accepted, processed
+
+
+def run_workers(workers: int, args) -> bool:
+    port = free_port()
+    env = dict(os.environ, WEBHOOK_BENCH_CPU_MS=str(args.cpu_ms), WEBHOOK_URL="", WEBHOOK_SECRET="")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "bot.webhook",
+            "--workers", str(workers),
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--factory", "bot.benchmarks.webhook_bench:bench_worker",
+        ],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        accepted, processed = asyncio.run(load(port, args.updates, args.chats, args.concurrency))
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=60)
+
+    violations = sum(
+        int(line.split("violations=")[1].split()[0]) for line in output.splitlines() if line.startswith("BENCH ")
+    )
+    print(
+        f"{workers} воркер(ів): прийом {args.updates / accepted:,.0f} апд./с, "
+        f"обробка {args.updates / processed:,.0f} апд./с ({processed:.2f} с), "
+        f"{'✅ порядок у чатах збережено' if violations == 0 else f'⛔️ порушень порядку: {violations}'}"
+    )
+    return violations == 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--chats", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--cpu-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"ядер: {os.cpu_count()}, апдейтів: {args.updates}, чатів: {args.chats}, CPU на апдейт: {args.cpu_ms} мс")
+    ok = all([run_workers(n, args) for n in args.workers])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
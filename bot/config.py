@@ -4,5 +4,114 @@ import os
 load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./local.db")  # default SQLite
 SENTRY_DSN = os.getenv("SENTRY_DSN")
+# частка апдейтів з трасуванням: 1.0 на нашому трафіку — дорого
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.01"))
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # напр. http://127.0.0.1:8090 для stub-сервера
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "10"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+# невдала спроба відкладає рядок на OUTBOX_RETRY_DELAY · 2^(спроба − 1) с, не довше OUTBOX_RETRY_MAX_DELAY
+OUTBOX_RETRY_DELAY = float(os.getenv("OUTBOX_RETRY_DELAY", "30"))
+OUTBOX_RETRY_MAX_DELAY = float(os.getenv("OUTBOX_RETRY_MAX_DELAY", "900"))
+
+ROUTE_INDEX_REFRESH = float(os.getenv("ROUTE_INDEX_REFRESH", "300"))
+CORRIDOR_RADIUS_KM = float(os.getenv("CORRIDOR_RADIUS_KM", "70"))
+# розсилка хвилями (bot/services/scoring.py): спершу найкращі MATCH_WAVE_SIZE
+# перевізників, наступні — через кожні MATCH_WAVE_DELAY с; 0 — усім одразу
+MATCH_WAVE_SIZE = int(os.getenv("MATCH_WAVE_SIZE", "30"))
+MATCH_WAVE_DELAY = float(os.getenv("MATCH_WAVE_DELAY", "60"))
+# ранжування заявок, що прийшли майже одночасно, — однією мікропачкою до SCORING_BATCH_SIZE
+# заявок, зібраною за SCORING_BATCH_WINDOW с (стільки найбільше чекає notify_carriers)
+SCORING_BATCH_WINDOW = float(os.getenv("SCORING_BATCH_WINDOW", "0.005"))
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "32"))
+# зведення для перевізників з /digest (bot/services/digest.py): скільки секунд
+# нові заявки додаються в одне повідомлення і не частіше ніж раз на скільки секунд його редагувати
+DIGEST_WINDOW = float(os.getenv("DIGEST_WINDOW", "600"))
+DIGEST_EDIT_INTERVAL = float(os.getenv("DIGEST_EDIT_INTERVAL", "60"))
+# підказка ціни на кроці price (bot/services/price_stats.py): з якої кількості заявок
+# на маршруті її показувати, як часто доганяти заявки інших процесів і зберігати знімок
+PRICE_HINT_MIN_COUNT = int(os.getenv("PRICE_HINT_MIN_COUNT", "5"))
+PRICE_STATS_REFRESH = float(os.getenv("PRICE_STATS_REFRESH", "300"))
+
+# memory | db | redis
+FSM_STORAGE = os.getenv("FSM_STORAGE", "db")
+FSM_TTL_SECONDS = int(os.getenv("FSM_TTL_SECONDS", str(7 * 24 * 3600)))
+FSM_FLUSH_DELAY = float(os.getenv("FSM_FLUSH_DELAY", "0.05"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# webhook-режим: python -m bot.webhook
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # публічна адреса, напр. https://bot.example.com
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", str(os.cpu_count() or 1)))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+WEBHOOK_WORKER_CONCURRENCY = int(os.getenv("WEBHOOK_WORKER_CONCURRENCY", "256"))
+
+# пул і тюнінг БД (bot/database/engine.py)
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_SLOW_QUERY_SAMPLE = float(os.getenv("DB_SLOW_QUERY_SAMPLE", "1.0"))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# стрічка відкритих заявок для перевізників (bot/handlers/carrier/feed.py)
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "5"))
+FEED_WINDOW_DAYS = int(os.getenv("FEED_WINDOW_DAYS", "14"))
+
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "600"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "100000"))
+
+# ліміт апдейтів на користувача (bot/middlewares/throttle.py): токенів за секунду і
+# розмір відра; крок дати анкети коштує 5, звичайне повідомлення — 1
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "1"))
+THROTTLE_BURST = float(os.getenv("THROTTLE_BURST", "10"))
+# слотів у таблиці відер (24 байти кожен); потрібні лише користувачам, активним
+# за останні THROTTLE_BURST / THROTTLE_RATE секунд
+THROTTLE_CAPACITY = int(os.getenv("THROTTLE_CAPACITY", str(2**18)))
+
+# запис вхідного трафіку для replay (bot/middlewares/recorder.py)
+RECORD_UPDATES = os.getenv("RECORD_UPDATES", "0") == "1"
+RECORD_DIR = os.getenv("RECORD_DIR", "recordings")
+RECORD_SALT = os.getenv("RECORD_SALT")  # обов'язковий з RECORD_UPDATES=1: псевдоніми спільні для всіх процесів
+
+# підтримка (bot/handlers/common/support.py): чат адмінів, куди пересилаються звернення
+SUPPORT_CHAT_ID = int(os.getenv("SUPPORT_CHAT_ID")) if os.getenv("SUPPORT_CHAT_ID") else None
+SUPPORT_PAGE_SIZE = int(os.getenv("SUPPORT_PAGE_SIZE", "10"))
+# закриті сесії старші за стільки днів переносяться в support_archive
+SUPPORT_ARCHIVE_AFTER_DAYS = float(os.getenv("SUPPORT_ARCHIVE_AFTER_DAYS", "7"))
+SUPPORT_ARCHIVE_INTERVAL = float(os.getenv("SUPPORT_ARCHIVE_INTERVAL", "3600"))
+SUPPORT_ARCHIVE_BATCH = int(os.getenv("SUPPORT_ARCHIVE_BATCH", "200"))
+
+# архів заявок (bot/services/retention.py): через стільки днів після дати подачі
+# (або після того, як заявку взяли) вона переїжджає в shipment_request_YYYYMM
+REQUEST_ARCHIVE_AFTER_DAYS = float(os.getenv("REQUEST_ARCHIVE_AFTER_DAYS", "3"))
+REQUEST_ARCHIVE_INTERVAL = float(os.getenv("REQUEST_ARCHIVE_INTERVAL", "3600"))
+# рядків за транзакцію; між пачками — пауза, щоб не тримати запис довго
+REQUEST_ARCHIVE_BATCH = int(os.getenv("REQUEST_ARCHIVE_BATCH", "1000"))
+REQUEST_ARCHIVE_PAUSE = float(os.getenv("REQUEST_ARCHIVE_PAUSE", "0.05"))
+
+# метрики Prometheus (bot/services/metrics.py); 0 — не піднімати ендпоінт
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+# скільки різних форм SQL-запитів тримати окремими серіями
+METRICS_MAX_QUERIES = int(os.getenv("METRICS_MAX_QUERIES", "300"))
@@ -1,10 +1,12 @@
 import asyncio
 from bot.database.database import engine, Base
+from bot.database.migrations import ensure_schema
 
 
 async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    import bot.models  # noqa: F401 — реєструє таблиці в Base.metadata
+
+    await ensure_schema(engine, Base.metadata, force=True)
     print("✅ DB initialized!")
 
 
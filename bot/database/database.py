@@ -1,13 +1,11 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-import os
 from collections.abc import AsyncGenerator  # Python 3.10+
 
-DATABASE_URL = os.getenv(
-    "DATABASE_URL", "sqlite+aiosqlite:///./local.db"
-)  # default SQLite
+from bot import config
+from bot.database.engine import make_engine
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = make_engine(config.DATABASE_URL)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
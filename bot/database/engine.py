@@ -0,0 +1,166 @@
+# bot/database/engine.py
+#
+# Фабрика async-двигуна з налаштуваннями під бекенд:
+# - Postgres (asyncpg): пул, pre-ping, recycle, кеш prepared statements;
+# - SQLite (aiosqlite): WAL, synchronous=NORMAL, busy_timeout, mmap.
+# Замість echo=True — лог повільних запитів (понад DB_SLOW_QUERY_MS) з
+# семплюванням, а пул рахує видачі з'єднань і час очікування на них.
+# Метрики: pool_metrics(engine).snapshot(); тривалість кожного запиту за
+# відбитком SQL — у bot/services/metrics.py (/metrics).
+
+import random
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from bot import config
+from bot.services.metrics import observe_query
+
+_metrics: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waited = 0  # видачі, що чекали довше за 1 мс
+        self.timeouts = 0
+        self.queries = 0
+        self.slow_queries = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+            "waited": self.waited,
+            "timeouts": self.timeouts,
+            "queries": self.queries,
+            "slow_queries": self.slow_queries,
+        }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.timeouts += 1
+            raise
+        if self.metrics:
+            waited = time.perf_counter() - started
+            m = self.metrics
+            m.checkouts += 1
+            m.in_use += 1
+            m.peak_in_use = max(m.peak_in_use, m.in_use)
+            m.wait_total += waited
+            m.wait_max = max(m.wait_max, waited)
+            if waited > 0.001:
+                m.waited += 1
+        return record
+
+    def _do_return_conn(self, record):
+        if self.metrics:
+            self.metrics.in_use -= 1
+        super()._do_return_conn(record)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def normalize_url(url: str):
+    url = make_url(url)
+    # postgres:// і postgresql:// (як у Heroku/Render) → asyncpg
+    if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def make_engine(url: str | None = None, **overrides) -> AsyncEngine:
+    url = normalize_url(url or config.DATABASE_URL)
+    metrics = PoolMetrics()
+    kwargs = {"echo": config.DB_ECHO}
+
+    if url.get_backend_name() == "postgresql":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(config.DB_STATEMENT_CACHE_SIZE)}
+        )
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+            # 0 — якщо перед Postgres стоїть pgbouncer у transaction-режимі
+            connect_args={"statement_cache_size": config.DB_STATEMENT_CACHE_SIZE},
+        )
+    elif url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+
+    kwargs.update(overrides)
+    engine = create_async_engine(url, **kwargs)
+    pool = engine.sync_engine.pool
+    if isinstance(pool, TimedQueuePool):
+        pool.metrics = metrics
+    _metrics[engine.sync_engine] = metrics
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+    _install_slow_query_log(engine, metrics)
+    return engine
+
+
+def pool_metrics(engine: AsyncEngine) -> PoolMetrics:
+    return _metrics[engine.sync_engine]
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL: читачі не блокують писача; NORMAL безпечний у WAL (fsync лише на checkpoint)
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def _install_slow_query_log(engine: AsyncEngine, metrics: PoolMetrics):
+    threshold = config.DB_SLOW_QUERY_MS / 1000
+    sample = config.DB_SLOW_QUERY_SAMPLE
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        metrics.queries += 1
+        observe_query(statement, elapsed)
+        if elapsed >= threshold:
+            metrics.slow_queries += 1
+            if random.random() < sample:
+                print(f"🐢 Повільний запит {elapsed * 1000:.0f} мс: {' '.join(statement.split())[:500]}")
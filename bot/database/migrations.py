@@ -0,0 +1,366 @@
+# bot/database/migrations.py
+#
+# create_all створює лише нові таблиці, а колонки/індекси в уже існуючих
+# таблицях не чіпає. Тут — послідовні міграції для існуючих БД.
+# Номер застосованої версії зберігається в таблиці schema_version.
+#
+# Старт процесу (ensure_schema) не рефлектує таблиці: один SELECT останньої
+# версії і відбитка схеми (хеш таблиць/колонок/індексів з Base.metadata).
+# Лише якщо вони не збіглися — create_all + upgrade і новий відбиток.
+
+import hashlib
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from bot.geo.routes import make_route_key, parse_route
+from bot.services.units import parse_batch, parse_volume, parse_weight
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def add_column(conn: Connection, table: str, column_ddl: str):
+    name = column_ddl.split()[0]
+    if name not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_ddl}"))
+
+
+def _0001_carrier_is_active(conn: Connection):
+    add_column(conn, "carriers", "is_active BOOLEAN NOT NULL DEFAULT TRUE")
+
+
+def backfill_route_keys(conn: Connection, table: str, batch_size: int = 1000):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                f"SELECT id, route FROM {table} "
+                "WHERE id > :last_id AND route_key IS NULL ORDER BY id LIMIT :n"
+            ),
+            {"last_id": last_id, "n": batch_size},
+        ).all()
+        if not rows:
+            return
+        updates = []
+        for row_id, route in rows:
+            origin, destination = parse_route(route or "")
+            if origin:
+                updates.append(
+                    {
+                        "id": row_id,
+                        "origin": origin,
+                        "destination": destination,
+                        "key": make_route_key(origin, destination),
+                    }
+                )
+        if updates:
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET origin_key = :origin, "
+                    "destination_key = :destination, route_key = :key WHERE id = :id"
+                ),
+                updates,
+            )
+        last_id = rows[-1][0]
+
+
+def _0002_route_keys(conn: Connection):
+    for table in ("carriers", "shipment_request"):
+        add_column(conn, table, "origin_key VARCHAR(64)")
+        add_column(conn, table, "destination_key VARCHAR(64)")
+        add_column(conn, table, "route_key VARCHAR(128)")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_route_key ON {table} (route_key)"))
+        backfill_route_keys(conn, table)
+
+
+def backfill_units(conn: Connection, table: str, source: str, parse_row, batch_size: int = 5000):
+    # keyset-прохід по рядках із сирим текстом; кожна порція —
+    # один batch-розбір колонки і один executemany
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                f"SELECT id, {source} FROM {table} "
+                f"WHERE id > :last_id AND {source} IS NOT NULL ORDER BY id LIMIT :n"
+            ),
+            {"last_id": last_id, "n": batch_size},
+        ).all()
+        if not rows:
+            return
+        updates = parse_row([row[0] for row in rows], [row[1] for row in rows])
+        if updates:
+            columns = ", ".join(f"{name} = :{name}" for name in updates[0] if name != "id")
+            conn.execute(text(f"UPDATE {table} SET {columns} WHERE id = :id"), updates)
+        last_id = rows[-1][0]
+
+
+def _request_units(ids: list[int], volumes: list[str]) -> list[dict]:
+    return [
+        {"id": row_id, "volume_m3": volume.m3, "pallets": volume.pallets}
+        for row_id, volume in zip(ids, parse_batch(volumes, parse_volume))
+    ]
+
+
+def _request_weights(ids: list[int], weights: list[str]) -> list[dict]:
+    return [
+        {"id": row_id, "weight_kg": weight}
+        for row_id, weight in zip(ids, parse_batch(weights, parse_weight))
+    ]
+
+
+def _carrier_capacity(ids: list[int], values: list[str]) -> list[dict]:
+    return [
+        {
+            "id": row_id,
+            "capacity_kg": weight,
+            "capacity_m3": volume.m3,
+            "capacity_pallets": volume.pallets,
+        }
+        for row_id, weight, volume in zip(
+            ids, parse_batch(values, parse_weight), parse_batch(values, parse_volume)
+        )
+    ]
+
+
+def _0003_typed_units(conn: Connection):
+    add_column(conn, "shipment_request", "weight_kg FLOAT")
+    add_column(conn, "shipment_request", "volume_m3 FLOAT")
+    add_column(conn, "shipment_request", "pallets INTEGER")
+    add_column(conn, "shipment_request", "price_currency VARCHAR(3) NOT NULL DEFAULT 'UAH'")
+    add_column(conn, "carriers", "capacity VARCHAR(255)")
+    add_column(conn, "carriers", "capacity_kg FLOAT")
+    add_column(conn, "carriers", "capacity_m3 FLOAT")
+    add_column(conn, "carriers", "capacity_pallets INTEGER")
+    for table, column in (
+        ("shipment_request", "weight_kg"),
+        ("shipment_request", "volume_m3"),
+        ("shipment_request", "pallets"),
+        ("carriers", "capacity_kg"),
+    ):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"))
+    backfill_units(conn, "shipment_request", "weight", _request_weights)
+    backfill_units(conn, "shipment_request", "volume", _request_units)
+    backfill_units(conn, "carriers", "capacity", _carrier_capacity)
+
+
+def _0004_feed_indexes(conn: Connection):
+    # client_telegram_id був unique=True — один клієнт міг мати лише одну заявку
+    indexes = {index["name"]: index for index in inspect(conn).get_indexes("shipment_request")}
+    old = indexes.get("ix_shipment_request_client_telegram_id")
+    if old is None or old["unique"]:
+        conn.execute(text("DROP INDEX IF EXISTS ix_shipment_request_client_telegram_id"))
+        conn.execute(
+            text("CREATE INDEX ix_shipment_request_client_telegram_id ON shipment_request (client_telegram_id)")
+        )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_shipment_request_route_date_id "
+            "ON shipment_request (route_key, date, id)"
+        )
+    )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_shipment_request_date_id ON shipment_request (date, id)"))
+
+
+def _0005_request_status(conn: Connection):
+    add_column(conn, "shipment_request", "status VARCHAR(16) NOT NULL DEFAULT 'open'")
+    add_column(conn, "shipment_request", "version INTEGER NOT NULL DEFAULT 1")
+    add_column(conn, "shipment_request", "carrier_telegram_id BIGINT")
+    add_column(conn, "shipment_request", "taken_at TIMESTAMP")
+    add_column(conn, "notification_outbox", "message_id BIGINT")
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_shipment_request_carrier_telegram_id "
+            "ON shipment_request (carrier_telegram_id)"
+        )
+    )
+
+
+def _0006_outbox_waves(conn: Connection):
+    add_column(conn, "notification_outbox", "send_after TIMESTAMP")
+
+
+def _0007_support(conn: Connection):
+    add_column(conn, "support_sessions", "closed_at TIMESTAMP")
+    add_column(conn, "support_messages", "admin_message_id BIGINT")
+    if conn.dialect.name == "postgresql":
+        # telegram_id не влазить в INTEGER
+        conn.execute(text("ALTER TABLE support_sessions ALTER COLUMN user_id TYPE BIGINT"))
+    for ddl in (
+        "ix_support_sessions_user_active ON support_sessions (user_id, is_active)",
+        "ix_support_sessions_closed_at ON support_sessions (closed_at)",
+        "ix_support_messages_session_id_id ON support_messages (session_id, id)",
+        "ix_support_messages_admin_message_id ON support_messages (admin_message_id)",
+    ):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {ddl}"))
+
+
+def _0008_request_archive(conn: Connection):
+    # заявки переїжджають у місячні архіви (bot/database/partitions.py), а відповіді
+    # перевізників і outbox лишаються на місці — зовнішній ключ на shipment_request
+    # заважав би видаленню. SQLite їх не перевіряє (PRAGMA foreign_keys вимкнено).
+    import bot.models  # noqa: F401
+    from bot.database.partitions import refresh_history_view
+    from bot.models import Shipment_request
+
+    if conn.dialect.name == "postgresql":
+        for table in ("request_responses", "notification_outbox"):
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_request_id_fkey"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_shipment_request_taken_at ON shipment_request (taken_at)"))
+    refresh_history_view(conn, Shipment_request.__table__)
+
+
+def _0009_digests(conn: Connection):
+    # таблицю notification_digests створює create_all
+    add_column(conn, "carriers", "digest_mode BOOLEAN NOT NULL DEFAULT FALSE")
+
+
+def rebuild_autoincrement(conn: Connection, table: Table, floor: int = 0):
+    # SQLite без AUTOINCREMENT видає новому рядку max(id) + 1: щойно рядки з
+    # найбільшими id переїхали в архів чи видалені, їхні id дістаються новим.
+    # Додати AUTOINCREMENT можна лише перебудовою таблиці; floor — найбільший
+    # id, що вже є поза таблицею (в архіві), нумерація піде після нього
+    if conn.dialect.name != "sqlite":
+        return
+    ddl = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+    ).scalar()
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return
+    rebuilt = f"{table.name}_rebuild"
+    have = _columns(conn, table.name)
+    columns = ", ".join(c.name for c in table.columns if c.name in have)
+    create = str(CreateTable(table).compile(dialect=conn.dialect)).strip()
+    conn.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+    conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+    # індекси старої таблиці йдуть разом з нею, view над нею перебудовує міграція
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(conn)
+    top = conn.execute(text(f"SELECT MAX(id) FROM {table.name}")).scalar() or 0
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+    conn.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+        {"name": table.name, "seq": max(top, floor)},
+    )
+
+
+def _0010_request_autoincrement(conn: Connection):
+    # id заявки живе в кнопках accept_/decline_, outbox, відповідях перевізників
+    # і в історії — після архівації він не має дістатися новій заявці
+    import bot.models  # noqa: F401
+    from bot.database.partitions import archive_tables, drop_history_view, refresh_history_view
+    from bot.models import Shipment_request
+
+    if conn.dialect.name != "sqlite":
+        return
+    floor = 0
+    for name in archive_tables(conn):
+        floor = max(floor, conn.execute(text(f"SELECT MAX(id) FROM {name}")).scalar() or 0)
+    drop_history_view(conn)
+    rebuild_autoincrement(conn, Shipment_request.__table__, floor)
+    refresh_history_view(conn, Shipment_request.__table__)
+
+
+def _0011_support_autoincrement(conn: Connection):
+    # закриті сесії переїжджають у support_archive з тим самим id
+    import bot.models  # noqa: F401
+    from bot.models import SupportSession
+
+    if conn.dialect.name != "sqlite":
+        return
+    floor = conn.execute(text("SELECT MAX(session_id) FROM support_archive")).scalar() or 0
+    rebuild_autoincrement(conn, SupportSession.__table__, floor)
+
+
+MIGRATIONS = [
+    (1, _0001_carrier_is_active),
+    (2, _0002_route_keys),
+    (3, _0003_typed_units),
+    (4, _0004_feed_indexes),
+    (5, _0005_request_status),
+    (6, _0006_outbox_waves),
+    (7, _0007_support),
+    (8, _0008_request_archive),
+    (9, _0009_digests),
+    (10, _0010_request_autoincrement),
+    (11, _0011_support_autoincrement),
+]
+
+
+def upgrade(conn: Connection):
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    current = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        migration(conn)
+        conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": version})
+        print(f"✅ Міграцію {version} застосовано ({migration.__name__})")
+
+
+def schema_hash(metadata: MetaData) -> str:
+    parts = [f"migrations:{MIGRATIONS[-1][0]}"]
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"table:{table.name}")
+        for column in table.columns:
+            parts.append(f"{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"index:{index.name}:{','.join(c.name for c in index.columns)}:{index.unique}")
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _stamp(conn: Connection, digest: str):
+    add_column(conn, "schema_version", "hash VARCHAR(64)")
+    conn.execute(
+        text("UPDATE schema_version SET hash = :h WHERE version = (SELECT MAX(version) FROM schema_version)"),
+        {"h": digest},
+    )
+
+
+async def _stored(engine: AsyncEngine) -> tuple[int, str | None] | None:
+    try:
+        async with engine.connect() as conn:
+            row = (
+                await conn.execute(text("SELECT version, hash FROM schema_version ORDER BY version DESC LIMIT 1"))
+            ).first()
+    except DBAPIError:
+        # нова БД або schema_version ще без колонки hash
+        return None
+    return (row[0], row[1]) if row else None
+
+
+async def ensure_schema(engine: AsyncEngine, metadata: MetaData, force: bool = False) -> bool:
+    # True — схему створено/оновлено, False — уже актуальна (один запит)
+    digest = schema_hash(metadata)
+    if not force and await _stored(engine) == (MIGRATIONS[-1][0], digest):
+        return False
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.run_sync(upgrade)
+            await conn.run_sync(_stamp, digest)
+    except DBAPIError:
+        # кілька webhook-воркерів стартують разом — хтось міг оновити схему раніше
+        if await _stored(engine) != (MIGRATIONS[-1][0], digest):
+            raise
+    return True
+
+
+async def _main():
+    import bot.models  # noqa: F401 — реєструє таблиці в Base.metadata
+    from bot.database.database import Base, engine
+
+    await ensure_schema(engine, Base.metadata, force=True)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(_main())
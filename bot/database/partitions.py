@@ -0,0 +1,83 @@
+# bot/database/partitions.py
+#
+# Архів заявок по місяцях (bot/services/retention.py): заявки, що вже
+# відбулись або взяті в роботу, переносяться з гарячої shipment_request у
+# shipment_request_YYYYMM за місяцем дати подачі. Гаряча таблиця тримає лише
+# живі заявки — стрічка, claim і розсилка їх і читають.
+# Для історії (статистика перевізників тощо) — view shipment_request_history:
+#     SELECT … FROM shipment_request UNION ALL SELECT … FROM shipment_request_202401 …
+# Його перебудовує refresh_history_view, щойно з'являється нова місячна
+# таблиця; колонки, яких у старій місячній таблиці ще немає, віддаються як NULL.
+# Звичайні таблиці замість декларативного партиціонування Postgres — щоб
+# однаково працювало й на SQLite.
+# Функції синхронні (для conn.run_sync і подій DDL), таблицю заявок отримують
+# аргументом, щоб не імпортувати моделі.
+
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+HISTORY_VIEW = "shipment_request_history"
+_ARCHIVE = re.compile(r"^shipment_request_\d{6}$")
+
+
+def archive_name(when: datetime) -> str:
+    return f"shipment_request_{when:%Y%m}"
+
+
+def archive_tables(conn: Connection) -> list[str]:
+    return sorted(name for name in inspect(conn).get_table_names() if _ARCHIVE.match(name))
+
+
+def archive_table(hot: Table, name: str) -> Table:
+    # та сама структура без значень за замовчуванням і без індексів стрічки:
+    # в архіві шукають лише за id і за клієнтом / перевізником
+    return Table(
+        name,
+        MetaData(),
+        *(Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False) for c in hot.columns),
+        Index(f"ix_{name}_client_telegram_id", "client_telegram_id"),
+        Index(f"ix_{name}_carrier_telegram_id", "carrier_telegram_id"),
+    )
+
+
+def ensure_archive(conn: Connection, hot: Table, name: str, known: set[str] | None = None) -> Table:
+    # known — уже перевірені в цьому процесі таблиці, щоб не рефлектувати щоразу
+    table = archive_table(hot, name)
+    if known is not None and name in known:
+        return table
+    if name not in archive_tables(conn):
+        table.create(conn)
+        refresh_history_view(conn, hot)
+    else:
+        have = {c["name"] for c in inspect(conn).get_columns(name)}
+        missing = [c for c in hot.columns if c.name not in have]
+        for column in missing:
+            # колонку додали в shipment_request пізніше, ніж створено місячну таблицю
+            conn.execute(text(f"ALTER TABLE {name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"))
+        if missing:
+            refresh_history_view(conn, hot)
+    if known is not None:
+        known.add(name)
+    return table
+
+
+def refresh_history_view(conn: Connection, hot: Table):
+    quote = conn.dialect.identifier_preparer.quote
+    columns = [c.name for c in hot.columns]
+    selects = [f"SELECT {', '.join(quote(c) for c in columns)} FROM {hot.name}"]
+    for name in archive_tables(conn):
+        have = {c["name"] for c in inspect(conn).get_columns(name)}
+        selects.append(
+            "SELECT "
+            + ", ".join(quote(c) if c in have else f"NULL AS {quote(c)}" for c in columns)
+            + f" FROM {name}"
+        )
+    conn.execute(text(f"DROP VIEW IF EXISTS {HISTORY_VIEW}"))
+    conn.execute(text(f"CREATE VIEW {HISTORY_VIEW} AS " + " UNION ALL ".join(selects)))
+
+
+def drop_history_view(conn: Connection):
+    conn.execute(text(f"DROP VIEW IF EXISTS {HISTORY_VIEW}"))
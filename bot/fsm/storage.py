@@ -0,0 +1,238 @@
+# bot/fsm/storage.py
+#
+# FSM-сховище поверх async SQLAlchemy-двигуна: форми (ClientApplicationFSM,
+# RegisterCarrier, RegisterClient) переживають деплой і доступні всім процесам.
+#
+# Запис відкладений (write-behind): set_state/update_data лише змінюють запис
+# у пам'яті і позначають ключ "брудним"; фоновий flusher раз на flush_delay
+# пише всі брудні ключі одним upsert. Типова пара
+# "update_data + set_state" у хендлері стає одним записом у БД.
+# Ціна — до flush_delay останніх змін можуть загубитися при падінні процесу.
+#
+# Кеш у пам'яті вважається джерелом правди для процесу, тому всі апдейти
+# одного чату мають оброблятися одним процесом (див. шардинг у webhook-режимі).
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from bot import config
+from bot.models.fsm import FSMRecord
+
+_MISSING = object()
+
+
+def build_key(key: StorageKey) -> str:
+    parts = [str(key.bot_id), str(key.chat_id), str(key.user_id)]
+    if key.thread_id:
+        parts.append(str(key.thread_id))
+    if key.business_connection_id:
+        parts.append(str(key.business_connection_id))
+    parts.append(key.destiny)
+    return ":".join(parts)
+
+
+class _Entry:
+    __slots__ = ("state", "data", "expires_at")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], expires_at: datetime):
+        self.state = state
+        self.data = data
+        self.expires_at = expires_at
+
+
+class SQLAlchemyStorage(BaseStorage):
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ttl: float | None = None,
+        flush_delay: float | None = None,
+        cache_size: int = 100_000,
+    ):
+        self.engine = engine
+        self._sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        self.ttl = timedelta(seconds=ttl if ttl is not None else config.FSM_TTL_SECONDS)
+        self.flush_delay = flush_delay if flush_delay is not None else config.FSM_FLUSH_DELAY
+        self.cache_size = cache_size
+
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._last_cleanup = datetime.now()
+        self.stats = {"reads": 0, "db_reads": 0, "writes": 0, "db_writes": 0, "flushes": 0}
+
+    # --- читання ---
+
+    async def _entry(self, key: StorageKey) -> _Entry | None:
+        self.stats["reads"] += 1
+        raw = build_key(key)
+        entry = self._cache.get(raw, _MISSING)
+        if entry is _MISSING:
+            entry = await self._load(raw)
+        if entry is not None and entry.expires_at < datetime.now():
+            entry = None
+        return entry
+
+    async def _load(self, raw: str) -> _Entry | None:
+        self.stats["db_reads"] += 1
+        async with self._sessionmaker() as session:
+            record = await session.get(FSMRecord, raw)
+        entry = None
+        if record is not None:
+            entry = _Entry(record.state, dict(record.data or {}), record.expires_at)
+        self._remember(raw, entry)
+        return entry
+
+    def _remember(self, raw: str, entry: _Entry | None):
+        self._cache[raw] = entry
+        self._cache.move_to_end(raw)
+        self._evict()
+
+    def _evict(self):
+        # найдавніші записи з початку OrderedDict; брудні ще мають потрапити в БД —
+        # вони повертаються в кінець, їх витіснить виклик після flush
+        kept = []
+        while len(self._cache) > self.cache_size:
+            old, entry = self._cache.popitem(last=False)
+            if old in self._dirty:
+                kept.append((old, entry))
+        for old, entry in kept:
+            self._cache[old] = entry
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = await self._entry(key)
+        return entry.state if entry else None
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = await self._entry(key)
+        return dict(entry.data) if entry else {}
+
+    # --- запис ---
+
+    async def _write(self, key: StorageKey, state: Any = _MISSING, data: Any = _MISSING):
+        self.stats["writes"] += 1
+        entry = await self._entry(key)
+        expires_at = datetime.now() + self.ttl
+        if entry is None:
+            entry = _Entry(None, {}, expires_at)
+        if state is not _MISSING:
+            entry.state = state
+        if data is not _MISSING:
+            entry.data = data
+        entry.expires_at = expires_at
+
+        raw = build_key(key)
+        self._remember(raw, entry)
+        self._dirty.add(raw)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._write(key, state=state.state if isinstance(state, State) else state)
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(key, data=dict(data))
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> Dict[str, Any]:
+        current = await self.get_data(key)
+        current.update(data)
+        await self._write(key, data=current)
+        return current.copy()
+
+    async def _delayed_flush(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⛔️ FSM flush: {e!r}")
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        now = datetime.now()
+        upserts, deletes = [], []
+        for raw in dirty:
+            entry = self._cache.get(raw)
+            if entry is None or (entry.state is None and not entry.data):
+                deletes.append(raw)
+            else:
+                upserts.append(
+                    {
+                        "key": raw,
+                        "state": entry.state,
+                        "data": entry.data,
+                        "updated_at": now,
+                        "expires_at": entry.expires_at,
+                    }
+                )
+
+        try:
+            async with self._sessionmaker() as session:
+                for i in range(0, len(upserts), 500):
+                    await session.execute(self._upsert(upserts[i : i + 500]))
+                if deletes:
+                    await session.execute(delete(FSMRecord).where(FSMRecord.key.in_(deletes)))
+                if now - self._last_cleanup > timedelta(minutes=10):
+                    await session.execute(delete(FSMRecord).where(FSMRecord.expires_at < now))
+                    self._last_cleanup = now
+                await session.commit()
+        except Exception:
+            # не втрачаємо зміни — спробуємо з наступним flush
+            self._dirty |= dirty
+            raise
+        self.stats["flushes"] += 1
+        self.stats["db_writes"] += len(upserts) + len(deletes)
+        self._evict()
+
+    def _upsert(self, rows: list[dict]):
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(FSMRecord).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[FSMRecord.key],
+            set_={
+                "state": stmt.excluded.state,
+                "data": stmt.excluded.data,
+                "updated_at": stmt.excluded.updated_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+
+    async def close(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+
+def create_storage(backend: str | None = None) -> BaseStorage:
+    backend = backend or config.FSM_STORAGE
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "redis":
+        # будь-який сервер з Redis-протоколом (Redis, KeyDB, Dragonfly); потрібен пакет redis
+        try:
+            from aiogram.fsm.storage.redis import RedisStorage
+        except ImportError as e:
+            raise RuntimeError("FSM_STORAGE=redis, але пакет redis не встановлено: pip install redis") from e
+
+        return RedisStorage.from_url(
+            config.REDIS_URL,
+            state_ttl=config.FSM_TTL_SECONDS,
+            data_ttl=config.FSM_TTL_SECONDS,
+        )
+
+    from bot.database.database import engine
+
+    return SQLAlchemyStorage(engine)
@@ -0,0 +1,144 @@
+# bot/geo/corridors.py
+#
+# Просторовий індекс коридорів перевізників.
+# Коридор — відрізок "звідки → куди" перевізника з буфером buffer_km.
+# Кожен коридор реєструється в усіх клітинках сітки, які він перетинає.
+# Запит (pickup, dropoff): кандидати = клітинка(pickup) ∩ клітинка(dropoff),
+# далі векторна перевірка відстаней до відрізка і напрямку руху
+# (pickup має бути раніше за dropoff уздовж маршруту).
+#
+# Координати проєктуємо в локальні км (рівнопроміжна проєкція навколо
+# широти України) — похибка на масштабі країни кілька відсотків, для
+# "в межах X км" цього досить.
+
+import math
+from collections import defaultdict
+
+import numpy as np
+
+_LAT0 = math.radians(48.5)
+_KM_PER_DEG_LAT = 110.57
+_KM_PER_DEG_LON = 111.32 * math.cos(_LAT0)
+
+
+def project(lat: float, lon: float) -> tuple[float, float]:
+    return lon * _KM_PER_DEG_LON, lat * _KM_PER_DEG_LAT
+
+
+class CorridorIndex:
+    def __init__(self, buffer_km: float = 30.0, cell_km: float | None = None):
+        self.buffer_km = buffer_km
+        self.cell_km = cell_km or buffer_km / 2
+        self._ids: list[int] = []
+        self._slot_of: dict[int, int] = {}
+        self._segments: list[tuple[float, float, float, float]] = []
+        self._alive: list[bool] = []
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._frozen: dict[tuple[int, int], np.ndarray] = {}
+        self._arrays: np.ndarray | None = None
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.cell_km), int(y // self.cell_km)
+
+    def add(self, carrier_id: int, origin: tuple[float, float], destination: tuple[float, float]):
+        # origin/destination — (lat, lon)
+        self.remove(carrier_id)
+        ax, ay = project(*origin)
+        bx, by = project(*destination)
+        slot = len(self._ids)
+        self._ids.append(carrier_id)
+        self._segments.append((ax, ay, bx, by))
+        self._alive.append(True)
+        self._slot_of[carrier_id] = slot
+        self._arrays = None
+
+        # клітинки, центр яких ближче за buffer + півдіагональ клітинки
+        reach = self.buffer_km + self.cell_km * math.sqrt(2) / 2
+        cx0, cy0 = self._cell(min(ax, bx) - reach, min(ay, by) - reach)
+        cx1, cy1 = self._cell(max(ax, bx) + reach, max(ay, by) + reach)
+        cx, cy = np.meshgrid(np.arange(cx0, cx1 + 1), np.arange(cy0, cy1 + 1))
+        cx, cy = cx.ravel(), cy.ravel()
+        distance, _ = _distance_to_segment(
+            (cx + 0.5) * self.cell_km, (cy + 0.5) * self.cell_km,
+            np.float64(ax), np.float64(ay), np.float64(bx), np.float64(by),
+        )
+        near = distance <= reach
+        for cell in zip(cx[near].tolist(), cy[near].tolist()):
+            self._cells[cell].append(slot)
+
+    def remove(self, carrier_id: int):
+        slot = self._slot_of.pop(carrier_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+            self._arrays = None
+
+    def freeze(self):
+        # списки клітинок → відсортовані numpy-масиви (менше пам'яті, швидкий перетин)
+        for cell, slots in self._cells.items():
+            frozen = self._frozen.get(cell)
+            merged = np.asarray(slots, dtype=np.int32)
+            if frozen is not None:
+                merged = np.concatenate((frozen, merged))
+            self._frozen[cell] = np.unique(merged)
+        self._cells.clear()
+        self._ensure_arrays()
+
+    def _ensure_arrays(self):
+        if self._arrays is None:
+            self._arrays = np.asarray(self._segments, dtype=np.float64).reshape(-1, 4)
+            self._alive_mask = np.asarray(self._alive, dtype=bool)
+            self._id_array = np.asarray(self._ids, dtype=np.int64)
+
+    def _slots(self, cell: tuple[int, int]) -> np.ndarray:
+        frozen = self._frozen.get(cell)
+        pending = self._cells.get(cell)
+        if pending:
+            extra = np.asarray(pending, dtype=np.int32)
+            return extra if frozen is None else np.union1d(frozen, extra)
+        return frozen if frozen is not None else np.empty(0, dtype=np.int32)
+
+    def match(
+        self,
+        pickup: tuple[float, float],
+        dropoff: tuple[float, float],
+        radius_km: float | None = None,
+    ) -> list[int]:
+        radius = min(radius_km or self.buffer_km, self.buffer_km)
+        px, py = project(*pickup)
+        dx, dy = project(*dropoff)
+
+        self._ensure_arrays()
+        near_pickup = self._slots(self._cell(px, py))
+        near_dropoff = self._slots(self._cell(dx, dy))
+        if not len(near_pickup) or not len(near_dropoff):
+            return []
+
+        # перетин через бітову маску: дешевше за сортування в intersect1d
+        mask = np.zeros(len(self._ids), dtype=bool)
+        mask[near_pickup] = True
+        mask &= self._alive_mask
+        candidates = near_dropoff[mask[near_dropoff]]
+        if not len(candidates):
+            return []
+        seg = self._arrays[candidates]
+        ax, ay, bx, by = seg[:, 0], seg[:, 1], seg[:, 2], seg[:, 3]
+        dist_p, t_p = _distance_to_segment(px, py, ax, ay, bx, by)
+        dist_d, t_d = _distance_to_segment(dx, dy, ax, ay, bx, by)
+        ok = (dist_p <= radius) & (dist_d <= radius) & (t_p <= t_d)
+        return self._id_array[candidates[ok]].tolist()
+
+
+def _distance_to_segment(px, py, ax, ay, bx, by):
+    # відстань від точки до відрізка AB і параметр проєкції t ∈ [0, 1]
+    vx, vy = bx - ax, by - ay
+    length2 = vx * vx + vy * vy
+    if isinstance(length2, np.ndarray) or isinstance(px, np.ndarray):
+        safe = np.where(length2 > 0, length2, 1.0)
+        t = np.clip(((px - ax) * vx + (py - ay) * vy) / safe, 0.0, 1.0)
+        t = np.where(length2 > 0, t, 0.0)
+        return np.hypot(ax + t * vx - px, ay + t * vy - py), t
+    t = 0.0 if length2 == 0 else min(1.0, max(0.0, ((px - ax) * vx + (py - ay) * vy) / length2))
+    return math.hypot(ax + t * vx - px, ay + t * vy - py), t
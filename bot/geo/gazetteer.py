@@ -0,0 +1,115 @@
+# bot/geo/gazetteer.py
+#
+# Офлайн-довідник населених пунктів України з координатами.
+# Джерело — data/ua_settlements.csv, у рантаймі читаємо компактний бінарний
+# файл data/ua_settlements.bin через mmap (без парсингу CSV при старті).
+# Перезбірка: python -m bot.geo.gazetteer
+#
+# Формат .bin (little-endian):
+#   заголовок: b"UAGZ", u16 версія, u32 кількість записів
+#   записи (відсортовані за ключем): f32 lat, f32 lon, u32 зсув ключа,
+#       u16 довжина ключа, u32 зсув назви, u16 довжина назви
+#   далі — блок рядків UTF-8
+
+import bisect
+import csv
+import mmap
+import struct
+from pathlib import Path
+
+from bot.geo.routes import city_key
+
+DATA_DIR = Path(__file__).parent / "data"
+CSV_PATH = DATA_DIR / "ua_settlements.csv"
+BIN_PATH = DATA_DIR / "ua_settlements.bin"
+
+_MAGIC = b"UAGZ"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_RECORD = struct.Struct("<ffIHIH")
+
+
+def build(csv_path: Path = CSV_PATH, bin_path: Path = BIN_PATH) -> int:
+    with csv_path.open(encoding="utf-8") as f:
+        rows = [(city_key(r["name"]), r["name"], float(r["lat"]), float(r["lon"])) for r in csv.DictReader(f)]
+    rows.sort()
+
+    strings = bytearray()
+    records = bytearray()
+    for key, name, lat, lon in rows:
+        key_bytes, name_bytes = key.encode(), name.encode()
+        key_offset = len(strings)
+        strings += key_bytes
+        name_offset = len(strings)
+        strings += name_bytes
+        records += _RECORD.pack(lat, lon, key_offset, len(key_bytes), name_offset, len(name_bytes))
+
+    bin_path.write_bytes(_HEADER.pack(_MAGIC, _VERSION, len(rows)) + records + strings)
+    return len(rows)
+
+
+class Gazetteer:
+    def __init__(self, path: Path = BIN_PATH):
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Невідомий формат газетира: {path}")
+        self._records_at = _HEADER.size
+        self._strings_at = self._records_at + self.count * _RECORD.size
+        # ключі потрібні для бінарного пошуку — їх небагато, читаємо один раз
+        self._keys = [self._string(*self._record(i)[2:4]) for i in range(self.count)]
+
+    def _record(self, i: int) -> tuple:
+        return _RECORD.unpack_from(self._mm, self._records_at + i * _RECORD.size)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_at + offset
+        return self._mm[start : start + length].decode()
+
+    def _find(self, key: str) -> int | None:
+        i = bisect.bisect_left(self._keys, key)
+        if i < self.count and self._keys[i] == key:
+            return i
+        return None
+
+    def coords(self, key: str) -> tuple[float, float] | None:
+        i = self._find(key)
+        if i is None:
+            return None
+        lat, lon, *_ = self._record(i)
+        return lat, lon
+
+    def name(self, key: str) -> str | None:
+        i = self._find(key)
+        if i is None:
+            return None
+        return self._string(*self._record(i)[4:6])
+
+    def lookup(self, name: str) -> tuple[float, float] | None:
+        return self.coords(city_key(name))
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for i, key in enumerate(self._keys):
+            lat, lon, *_ = self._record(i)
+            yield key, lat, lon
+
+    def __len__(self):
+        return self.count
+
+
+_gazetteer: Gazetteer | None = None
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+if __name__ == "__main__":
+    print(f"✅ {BIN_PATH.name}: {build()} населених пунктів")
@@ -0,0 +1,134 @@
+# bot/geo/routes.py
+#
+# Нормалізація маршрутів: "Київ → Львів", "Київ-Львів", "kyiv - lviv",
+# "Киев – Львов " дають один і той самий ключ "kyiv:lviv".
+# Ключ міста — транслітерація українською латинкою (kyiv, lviv, zaporizhzhia),
+# російські та латинські варіанти зводяться до неї через ALIASES.
+
+import re
+
+_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "'": "",
+    # російські літери
+    "ы": "y", "э": "e", "ё": "e", "ъ": "",
+}
+_TRANSLIT_TABLE = str.maketrans(_TRANSLIT)
+_APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "`": "'", "´": "'"})
+
+CITY_NAMES = (
+    "Київ", "Львів", "Харків", "Одеса", "Дніпро", "Запоріжжя", "Вінниця",
+    "Житомир", "Рівне", "Луцьк", "Тернопіль", "Хмельницький", "Чернівці",
+    "Івано-Франківськ", "Ужгород", "Мукачево", "Полтава", "Суми", "Чернігів",
+    "Черкаси", "Кропивницький", "Миколаїв", "Херсон", "Кременчук",
+    "Кривий Ріг", "Біла Церква", "Бровари", "Бориспіль", "Ірпінь", "Фастів",
+    "Умань", "Кам'янець-Подільський", "Новоград-Волинський", "Ковель",
+    "Дрогобич", "Стрий", "Самбір", "Чоп", "Краматорськ", "Слов'янськ",
+    "Павлоград", "Кам'янське", "Нікополь", "Мелітополь", "Бердянськ",
+    "Ізмаїл", "Чорноморськ", "Південний", "Конотоп", "Ніжин", "Шостка",
+    "Лубни", "Прилуки", "Олександрія", "Вознесенськ", "Первомайськ",
+    "Жмеринка", "Козятин", "Бердичів", "Коростень", "Шепетівка",
+    "Старокостянтинів", "Нетішин", "Дубно", "Сарни", "Володимир",
+    "Нововолинськ", "Червоноград", "Яворів", "Мостиська", "Рава-Руська",
+    "Калуш", "Коломия", "Буковель", "Хуст", "Берегове", "Ягодин",
+    "Могилів-Подільський", "Білгород-Дністровський",
+)
+
+ALIASES = {
+    # російські назви
+    "Киев": "Київ", "Львов": "Львів", "Харьков": "Харків", "Одесса": "Одеса",
+    "Днепр": "Дніпро", "Днепропетровск": "Дніпро", "Дніпропетровськ": "Дніпро",
+    "Запорожье": "Запоріжжя", "Винница": "Вінниця", "Ровно": "Рівне",
+    "Тернополь": "Тернопіль", "Хмельницкий": "Хмельницький",
+    "Черновцы": "Чернівці", "Ивано-Франковск": "Івано-Франківськ",
+    "Николаев": "Миколаїв", "Чернигов": "Чернігів", "Черкассы": "Черкаси",
+    "Кировоград": "Кропивницький", "Кіровоград": "Кропивницький",
+    "Кривой Рог": "Кривий Ріг", "Белая Церковь": "Біла Церква",
+    "Борисполь": "Бориспіль", "Ирпень": "Ірпінь", "Каменец-Подольский": "Кам'янець-Подільський",
+    "Славянск": "Слов'янськ", "Каменское": "Кам'янське", "Никополь": "Нікополь",
+    "Измаил": "Ізмаїл", "Черноморск": "Чорноморськ", "Нежин": "Ніжин",
+    "Александрия": "Олександрія", "Бердичев": "Бердичів",
+    "Шепетовка": "Шепетівка", "Кременчуг": "Кременчук",
+    "Белгород-Днестровский": "Білгород-Дністровський",
+    # нові назви
+    "Звягель": "Новоград-Волинський", "Шептицький": "Червоноград",
+    # латиниця
+    "Kiev": "Київ", "Kyiv": "Київ", "Lvov": "Львів", "Lviv": "Львів",
+    "Lwow": "Львів", "Kharkov": "Харків", "Kharkiv": "Харків",
+    "Odessa": "Одеса", "Odesa": "Одеса", "Dnepr": "Дніпро", "Dnipro": "Дніпро",
+    "Zaporozhye": "Запоріжжя", "Zaporizhia": "Запоріжжя", "Zaporozhzhia": "Запоріжжя",
+    "Vinnitsa": "Вінниця", "Vinnytsya": "Вінниця", "Rovno": "Рівне",
+    "Ternopol": "Тернопіль", "Khmelnitsky": "Хмельницький", "Khmelnytskyi": "Хмельницький",
+    "Chernovtsy": "Чернівці", "Chernivtsi": "Чернівці",
+    "Ivano-Frankovsk": "Івано-Франківськ", "Ivano-Frankivsk": "Івано-Франківськ",
+    "Uzhgorod": "Ужгород", "Uzhhorod": "Ужгород", "Nikolaev": "Миколаїв",
+    "Mykolaiv": "Миколаїв", "Kherson": "Херсон", "Poltava": "Полтава",
+    "Chernigov": "Чернігів", "Chernihiv": "Чернігів", "Cherkassy": "Черкаси",
+    "Cherkasy": "Черкаси", "Zhitomir": "Житомир", "Zhytomyr": "Житомир",
+    "Lutsk": "Луцьк", "Sumy": "Суми",
+}
+
+_PREFIXES = re.compile(r"^(?:м|г|с|смт|місто|город|селище|село)\.?\s+")
+_PARENTHESES = re.compile(r"\(.*?\)")
+_SEPARATORS = re.compile(r"\s*(?:→|->|=>|⇒|➡️?|—>|–>|>|—|–|−|\s-+\s|/|\|)\s*")
+_NON_KEY = re.compile(r"[^a-z0-9]+")
+
+
+def _raw_key(name: str) -> str:
+    name = name.lower().translate(_APOSTROPHES).strip(" .,;")
+    name = _PREFIXES.sub("", name)
+    name = name.translate(_TRANSLIT_TABLE)
+    return _NON_KEY.sub("-", name).strip("-")
+
+
+_ALIAS_KEYS = {_raw_key(alias): _raw_key(city) for alias, city in ALIASES.items()}
+KNOWN_CITIES = {_raw_key(city) for city in CITY_NAMES}
+
+
+def city_key(name: str) -> str:
+    key = _raw_key(name)
+    return _ALIAS_KEYS.get(key, key)
+
+
+def _split(text: str) -> list[str] | None:
+    parts = [p for p in _SEPARATORS.split(text) if p.strip(" .,;")]
+    if len(parts) >= 2:
+        return parts
+    if "-" not in text:
+        return None
+
+    # "Київ-Львів", але "Івано-Франківськ-Київ": шукаємо розрив, де обидві
+    # частини — відомі міста
+    pieces = text.split("-")
+    for i in range(1, len(pieces)):
+        left, right = "-".join(pieces[:i]), "-".join(pieces[i:])
+        if city_key(left) in KNOWN_CITIES and city_key(right) in KNOWN_CITIES:
+            return [left, right]
+    if len(pieces) == 2:
+        return pieces
+    return None
+
+
+def parse_route(route: str) -> tuple[str | None, str | None]:
+    text = _PARENTHESES.sub(" ", route.lower().translate(_APOSTROPHES)).strip()
+    parts = _split(text)
+    if not parts:
+        return None, None
+    # проміжні пункти ігноруємо: важливі лише початок і кінець
+    origin, destination = city_key(parts[0]), city_key(parts[-1])
+    if not origin or not destination:
+        return None, None
+    return origin, destination
+
+
+def make_route_key(origin: str | None, destination: str | None) -> str | None:
+    if not origin or not destination:
+        return None
+    return f"{origin}:{destination}"
+
+
+def route_key(route: str) -> str | None:
+    return make_route_key(*parse_route(route))
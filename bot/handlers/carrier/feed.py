@@ -0,0 +1,121 @@
+# bot/handlers/carrier/feed.py
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, Message
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot import config
+from bot.models import Carrier, NotificationDigest
+from bot.models.shipment_request import Shipment_request
+from bot.services.digest import parse_ids, render_page
+from bot.services.feed import open_loads
+from bot.services.identity import Identity
+from bot.services.templates import (
+    feed_keyboard,
+    render_feed_page,
+    render_request_card,
+    render_taken_card,
+    request_keyboard,
+)
+
+router = Router()
+
+
+async def _edit_page(callback: CallbackQuery, text: str, reply_markup):
+    # повторне натискання тієї ж сторінки — Telegram відповідає "message is not modified"
+    try:
+        await callback.message.edit_text(text, reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in e.message.lower():
+            raise
+
+
+# Стрічка відкритих заявок на маршруті перевізника
+@router.message(Command("loads"))
+async def show_feed(message: Message, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await message.answer("⛔️ Стрічка заявок доступна лише перевізникам.")
+        return
+    page = await open_loads(session, identity.route_key)
+    await message.answer(render_feed_page(page.items), reply_markup=feed_keyboard(page))
+
+
+@router.callback_query(F.data == "feed")
+async def show_feed_button(callback: CallbackQuery, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await callback.answer("⛔️ Лише для перевізників", show_alert=True)
+        return
+    page = await open_loads(session, identity.route_key)
+    await callback.message.answer(render_feed_page(page.items), reply_markup=feed_keyboard(page))
+    await callback.answer()
+
+
+# Гортання: редагуємо те саме повідомлення, курсор — id заявки в callback_data
+@router.callback_query(F.data.startswith("feed_next_") | F.data.startswith("feed_prev_"))
+async def turn_page(callback: CallbackQuery, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await callback.answer("⛔️ Лише для перевізників", show_alert=True)
+        return
+    direction, _, cursor = callback.data.removeprefix("feed_").partition("_")
+    if direction == "next":
+        page = await open_loads(session, identity.route_key, after_id=int(cursor))
+    else:
+        page = await open_loads(session, identity.route_key, before_id=int(cursor))
+    await _edit_page(callback, render_feed_page(page.items), feed_keyboard(page))
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("feed_show_"))
+async def show_request(callback: CallbackQuery, session: AsyncSession):
+    request = await session.get(Shipment_request, int(callback.data.removeprefix("feed_show_")))
+    if request is None:
+        await callback.answer("⛔️ Заявку вже знято", show_alert=True)
+        return
+    if request.status != "open":
+        # кнопка зі зведення чи старої сторінки стрічки — без кнопок відгуку, що лише впадуть
+        await callback.message.answer(render_taken_card(request if request.status == "taken" else None))
+        await callback.answer()
+        return
+    await callback.message.answer(render_request_card(request), reply_markup=request_keyboard(request.id, request.version))
+    await callback.answer()
+
+
+# Зведення замість окремих карток (bot/services/digest.py): вмикається і вимикається тією ж командою
+@router.message(Command("digest"))
+async def toggle_digest(message: Message, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await message.answer("⛔️ Зведення доступне лише перевізникам.")
+        return
+    enabled = await session.scalar(
+        update(Carrier)
+        .where(Carrier.telegram_id == identity.telegram_id)
+        .values(digest_mode=~Carrier.digest_mode)
+        .returning(Carrier.digest_mode)
+    )
+    await session.commit()
+    if enabled:
+        await message.answer(
+            f"📬 Зведення увімкнено: нові заявки за {config.DIGEST_WINDOW / 60:.0f} хв приходитимуть "
+            "одним повідомленням, яке оновлюється. Вимкнути — /digest"
+        )
+    else:
+        await message.answer("📦 Зведення вимкнено: кожна заявка приходитиме окремою карткою.")
+
+
+@router.callback_query(F.data.startswith("digest_"))
+async def turn_digest_page(callback: CallbackQuery, session: AsyncSession):
+    digest_id, _, page = callback.data.removeprefix("digest_").partition("_")
+    digest = await session.get(NotificationDigest, int(digest_id))
+    if digest is None or digest.chat_id != callback.message.chat.id:
+        await callback.answer("⛔️ Зведення вже недоступне", show_alert=True)
+        return
+    ids = parse_ids(digest.request_ids)
+    size = config.FEED_PAGE_SIZE
+    page = int(page)
+    shown = ids[page * size : (page + 1) * size]
+    requests = {r.id: r for r in await session.scalars(select(Shipment_request).where(Shipment_request.id.in_(shown)))}
+    text, keyboard = render_page(digest.id, ids, requests, page)
+    await _edit_page(callback, text, keyboard)
+    await callback.answer()
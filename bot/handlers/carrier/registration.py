@@ -4,10 +4,13 @@ from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from bot.models import Carrier
-from bot.database.database import async_session
-from aiogram.types import CallbackQuery
+from bot.services.identity import Identity, identity_cache
+from bot.services.route_index import route_index
+from bot.services.scoring import carrier_scorer
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 
 router = Router()
 
@@ -17,6 +20,12 @@ class RegisterCarrier(StatesGroup):
     full_name = State()
     phone = State()
     route = State()
+    capacity = State()
+
+
+FEED_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[[InlineKeyboardButton(text="📋 Відкриті заявки", callback_data="feed")]]
+)
 
 
 # @router.message()
@@ -53,22 +62,54 @@ async def get_phone(message: Message, state: FSMContext):
     await state.set_state(RegisterCarrier.route)
 
 
-# Зберігаємо маршрут і реєструємо
+# Зберігаємо маршрут
 @router.message(RegisterCarrier.route)
-async def finish_registration(message: Message, state: FSMContext):
+async def get_route(message: Message, state: FSMContext):
+    await state.update_data(route=message.text)
+    await message.answer(
+        "🚛 Вкажіть місткість авто (наприклад: 20 т, 82 м³, 33 палети) або «-», щоб пропустити:"
+    )
+    await state.set_state(RegisterCarrier.capacity)
+
+
+# Зберігаємо місткість і реєструємо
+@router.message(RegisterCarrier.capacity)
+async def finish_registration(
+    message: Message, state: FSMContext, session: AsyncSession, identity: Identity
+):
     data = await state.get_data()
     telegram_id = message.from_user.id
 
-    async with async_session() as session:
-        session.add(
-            Carrier(
-                telegram_id=telegram_id,
-                full_name=data["full_name"],
-                phone=data["phone"],
-                route=message.text,
-            )
-        )
+    if identity.is_carrier:
+        await message.answer("🔁 Ви вже зареєстровані як перевізник.")
+        await state.clear()
+        return
+
+    carrier = Carrier(
+        telegram_id=telegram_id,
+        full_name=data["full_name"],
+        phone=data["phone"],
+        route=data["route"],
+        capacity=None if message.text.strip() in ("-", "—") else message.text,
+    )
+    session.add(carrier)
+    try:
         await session.commit()
-
-    await message.answer("✅ Ви успішно зареєстровані як перевізник!")
+    except IntegrityError:
+        # паралельна реєстрація з іншого пристрою встигла раніше
+        await session.rollback()
+        identity_cache.invalidate(telegram_id)
+        await message.answer("🔁 Ви вже зареєстровані як перевізник.")
+        await state.clear()
+        return
+    identity_cache.invalidate(telegram_id)
+    capacity = (carrier.capacity_kg, carrier.capacity_m3, carrier.capacity_pallets)
+    route_index.add(telegram_id, carrier.route_key, capacity)
+    carrier_scorer.add(telegram_id, carrier.route_key, capacity)
+
+    await message.answer(
+        "✅ Ви успішно зареєстровані як перевізник!\n"
+        "Нові заявки на вашому маршруті прийдуть автоматично, а переглянути відкриті — /loads.",
+        reply_markup=FEED_KEYBOARD,
+    )
     await state.clear()
@@ -0,0 +1,167 @@
+# bot/handlers/carrier/responses.py
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramAPIError
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import StatesGroup, State
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.models import Client, Shipment_request
+from bot.services.claims import MISSING, REPEAT, STALE, TAKEN, WON, claim_request, record_response
+from bot.services.identity import Identity
+from bot.services.scoring import carrier_scorer
+from bot.services.templates import format_money, render_taken_card, render_won_card
+from bot.services.units import parse_price, whole
+
+router = Router()
+
+
+class NegotiateFSM(StatesGroup):
+    price = State()
+
+
+LOST_ANSWERS = {
+    TAKEN: "⛔️ Рейс уже взяв інший перевізник",
+    STALE: "⛔️ Умови заявки змінились — перегляньте картку ще раз",
+    MISSING: "⛔️ Заявку вже знято",
+}
+
+
+def _request_ref(callback: CallbackQuery, prefix: str) -> tuple[int, int | None]:
+    # accept_<id>_<version>; картки, надіслані до появи версії в кнопках, — accept_<id>
+    request_id, _, version = callback.data.removeprefix(prefix).partition("_")
+    return int(request_id), int(version) if version else None
+
+
+async def _client_contact(session: AsyncSession, request: Shipment_request) -> tuple[str | None, str | None]:
+    row = (
+        await session.execute(
+            select(Client.full_name, Client.phone).where(Client.telegram_id == request.client_telegram_id)
+        )
+    ).one_or_none()
+    return (row[0], row[1]) if row else (None, None)
+
+
+async def _notify(bot, chat_id: int, text: str, reply_markup=None):
+    # клієнт міг заблокувати бота — перевізнику це не заважає
+    try:
+        await bot.send_message(chat_id, text, reply_markup=reply_markup)
+    except TelegramAPIError as e:
+        print(f"⛔️ Не вдалося повідомити {chat_id}: {e!r}")
+
+
+# Прийняти рейс: перший умовний UPDATE виграє, решта отримує "уже взято"
+@router.callback_query(F.data.startswith("accept_"))
+async def accept_request(callback: CallbackQuery, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await callback.answer("⛔️ Лише для перевізників", show_alert=True)
+        return
+    request_id, version = _request_ref(callback, "accept_")
+    result = await claim_request(session, request_id, identity.telegram_id, expected_version=version)
+    carrier_scorer.touch(identity.telegram_id, accepted=result.outcome == WON)
+
+    if not result.ok:
+        await callback.answer(LOST_ANSWERS[result.outcome], show_alert=True)
+        if result.outcome == TAKEN:
+            await callback.message.edit_text(render_taken_card(await session.get(Shipment_request, request_id)))
+        return
+
+    request = await session.get(Shipment_request, request_id)
+    client_name, client_phone = await _client_contact(session, request)
+    if result.outcome == REPEAT:
+        await callback.answer("✅ Цей рейс уже ваш")
+    else:
+        await callback.answer("✅ Рейс ваш!")
+        await _notify(
+            callback.bot,
+            request.client_telegram_id,
+            f"🚛 Заявку #{request.id} ({request.route}) прийняв перевізник "
+            f"{identity.full_name or ''}, {identity.phone or ''}",
+        )
+    await callback.message.edit_text(render_won_card(request, client_name, client_phone))
+
+
+# Відмова: запам'ятовуємо і прибираємо кнопки з картки
+@router.callback_query(F.data.startswith("decline_"))
+async def decline_request(callback: CallbackQuery, session: AsyncSession, identity: Identity):
+    if not identity.is_carrier:
+        await callback.answer("⛔️ Лише для перевізників", show_alert=True)
+        return
+    request_id, _ = _request_ref(callback, "decline_")
+    if await session.get(Shipment_request, request_id) is None:
+        await callback.answer(LOST_ANSWERS[MISSING], show_alert=True)
+        return
+    await record_response(session, request_id, identity.telegram_id, "declined")
+    await session.commit()
+    carrier_scorer.touch(identity.telegram_id)
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer("❌ Ви відмовились від рейсу")
+
+
+# Своя ставка: питаємо ціну, пропозицію бачить клієнт
+@router.callback_query(F.data.startswith("negotiate_"))
+async def start_negotiation(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, identity: Identity
+):
+    if not identity.is_carrier:
+        await callback.answer("⛔️ Лише для перевізників", show_alert=True)
+        return
+    request_id, version = _request_ref(callback, "negotiate_")
+    request = await session.get(Shipment_request, request_id)
+    if request is None or request.status != "open":
+        await callback.answer(LOST_ANSWERS[TAKEN if request else MISSING], show_alert=True)
+        return
+    if version is not None and version != request.version:
+        await callback.answer(LOST_ANSWERS[STALE], show_alert=True)
+        return
+    await state.set_state(NegotiateFSM.price)
+    await state.update_data(request_id=request.id, request_version=request.version)
+    await callback.message.answer(
+        f"💬 Заявка #{request.id}, ціна клієнта {format_money(request.price)} грн.\n"
+        "Введіть вашу ставку (наприклад: 9 500 грн):"
+    )
+    await callback.answer()
+
+
+@router.message(NegotiateFSM.price)
+async def finish_negotiation(
+    message: Message, state: FSMContext, session: AsyncSession, identity: Identity
+):
+    price = parse_price(message.text or "")
+    if price is None or price.amount <= 0:
+        await message.answer("⛔️ Не вдалося розпізнати суму. Спробуйте ще раз (наприклад: 9 500 грн):")
+        return
+    data = await state.get_data()
+    await state.clear()
+    request = await session.get(Shipment_request, data["request_id"])
+    if request is None or request.status != "open":
+        await message.answer(LOST_ANSWERS[TAKEN if request else MISSING])
+        return
+
+    amount = whole(price.amount)
+    response_id = await record_response(
+        session,
+        request.id,
+        identity.telegram_id,
+        "offer",
+        price=amount,
+        request_version=data["request_version"],
+    )
+    await session.commit()
+    carrier_scorer.touch(identity.telegram_id, accepted=True)
+    await _notify(
+        message.bot,
+        request.client_telegram_id,
+        f"💬 Перевізник {identity.full_name or ''} пропонує {format_money(amount)} грн "
+        f"за заявку #{request.id} ({request.route}) замість {format_money(request.price)} грн.",
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(text="✅ Погодитись", callback_data=f"offer_accept_{response_id}"),
+                    InlineKeyboardButton(text="❌ Ні", callback_data=f"offer_reject_{response_id}"),
+                ]
+            ]
+        ),
+    )
+    await message.answer("📨 Вашу ставку надіслано клієнту.")
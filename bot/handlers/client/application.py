@@ -4,8 +4,15 @@ from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
-from bot.database.database import async_session
+from datetime import datetime
+from bot.ai_helper.date_parser import normalize_date
+from sqlalchemy.ext.asyncio import AsyncSession
 from bot.models.shipment_request import Shipment_request
+from bot.geo.routes import route_key
+from bot.services.notifier import notify_carriers
+from bot.services.price_stats import price_stats
+from bot.services.templates import format_money, render_request_card, request_keyboard
+from bot.services.units import parse_price, whole
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 router = Router()
@@ -22,20 +29,20 @@ class ClientApplicationFSM(StatesGroup):
     price = State()
 
 
+START_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Так", callback_data="confirm_start_application"),
+            InlineKeyboardButton(text="❌ Ні", callback_data="cancel_application"),
+        ]
+    ]
+)
+
+
 @router.callback_query(F.data == "client_application")
 async def start_client_application(callback: CallbackQuery, state: FSMContext):
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="✅ Так", callback_data="confirm_start_application"
-                ),
-                InlineKeyboardButton(text="❌ Ні", callback_data="cancel_application"),
-            ]
-        ]
-    )
     await callback.message.answer(
-        "📝 Бажаєте створити нову заявку на перевезення?", reply_markup=keyboard
+        "📝 Бажаєте створити нову заявку на перевезення?", reply_markup=START_KEYBOARD
     )
     await callback.answer()
 
@@ -56,7 +63,14 @@ async def get_route(message: Message, state: FSMContext):
 
 @router.message(ClientApplicationFSM.date)
 async def get_date(message: Message, state: FSMContext):
-    await state.update_data(date=message.text)
+    parsed = await normalize_date(message.text)
+    if parsed is None:
+        await message.answer(
+            "⛔️ Не вдалося розпізнати дату. Спробуйте ще раз (наприклад: 20 липня до 10:00):"
+        )
+        return
+
+    await state.update_data(date=parsed.isoformat())
     await message.answer(
         "📦 Введіть тип вантажу(наприклад, Побутова техніка, упакована на палетах):"
     )
@@ -94,20 +108,31 @@ async def get_loading(message: Message, state: FSMContext):
 @router.message(ClientApplicationFSM.unloading)
 async def get_unloading(message: Message, state: FSMContext):
     await state.update_data(unloading=message.text)
-    await message.answer("💰 Введіть бажану ціну (наприклад: 8000 грн):")
+    data = await state.get_data()
+    text = "💰 Введіть бажану ціну (наприклад: 8000 грн):"
+    # типова ціна маршруту — з агрегатів у пам'яті (bot/services/price_stats.py), без запиту в БД
+    hint = price_stats.suggest(route_key(data.get("route") or ""))
+    if hint:
+        text += f"\n📊 Зазвичай на цьому маршруті: {format_money(hint[0])}–{format_money(hint[1])} грн"
+    await message.answer(text)
     await state.set_state(ClientApplicationFSM.price)
 
 
 @router.message(ClientApplicationFSM.price)
-async def finish_application(message: Message, state: FSMContext):
+async def finish_application(message: Message, state: FSMContext, session: AsyncSession):
+    price = (message.text or "").strip()
+    parsed = parse_price(price)
+    if parsed is None or whole(parsed.amount) <= 0:
+        await message.answer("⛔️ Не вдалося розпізнати ціну. Введіть суму (наприклад: 8000 грн):")
+        return
+
     data = await state.get_data()
     telegram_id = message.from_user.id
-    price = message.text.strip()
 
     new_request = Shipment_request(
         client_telegram_id=telegram_id,
         route=data["route"],
-        date=data["date"],
+        date=datetime.fromisoformat(data["date"]),
         cargo_type=data["cargo_type"],
         volume=data["volume"],
         weight=data["weight"],
@@ -116,41 +141,15 @@ async def finish_application(message: Message, state: FSMContext):
         price=price,
     )
 
-    async with async_session() as session:
-        session.add(new_request)
-        await session.commit()
-        await session.refresh(new_request)
+    session.add(new_request)
+    # заявка і сповіщення перевізникам комітяться разом
+    await notify_carriers(session, new_request)
+    await session.commit()
+    price_stats.add(new_request.route_key, new_request.price, new_request.price_currency, new_request.id)
 
     await message.answer(
-        f"""📦 <b>Нова заявка на перевезення:</b>
-Маршрут: {data["route"]}
-Дата подачі: {data["date"]}
-Тип вантажу: {data["cargo_type"]}
-Обʼєм: {data["volume"]}
-Орієнтовна вага: {data["weight"]}
-Завантаження: {data["loading"]}
-Вивантаження: {data["unloading"]}
-Ціна: {price} грн""",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="✅ Прийняти рейс",
-                        callback_data=f"accept_{new_request.id}",
-                    ),
-                    InlineKeyboardButton(
-                        text="❌ Відмовитись",
-                        callback_data=f"decline_{new_request.id}",
-                    ),
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="💬 Запропонувати іншу ставку",
-                        callback_data=f"negotiate_{new_request.id}",
-                    )
-                ],
-            ]
-        ),
+        render_request_card(new_request),
+        reply_markup=request_keyboard(new_request.id, new_request.version),
         parse_mode="HTML",
     )
 
@@ -0,0 +1,76 @@
+# bot/handlers/client/offers.py
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.models import RequestResponse, Shipment_request
+from bot.services.claims import REPEAT, STALE, WON, claim_request
+from bot.services.identity import Identity
+from bot.services.templates import format_money, render_won_card
+
+router = Router()
+
+
+async def _offer(callback: CallbackQuery, session: AsyncSession, prefix: str):
+    # пропозиція і заявка, якщо заявка справді цього клієнта
+    response = await session.get(RequestResponse, int(callback.data.removeprefix(prefix)))
+    if response is None or response.kind != "offer":
+        return None, None
+    request = await session.get(Shipment_request, response.request_id)
+    if request is None or request.client_telegram_id != callback.from_user.id:
+        return None, None
+    return response, request
+
+
+# Клієнт погоджується на ставку перевізника: той самий умовний claim,
+# але ще й з перевіркою версії — якщо заявку вже змінили чи віддали, угода не відбудеться
+@router.callback_query(F.data.startswith("offer_accept_"))
+async def accept_offer(callback: CallbackQuery, session: AsyncSession, identity: Identity):
+    response, request = await _offer(callback, session, "offer_accept_")
+    if response is None:
+        await callback.answer("⛔️ Пропозицію не знайдено", show_alert=True)
+        return
+
+    carrier_id, price = response.carrier_telegram_id, response.price
+    result = await claim_request(
+        session, request.id, carrier_id, expected_version=response.request_version, price=price
+    )
+    if result.outcome not in (WON, REPEAT):
+        text = (
+            "⛔️ Заявку змінено після цієї пропозиції"
+            if result.outcome == STALE
+            else "⛔️ Заявку вже віддано іншому перевізнику"
+        )
+        await callback.answer(text, show_alert=True)
+        await callback.message.edit_reply_markup(reply_markup=None)
+        return
+
+    await callback.message.edit_text(
+        f"✅ Ви погодились на {format_money(price)} грн. Перевізник отримав ваші контакти."
+    )
+    await callback.answer()
+    if result.outcome == WON:
+        await session.refresh(request)
+        try:
+            await callback.bot.send_message(
+                carrier_id, render_won_card(request, identity.full_name, identity.phone)
+            )
+        except TelegramAPIError as e:
+            print(f"⛔️ Не вдалося повідомити {carrier_id}: {e!r}")
+
+
+@router.callback_query(F.data.startswith("offer_reject_"))
+async def reject_offer(callback: CallbackQuery, session: AsyncSession):
+    response, request = await _offer(callback, session, "offer_reject_")
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer("Пропозицію відхилено")
+    if response is None:
+        return
+    try:
+        await callback.bot.send_message(
+            response.carrier_telegram_id,
+            f"❌ Клієнт відхилив вашу ставку {format_money(response.price)} грн за заявку #{request.id}.",
+        )
+    except TelegramAPIError as e:
+        print(f"⛔️ Не вдалося повідомити {response.carrier_telegram_id}: {e!r}")
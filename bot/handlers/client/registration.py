@@ -4,9 +4,10 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
-from bot.database.database import async_session
 from bot.models.client import Client
-from sqlalchemy import select
+from bot.services.identity import Identity, identity_cache
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 router = Router()
@@ -32,37 +33,43 @@ async def get_client_full_name(message: Message, state: FSMContext):
 
 
 @router.message(RegisterClient.phone)
-async def get_client_phone(message: Message, state: FSMContext):
+async def get_client_phone(
+    message: Message, state: FSMContext, session: AsyncSession, identity: Identity
+):
     data = await state.get_data()
     telegram_id = message.from_user.id
 
-    async with async_session() as session:
-        # Перевірка на існуючого клієнта
-        existing = await session.scalar(
-            select(Client).where(Client.telegram_id == telegram_id)
+    # Перевірка на існуючого клієнта — з кешу профілів, без запиту в БД
+    if identity.is_client:
+        await message.answer("🔁 Ви вже зареєстровані як клієнт.")
+        await state.clear()
+        return
+
+    session.add(
+        Client(
+            telegram_id=telegram_id,
+            full_name=data["full_name"],
+            phone=message.text,
         )
-        if existing:
-            await message.answer("🔁 Ви вже зареєстровані як клієнт.")
-        else:
-            session.add(
-                Client(
-                    telegram_id=telegram_id,
-                    full_name=data["full_name"],
-                    phone=message.text,
-                )
-            )
-            await session.commit()
-            await message.answer(
-                "✅ Реєстрація клієнта успішна!",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="📦 Створити заявку",
-                                callback_data="client_application",
-                            )
-                        ]
+    )
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        await message.answer("🔁 Ви вже зареєстровані як клієнт.")
+    else:
+        await message.answer(
+            "✅ Реєстрація клієнта успішна!",
+            reply_markup=InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        InlineKeyboardButton(
+                            text="📦 Створити заявку",
+                            callback_data="client_application",
+                        )
                     ]
-                ),
-            )
+                ]
+            ),
+        )
+    identity_cache.invalidate(telegram_id)
     await state.clear()
@@ -0,0 +1,200 @@
+# bot/handlers/common/support.py
+#
+# Підтримка: /support відкриває (або продовжує) сесію, далі кожне текстове
+# повідомлення користувача копіюється в чат адмінів (SUPPORT_CHAT_ID).
+# Адмін відповідає reply на копію — відповідь іде користувачу; /close у reply
+# закриває сесію, /sessions — відкриті звернення, /history <id> — історія.
+
+import html
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramAPIError
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import StatesGroup, State
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot import config
+from bot.models import SupportArchive, SupportSession
+from bot.services.identity import Identity
+from bot.services.support import (
+    HistoryPage,
+    active_session,
+    add_message,
+    close_session,
+    history,
+    open_session,
+    open_sessions,
+    session_by_admin_message,
+)
+
+router = Router()
+admin_chat = F.chat.id == config.SUPPORT_CHAT_ID
+
+# у перегляді історії довгі повідомлення обрізаємо, щоб сторінка влізла в ліміт Telegram
+PREVIEW_CHARS = 300
+
+
+class SupportFSM(StatesGroup):
+    chatting = State()
+
+
+def render_history(session_id: int, page: HistoryPage) -> str:
+    if not page.items:
+        return f"🗂 Звернення #{session_id}: повідомлень немає."
+    lines = [f"🗂 Звернення #{session_id}:"]
+    for item in page.items:
+        text = item.text if len(item.text) <= PREVIEW_CHARS else item.text[:PREVIEW_CHARS] + "…"
+        at = item.created_at.strftime("%d.%m %H:%M") if item.created_at else ""
+        lines.append(f"{'🛟' if item.from_admin else '👤'} <i>{at}</i> {html.escape(text)}")
+    return "\n".join(lines)
+
+
+def history_keyboard(session_id: int, page: HistoryPage) -> InlineKeyboardMarkup | None:
+    if not page.has_older:
+        return None
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="⬆️ Старіші", callback_data=f"support_older_{session_id}_{page.oldest_id}")]
+        ]
+    )
+
+
+# ── користувач ──────────────────────────────────────────────────────────────
+
+
+@router.message(Command("support"), ~admin_chat)
+async def start_support(message: Message, state: FSMContext, session: AsyncSession):
+    if config.SUPPORT_CHAT_ID is None:
+        await message.answer("⛔️ Підтримка тимчасово недоступна.")
+        return
+    support_session, created = await open_session(session, message.from_user.id)
+    await session.commit()
+    await state.set_state(SupportFSM.chatting)
+    if not created:
+        page = await history(session, support_session.id, user_id=message.from_user.id)
+        await message.answer(
+            render_history(support_session.id, page), reply_markup=history_keyboard(support_session.id, page)
+        )
+    await message.answer("🛟 Напишіть ваше питання — ми відповімо тут же.\nЗавершити звернення: /done")
+
+
+@router.message(Command("done"), SupportFSM.chatting)
+async def finish_support(message: Message, state: FSMContext, session: AsyncSession):
+    await state.clear()
+    # сесію міг уже закрити адмін — нової не створюємо
+    support_session = await active_session(session, message.from_user.id)
+    if support_session is None:
+        await message.answer("ℹ️ Немає відкритого звернення. Якщо знадобиться допомога — /support")
+        return
+    await close_session(session, support_session.id)
+    await session.commit()
+    await message.answer("✅ Звернення закрито. Якщо знадобиться допомога — /support")
+    await _to_admins(message.bot, f"✅ Користувач закрив звернення #{support_session.id}")
+
+
+@router.message(SupportFSM.chatting, ~F.text.startswith("/"))
+async def relay_to_admins(message: Message, session: AsyncSession, identity: Identity | None):
+    if not message.text:
+        await message.answer("✍️ Поки що приймаємо лише текст — опишіть, будь ласка, словами.")
+        return
+    # сесію міг закрити адмін — тоді це нове звернення
+    support_session, created = await open_session(session, message.from_user.id)
+    who = html.escape((identity and identity.full_name) or message.from_user.full_name)
+    role = "перевізник" if identity and identity.is_carrier else "клієнт" if identity and identity.is_client else "гість"
+    header = f"{'🆕' if created else '💬'} #{support_session.id} · {who} ({role}, id {message.from_user.id})"
+    copy = await _to_admins(message.bot, f"{header}\n\n{html.escape(message.text)}")
+    if copy is None:
+        await session.rollback()
+        await message.answer("⛔️ Не вдалося передати повідомлення, спробуйте пізніше.")
+        return
+    await add_message(session, support_session.id, message.text, admin_message_id=copy.message_id)
+    await session.commit()
+
+
+async def _to_admins(bot, text: str) -> Message | None:
+    try:
+        return await bot.send_message(config.SUPPORT_CHAT_ID, text)
+    except TelegramAPIError as e:
+        print(f"⛔️ Чат підтримки недоступний: {e!r}")
+        return None
+
+
+# ── чат адмінів ─────────────────────────────────────────────────────────────
+
+
+@router.message(admin_chat, F.reply_to_message, F.text)
+async def relay_to_user(message: Message, session: AsyncSession):
+    support_session = await session_by_admin_message(session, message.reply_to_message.message_id)
+    if support_session is None:
+        return
+    if message.text.startswith("/close"):
+        if await close_session(session, support_session.id):
+            await session.commit()
+            await _to_user(message, support_session.user_id, "✅ Звернення закрито підтримкою. Дякуємо!")
+        await message.reply(f"✅ Звернення #{support_session.id} закрито")
+        return
+    if message.text.startswith("/"):
+        return
+
+    if await _to_user(message, support_session.user_id, f"🛟 Підтримка:\n{html.escape(message.text)}"):
+        await add_message(
+            session, support_session.id, message.text, from_admin=True, admin_message_id=message.message_id
+        )
+        await session.commit()
+
+
+async def _to_user(message: Message, user_id: int, text: str) -> bool:
+    try:
+        await message.bot.send_message(user_id, text)
+        return True
+    except TelegramAPIError as e:
+        await message.reply(f"⛔️ Не доставлено: {e.message}")
+        return False
+
+
+@router.message(Command("sessions"), admin_chat)
+async def list_sessions(message: Message, session: AsyncSession):
+    rows = await open_sessions(session)
+    if not rows:
+        await message.answer("📭 Відкритих звернень немає.")
+        return
+    lines = ["📬 Відкриті звернення:"]
+    for support_session, last in rows:
+        preview = html.escape(last.text[:80]) if last else "—"
+        lines.append(f"#{support_session.id} · id {support_session.user_id}: {preview}")
+    await message.answer("\n".join(lines))
+
+
+@router.message(Command("history"), admin_chat)
+async def show_history(message: Message, command: CommandObject, session: AsyncSession):
+    if not command.args or not command.args.strip().isdigit():
+        await message.answer("Використання: /history <номер звернення>")
+        return
+    session_id = int(command.args)
+    page = await history(session, session_id)
+    await message.answer(render_history(session_id, page), reply_markup=history_keyboard(session_id, page))
+
+
+# ── гортання історії (і в чаті адмінів, і у власника) ───────────────────────
+
+
+@router.callback_query(F.data.startswith("support_older_"))
+async def older_messages(callback: CallbackQuery, session: AsyncSession):
+    session_id, _, before_id = callback.data.removeprefix("support_older_").partition("_")
+    session_id, before_id = int(session_id), int(before_id)
+    if callback.message.chat.id != config.SUPPORT_CHAT_ID and await _owner(session, session_id) != callback.from_user.id:
+        await callback.answer("⛔️ Недоступно", show_alert=True)
+        return
+    page = await history(session, session_id, before_id=before_id)
+    await callback.message.answer(render_history(session_id, page), reply_markup=history_keyboard(session_id, page))
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer()
+
+
+async def _owner(session: AsyncSession, session_id: int) -> int | None:
+    owner = await session.scalar(select(SupportSession.user_id).where(SupportSession.id == session_id))
+    if owner is None:
+        owner = await session.scalar(select(SupportArchive.user_id).where(SupportArchive.session_id == session_id))
+    return owner
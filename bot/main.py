@@ -3,27 +3,63 @@ from aiogram.types import Message
 from aiogram.enums import ParseMode
 from bot import config
 import asyncio
-import sentry_sdk
+import os
+from contextlib import asynccontextmanager
 from aiogram.client.default import DefaultBotProperties
 from bot.handlers.common import role_selection  # 👈 нове
+from bot.handlers.common import support
 from bot.handlers.carrier import registration as carrier_registration   # 👈 нове
+from bot.handlers.carrier import feed as carrier_feed
+from bot.handlers.carrier import responses as carrier_responses
 from bot.handlers.client import registration as client_registration   # 👈 нове
 from bot.handlers.client import application    # 👈 нове
+from bot.handlers.client import offers as client_offers
+from bot.database.database import Base, async_session, engine
+from bot.database.migrations import ensure_schema
+from bot.fsm.storage import create_storage
+from bot.middlewares.metrics import HandlerMetrics
+from bot.middlewares.recorder import TrafficRecorder
+from bot.middlewares.session import DbSessionMiddleware
+from bot.middlewares.throttle import ThrottleMiddleware
+from bot.services.metrics import TelegramMetrics, start_metrics_server
+from bot.services.outbox import OutboxDispatcher
+from bot.services.price_stats import refresh_price_stats
+from bot.services.retention import archive_expired_requests
+from bot.services.route_index import refresh_route_index, warm_route_index
+from bot.services.support import archive_support_sessions
 
-# sentry_sdk.init(
-#     dsn=config.SENTRY_DSN,
-#     traces_sample_rate=1.0,
-# )
+if config.SENTRY_DSN:
+    # sentry_sdk тягне httpcore/urllib3 (~0.2 с) — лише якщо він справді потрібен
+    import sentry_sdk
+
+    sentry_sdk.init(
+        dsn=config.SENTRY_DSN,
+        traces_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,
+    )
 
 bot = Bot(
     token=config.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
-dp = Dispatcher()
+bot.session.middleware(TelegramMetrics())
+dp = Dispatcher(storage=create_storage())
+recorder = TrafficRecorder() if config.RECORD_UPDATES else None
+if recorder:
+    dp.update.outer_middleware(recorder)
+# ліміт — до сесії БД: відхилений апдейт не бере з'єднання
+dp.update.outer_middleware(ThrottleMiddleware())
+dp.update.outer_middleware(DbSessionMiddleware(async_session))
+handler_metrics = HandlerMetrics()
+dp.message.middleware(handler_metrics)
+dp.callback_query.middleware(handler_metrics)
 
 dp.include_router(role_selection.router)
+dp.include_router(support.router)
 dp.include_router(carrier_registration.router)
+dp.include_router(carrier_feed.router)
+dp.include_router(carrier_responses.router)
 dp.include_router(client_registration.router)
 dp.include_router(application.router)
+dp.include_router(client_offers.router)
 
 
 # @dp.message()
@@ -31,8 +67,58 @@ dp.include_router(application.router)
 #     await message.answer(f"👋 Привіт, {message.from_user.full_name}!")
 
 
+def runs_singleton_jobs() -> bool:
+    # webhook-воркери (bot/webhook.py) — окремі процеси; архіви й знімок цін мають
+    # працювати в одному з них, інакше N процесів переносять ті самі пачки наввипередки.
+    # Polling — один процес, змінної там немає
+    return os.getenv("WEBHOOK_WORKER_INDEX", "0") == "0"
+
+
+@asynccontextmanager
+async def background_services():
+    # у кожному процесі: індекс маршрутів і ціни в пам'яті, метрики (свій порт), розсилка з
+    # outbox (свій токен оренди), FSM-сховище; архіви підтримки й заявок — лише в одному
+    if await ensure_schema(engine, Base.metadata):
+        print("✅ Схему БД оновлено")
+    singleton = runs_singleton_jobs()
+    metrics_runner = await start_metrics_server()
+    await warm_route_index()
+    tasks = [
+        asyncio.create_task(refresh_route_index(config.ROUTE_INDEX_REFRESH)),
+        asyncio.create_task(refresh_price_stats(config.PRICE_STATS_REFRESH, save=singleton)),
+    ]
+    if singleton:
+        tasks += [
+            asyncio.create_task(archive_support_sessions(config.SUPPORT_ARCHIVE_INTERVAL)),
+            asyncio.create_task(archive_expired_requests(config.REQUEST_ARCHIVE_INTERVAL)),
+        ]
+    dispatcher = OutboxDispatcher(bot)
+    outbox_task = asyncio.create_task(dispatcher.run())
+    try:
+        yield
+    finally:
+        dispatcher.stop()
+        for task in tasks:
+            task.cancel()
+        await outbox_task
+        await dp.storage.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        if recorder:
+            await recorder.close()
+
+
+@asynccontextmanager
+async def webhook_worker():
+    # фабрика для воркер-процесів bot/webhook.py
+    async with background_services():
+        yield bot, dp
+    await bot.session.close()
+
+
 async def main():
-    await dp.start_polling(bot)
+    async with background_services():
+        await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
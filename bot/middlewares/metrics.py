@@ -0,0 +1,51 @@
+# bot/middlewares/metrics.py
+#
+# Внутрішня middleware (dp.message / dp.callback_query): спрацьовує вже після
+# фільтрів, коли відомо, який хендлер обрано, — тож гістограма
+# bot_handler_seconds має мітки handler="модуль.функція" і state — стан FSM
+# на вході (raw_state від FSMContextMiddleware), "-" поза анкетами.
+# Ім'я хендлера рахується раз і кешується; на апдейт — perf_counter двічі,
+# dict.get і observe (bot/services/metrics.py). Винятки не ковтаються,
+# лише рахуються в bot_handler_errors_total.
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.services.metrics import HANDLER_ERRORS, HANDLER_SECONDS
+
+
+class HandlerMetrics(BaseMiddleware):
+    def __init__(self):
+        self._names: dict[Any, str] = {}
+
+    def _name(self, handler_object) -> str:
+        callback = getattr(handler_object, "callback", None)
+        name = self._names.get(callback)
+        if name is None:
+            name = self._names[callback] = (
+                f"{callback.__module__.removeprefix('bot.handlers.')}.{callback.__qualname__}"
+                if callback is not None
+                else "unknown"
+            )
+        return name
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            HANDLER_ERRORS.inc((self._name(data.get("handler")), type(e).__name__))
+            raise
+        finally:
+            HANDLER_SECONDS.observe(
+                (self._name(data.get("handler")), data.get("raw_state") or "-"),
+                time.perf_counter() - started,
+            )
@@ -0,0 +1,162 @@
+# bot/middlewares/recorder.py
+#
+# Запис вхідних апдейтів у стиснений JSONL для відтворення навантаження
+# (python -m bot.benchmarks.replay). Вмикається RECORD_UPDATES=1.
+#
+# Анонімізація до запису на диск:
+# - id користувачів і чатів → стабільні псевдоніми (blake2b з сіллю RECORD_SALT),
+#   тож послідовність апдейтів одного чату зберігається;
+# - імена, username, телефони (у контактах і в тексті) замасковані;
+# - текст на кроках ПІБ/телефон реєстрації замінюється заглушкою.
+#
+# Файли — RECORD_DIR/updates-YYYYmmdd-HH-<процес>.jsonl.gz, по рядку {"t": unix_time, "update": {...}}:
+# у кожного webhook-воркера свій файл (w<WEBHOOK_WORKER_INDEX>, інакше p<pid>) —
+# дописування кількох процесів в один gzip його ламає; replay зливає файли за t.
+# RECORD_SALT обов'язковий: з випадковою сіллю в кожного процесу свої псевдоніми,
+# і апдейти одного чату з різних воркерів у записі не зійдуться.
+# Запис на диск — пачками у фоновому потоці, event loop не блокується.
+
+import asyncio
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from bot import config
+
+_PHONE_RE = re.compile(r"\+?\d[\d\s\-()]{7,}\d")
+_ID_KEYS = {"id", "user_id", "chat_id"}
+_NAME_KEYS = {"first_name", "last_name", "username", "title"}
+SENSITIVE_STATES = {
+    "RegisterCarrier:full_name": "Прізвище Імʼя",
+    "RegisterCarrier:phone": "+380000000000",
+    "RegisterClient:full_name": "Прізвище Імʼя",
+    "RegisterClient:phone": "+380000000000",
+}
+
+
+class Anonymizer:
+    def __init__(self, salt: str | None = None):
+        self.salt = (salt or secrets.token_hex(16)).encode()
+
+    def pseudonym(self, value: int) -> int:
+        digest = hashlib.blake2b(str(value).encode(), key=self.salt[:64], digest_size=6).digest()
+        pseudo = int.from_bytes(digest, "big") or 1
+        # групи/канали в Telegram мають від'ємні id — знак зберігаємо
+        return -pseudo if value < 0 else pseudo
+
+    def scrub(self, node: Any, key: str | None = None) -> Any:
+        if isinstance(node, dict):
+            return {k: self.scrub(v, k) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self.scrub(v) for v in node]
+        if key in _ID_KEYS and isinstance(node, int) and not isinstance(node, bool):
+            return self.pseudonym(node)
+        if key in _NAME_KEYS and isinstance(node, str):
+            return "user"
+        if key == "phone_number":
+            return "+380000000000"
+        if key in ("text", "caption") and isinstance(node, str):
+            return _PHONE_RE.sub("+380000000000", node)
+        return node
+
+    def update(self, update: dict, raw_state: str | None = None) -> dict:
+        clean = self.scrub(update)
+        placeholder = SENSITIVE_STATES.get(raw_state or "")
+        message = clean.get("message")
+        if placeholder and message and "text" in message:
+            message["text"] = placeholder
+        return clean
+
+
+class TrafficRecorder(BaseMiddleware):
+    def __init__(
+        self,
+        directory: str | None = None,
+        salt: str | None = None,
+        flush_every: int = 200,
+        flush_interval: float = 5.0,
+    ):
+        salt = salt if salt is not None else config.RECORD_SALT
+        if not salt:
+            raise RuntimeError("RECORD_UPDATES=1, але RECORD_SALT не задано: потрібна спільна сіль для всіх процесів")
+        self.directory = Path(directory or config.RECORD_DIR)
+        self.anonymizer = Anonymizer(salt)
+        worker = os.getenv("WEBHOOK_WORKER_INDEX")
+        self.worker = f"w{worker}" if worker is not None else f"p{os.getpid()}"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+        self._writing: asyncio.Task | None = None
+        self.recorded = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            try:
+                raw = event.model_dump(mode="json", by_alias=True, exclude_none=True, exclude_unset=True)
+                clean = self.anonymizer.update(raw, data.get("raw_state"))
+                self._buffer.append(json.dumps({"t": time.time(), "update": clean}, ensure_ascii=False))
+                self.recorded += 1
+                if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush > self.flush_interval:
+                    self._schedule_flush()
+            except Exception as e:
+                # запис трафіку ніколи не повинен ламати обробку апдейту
+                print(f"⛔️ Запис апдейту: {e!r}")
+        return await handler(event, data)
+
+    def _schedule_flush(self):
+        if self._writing is not None and not self._writing.done():
+            return
+        lines, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        self._writing = asyncio.create_task(asyncio.to_thread(self._write, lines))
+
+    def _write(self, lines: list[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / time.strftime(f"updates-%Y%m%d-%H-{self.worker}.jsonl.gz")
+        # кожна пачка — окремий gzip-member; конкатенація members — валідний gzip
+        with gzip.open(path, "at", encoding="utf-8", compresslevel=6) as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+
+    async def close(self):
+        if self._writing is not None:
+            await self._writing
+        if self._buffer:
+            lines, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write, lines)
+
+
+def _read(path: str):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_recording(paths: list[str]):
+    # читання записів для replay: файли різних процесів зливаються за часом,
+    # у межах файлу рядки — як записані
+    yield from heapq.merge(*(_read(path) for path in sorted(paths)), key=lambda record: record["t"])
+
+
+def recording_files(target: str) -> list[str]:
+    if os.path.isdir(target):
+        return sorted(str(p) for p in Path(target).glob("*.jsonl*"))
+    return [target]
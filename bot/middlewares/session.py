@@ -0,0 +1,57 @@
+# bot/middlewares/session.py
+#
+# Зовнішня middleware на dp.update: одна сесія БД на апдейт і профіль
+# користувача з кешу (bot/services/identity.py).
+# Хендлери отримують їх аргументами:
+#     async def handler(message: Message, session: AsyncSession, identity: Identity | None)
+# AsyncSession не бере з'єднання, доки ним не скористались, тож апдейт
+# повернутого користувача з теплим кешем не робить жодного запиту; після
+# промаху кешу з'єднання повертається в пул ще до хендлера.
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bot.services.identity import IdentityCache, identity_cache
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    def __init__(self, sessionmaker: async_sessionmaker, cache: IdentityCache | None = None):
+        self.sessionmaker = sessionmaker
+        self.cache = cache or identity_cache
+        self.stats = {"updates": 0, "identity_queries": 0}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.stats["updates"] += 1
+        async with self.sessionmaker() as session:
+            data["session"] = session
+            user = data.get("event_from_user")
+            identity = None
+            if user is not None:
+                misses = self.cache.stats["misses"]
+                identity = await self.cache.resolve(session, user.id)
+                if self.cache.stats["misses"] != misses:
+                    self.stats["identity_queries"] += self.cache.stats["misses"] - misses
+                    # SELECT профілю відкрив транзакцію — віддаємо з'єднання в пул,
+                    # інакше хендлер тримав би його весь час, разом з очікуванням LLM
+                    await session.commit()
+            data["identity"] = identity
+            return await handler(event, data)
+
+    def snapshot(self) -> dict:
+        updates = self.stats["updates"]
+        return {
+            **self.stats,
+            **self.cache.stats,
+            "hit_rate": self.cache.hit_rate,
+            # без кешу кожен апдейт з from_user робив би один запит профілю
+            "queries_saved_per_update": self.cache.stats["hits"] / updates if updates else 0.0,
+            "cached_users": len(self.cache),
+        }
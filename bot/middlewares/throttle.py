@@ -0,0 +1,84 @@
+# bot/middlewares/throttle.py
+#
+# Зовнішня middleware на dp.update, до DbSessionMiddleware: користувач, що
+# тисне кнопки чи вставляє текст у анкету без упину, впирається в token bucket
+# (bot/services/throttle.py) раніше, ніж відкриється сесія БД чи піде запит у LLM.
+# Хендлер тут ще не обраний, тож ціна апдейта визначається тим, куди він
+# потрапить: стан FSM (raw_state від FSMContextMiddleware) або префікс
+# callback_data. Ціни — у токенах, відро поповнюється THROTTLE_RATE токенів
+# за секунду до THROTTLE_BURST.
+# Відхилений апдейт не доходить до хендлерів; користувач отримує одну коротку
+# відповідь на вікно відмови (для кнопок — answer без тексту в чаті).
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from bot.services.metrics import THROTTLED
+from bot.services.throttle import TokenBuckets, token_buckets
+
+CHEAP, DB, EXPENSIVE = 1, 2, 5
+
+STATE_COSTS = {
+    "ClientApplicationFSM:date": EXPENSIVE,  # normalize_date → LLM
+    "ClientApplicationFSM:price": EXPENSIVE,  # finish_application: заявка + розсилка перевізникам
+    "NegotiateFSM:price": DB,
+    "RegisterCarrier:capacity": DB,
+    "RegisterClient:phone": DB,
+}
+CALLBACK_COSTS = (
+    ("offer_accept_", EXPENSIVE),  # транзакція вибору + сповіщення
+    ("accept_", DB),
+    ("decline_", DB),
+    ("negotiate_", DB),
+    ("offer_reject_", DB),
+    ("feed", DB),
+    ("digest_", DB),
+    ("support_older_", DB),
+)
+
+MESSAGE_REPLY = "⏳ Забагато повідомлень поспіль. Зачекайте {wait} с і спробуйте ще раз."
+CALLBACK_REPLY = "⏳ Зачекайте {wait} с"
+
+
+def update_cost(update: Update, raw_state: str | None) -> tuple[str, int]:
+    if update.callback_query is not None:
+        data = update.callback_query.data or ""
+        for prefix, cost in CALLBACK_COSTS:
+            if data.startswith(prefix):
+                return prefix.rstrip("_"), cost
+        return "callback", CHEAP
+    if raw_state is not None and update.message is not None:
+        cost = STATE_COSTS.get(raw_state)
+        if cost is not None:
+            return raw_state, cost
+    return "message", CHEAP
+
+
+class ThrottleMiddleware(BaseMiddleware):
+    def __init__(self, buckets: TokenBuckets | None = None):
+        self.buckets = buckets or token_buckets
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or not isinstance(event, Update):
+            return await handler(event, data)
+        kind, cost = update_cost(event, data.get("raw_state"))
+        wait = self.buckets.acquire(user.id, cost)
+        if not wait:
+            return await handler(event, data)
+
+        THROTTLED.inc((kind,))
+        seconds = max(1, round(wait))
+        if event.callback_query is not None:
+            # кнопку треба "відпустити" в будь-якому разі, інакше клієнт крутить годинник
+            await event.callback_query.answer(CALLBACK_REPLY.format(wait=seconds))
+        elif event.message is not None and self.buckets.should_warn(user.id, wait):
+            await event.message.answer(MESSAGE_REPLY.format(wait=seconds))
+        return None
@@ -1,2 +1,8 @@
 from bot.models.carrier import Carrier
-from bot.models.support import SupportMessage, SupportSession
+from bot.models.client import Client
+from bot.models.shipment_request import Shipment_request, shipment_request_history
+from bot.models.support import SupportArchive, SupportMessage, SupportSession
+from bot.models.outbox import NotificationDigest, NotificationOutbox
+from bot.models.fsm import FSMRecord
+from bot.models.response import RequestResponse
+from bot.models.price_stats import RoutePriceStats
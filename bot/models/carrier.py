@@ -1,8 +1,10 @@
 # bot/models.py
 
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column, validates
+from sqlalchemy import String, Integer, Float, DateTime, false, func, true
 from bot.database.database import Base
+from bot.geo.routes import make_route_key, parse_route
+from bot.services.units import parse_volume, parse_weight
 from datetime import datetime
 
 
@@ -14,4 +16,29 @@ class Carrier(Base):
     full_name: Mapped[str] = mapped_column(String(255))
     phone: Mapped[str] = mapped_column(String(50))
     route: Mapped[str] = mapped_column(String(255))
+    # нормалізовані ключі маршруту (bot/geo/routes.py), заповнюються з route
+    origin_key: Mapped[str] = mapped_column(String(64), nullable=True)
+    destination_key: Mapped[str] = mapped_column(String(64), nullable=True)
+    route_key: Mapped[str] = mapped_column(String(128), nullable=True, index=True)
+    # місткість авто як ввів перевізник ("20 т, 82 м³, 33 палети") і розібрані значення
+    capacity: Mapped[str] = mapped_column(String(255), nullable=True)
+    capacity_kg: Mapped[float] = mapped_column(Float, nullable=True, index=True)
+    capacity_m3: Mapped[float] = mapped_column(Float, nullable=True)
+    capacity_pallets: Mapped[int] = mapped_column(Integer, nullable=True)
+    # False — бот заблоковано перевізником, розсилки пропускаємо
+    is_active: Mapped[bool] = mapped_column(default=True, server_default=true())
+    # зведення (/digest): нові заявки за вікно — одним повідомленням, що оновлюється (bot/services/digest.py)
+    digest_mode: Mapped[bool] = mapped_column(default=False, server_default=false())
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    @validates("route")
+    def validate_route(self, key, value):
+        self.origin_key, self.destination_key = parse_route(value)
+        self.route_key = make_route_key(self.origin_key, self.destination_key)
+        return value
+
+    @validates("capacity")
+    def validate_capacity(self, key, value):
+        self.capacity_kg = parse_weight(value)
+        self.capacity_m3, self.capacity_pallets = parse_volume(value)
+        return value
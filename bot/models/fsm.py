@@ -0,0 +1,16 @@
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from bot.database.database import Base
+from datetime import datetime
+
+
+class FSMRecord(Base):
+    __tablename__ = "fsm_storage"
+
+    # bot_id:chat_id:user_id[:thread_id][:business_connection_id]:destiny
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[str] = mapped_column(String(255), nullable=True)
+    data: Mapped[dict] = mapped_column(JSON, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    # покинуті форми видаляються після expires_at
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
@@ -0,0 +1,48 @@
+from sqlalchemy import BigInteger, DateTime, Index, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from bot.database.database import Base
+from datetime import datetime
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # new_request — картка заявки; request_taken — редагування вже надісланої картки
+    kind: Mapped[str] = mapped_column(String(32), default="new_request")
+    # без зовнішнього ключа: заявка може вже бути в місячному архіві (bot/database/partitions.py)
+    request_id: Mapped[int] = mapped_column(index=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    # pending → sent | digested (увійшло у зведення) | blocked | failed | cancelled
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    # id повідомлення в чаті: для new_request — надісланого, для request_taken — того, що редагуємо
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    attempts: Mapped[int] = mapped_column(default=0)
+    # хто з диспетчерів забрав рядок і до якого часу
+    locked_by: Mapped[str] = mapped_column(String(64), nullable=True)
+    locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # наступні хвилі розсилки (bot/services/notifier.py): не надсилати раніше цього часу
+    send_after: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_id", "status", "id"),
+        Index("ix_notification_outbox_locked_by", "locked_by"),
+    )
+
+
+class NotificationDigest(Base):
+    # одне повідомлення-зведення на перевізника за вікно DIGEST_WINDOW (bot/services/digest.py)
+    __tablename__ = "notification_digests"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    # id заявок через кому, новіші першими
+    request_ids: Mapped[str] = mapped_column(Text, default="")
+    opened_at: Mapped[datetime] = mapped_column(DateTime)
+    closes_at: Mapped[datetime] = mapped_column(DateTime)
+    edited_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_notification_digests_chat_id_closes_at", "chat_id", "closes_at"),)
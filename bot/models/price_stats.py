@@ -0,0 +1,18 @@
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from bot.database.database import Base
+from datetime import datetime
+
+
+class RoutePriceStats(Base):
+    # знімок bot/services/price_stats.py: старт читає його і доганяє лише нові заявки
+    __tablename__ = "route_price_stats"
+
+    route_key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    mean: Mapped[float] = mapped_column(Float, default=0)
+    # центроїди t-digest: float64 (середнє, вага) поспіль
+    sketch: Mapped[bytes] = mapped_column(LargeBinary)
+    # до якої заявки (id) включно знімок повний
+    last_request_id: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+from bot.database.database import Base
+from datetime import datetime
+
+
+class RequestResponse(Base):
+    # відповідь перевізника на заявку: відмова або своя ставка;
+    # на пару (заявка, перевізник) — один рядок, повторне натискання його оновлює
+    __tablename__ = "request_responses"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # без зовнішнього ключа: заявка може вже бути в місячному архіві (bot/database/partitions.py)
+    request_id: Mapped[int] = mapped_column(index=True)
+    carrier_telegram_id: Mapped[int] = mapped_column(BigInteger)
+    # declined | offer
+    kind: Mapped[str] = mapped_column(String(16))
+    price: Mapped[int] = mapped_column(Integer, nullable=True)
+    # версія заявки, на яку зроблено пропозицію: якщо заявка змінилась, пропозиція недійсна
+    request_version: Mapped[int] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("request_id", "carrier_telegram_id", name="uq_request_responses_request_carrier"),
+    )
@@ -0,0 +1,284 @@
+# bot/models/scripts/bulk.py
+#
+# Потоковий імпорт/експорт CSV і JSONL для carriers, clients, shipment_request
+# і генератор фейкових даних. Пам'ять постійна: рядки читаються/пишуться
+# порціями по --chunk-size.
+# Імпорт — Core insert() executemany, на Postgres (asyncpg) — COPY.
+# ORM-валідатори тут не працюють, тому route_key і розібрані вага/обʼєм
+# (bot/services/units.py) рахуємо самі, якщо їх немає у файлі.
+#
+#   python -m bot.models.scripts.bulk export carriers -o carriers.csv
+#   python -m bot.models.scripts.bulk import carriers carriers.csv --chunk-size 5000
+#   python -m bot.models.scripts.bulk generate shipment_request --count 1000000 -o requests.jsonl
+#   python -m bot.models.scripts.bulk generate carriers --count 100000 --load
+#
+# Формат визначається розширенням файлу (.csv / .jsonl), "-" — stdin/stdout.
+
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from bot.database.database import engine as default_engine
+from bot.geo.routes import make_route_key, parse_route
+from bot.models import Carrier, Client, Shipment_request
+from bot.models.scripts.fake_data import FakeData
+from bot.services.units import parse_batch, parse_volume, parse_weight
+
+TABLES: dict[str, Table] = {
+    "carriers": Carrier.__table__,
+    "clients": Client.__table__,
+    "shipment_request": Shipment_request.__table__,
+}
+
+
+def _format(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.endswith(".csv") else "jsonl"
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        return io.TextIOWrapper(stream.buffer, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+# --- читання/запис рядків ---
+
+
+def _converters(table: Table) -> dict:
+    def to_datetime(value):
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+    def to_bool(value):
+        return value if isinstance(value, bool) else str(value).lower() in ("1", "true", "t", "yes")
+
+    converters = {}
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            converters[column.name] = to_datetime
+        elif isinstance(column.type, Boolean):
+            converters[column.name] = to_bool
+        elif isinstance(column.type, Integer):
+            converters[column.name] = int
+        elif isinstance(column.type, Float):
+            # weight_kg, volume_m3, capacity_*: з CSV приходять рядками, Postgres їх не прийме
+            converters[column.name] = float
+    return converters
+
+
+def _empty_value(column):
+    # порожня клітинка CSV → значення за замовчуванням колонки, а не NULL
+    if column.default is not None and column.default.is_scalar:
+        return column.default.arg
+    if column.server_default is not None and isinstance(column.type, DateTime):
+        return datetime.now()
+    return None
+
+
+def read_rows(stream, fmt: str, table: Table) -> Iterator[dict]:
+    columns = set(table.columns.keys())
+    converters = _converters(table)
+    source = csv.DictReader(stream) if fmt == "csv" else (json.loads(line) for line in stream if line.strip())
+    for raw in source:
+        row = {}
+        for key, value in raw.items():
+            if key not in columns:
+                continue
+            if value == "" or value is None:
+                row[key] = _empty_value(table.columns[key])
+                continue
+            convert = converters.get(key)
+            row[key] = convert(value) if convert else value
+        if "route_key" in columns and row.get("route") and not row.get("route_key"):
+            row["origin_key"], row["destination_key"] = parse_route(row["route"])
+            row["route_key"] = make_route_key(row["origin_key"], row["destination_key"])
+        yield row
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RowWriter:
+    def __init__(self, stream, fmt: str, columns: list[str]):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=columns, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, rows: Iterable) -> None:
+        for row in rows:
+            row = {key: _serialize(value) for key, value in row.items()}
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self.stream.write(json.dumps(row, ensure_ascii=False))
+                self.stream.write("\n")
+            self.count += 1
+
+
+# сирий текст → розібрані колонки, які треба заповнити
+_UNIT_SOURCES = {
+    "shipment_request": (("weight", parse_weight, ("weight_kg",)), ("volume", parse_volume, ("volume_m3", "pallets"))),
+    "carriers": (
+        ("capacity", parse_weight, ("capacity_kg",)),
+        ("capacity", parse_volume, ("capacity_m3", "capacity_pallets")),
+    ),
+}
+
+
+def fill_units(table: Table, chunk: list[dict]) -> list[dict]:
+    # один batch-розбір на колонку порції, а не парсер на кожен рядок
+    for source, parser, targets in _UNIT_SOURCES.get(table.name, ()):
+        missing = [row for row in chunk if row.get(source) and row.get(targets[0]) is None]
+        if not missing:
+            continue
+        for row, parsed in zip(missing, parse_batch([row[source] for row in missing], parser)):
+            values = parsed if len(targets) > 1 else (parsed,)
+            row.update(zip(targets, values))
+    return chunk
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+# --- БД ---
+
+
+async def import_rows(engine: AsyncEngine, table: Table, rows: Iterable[dict], chunk_size: int = 5000) -> int:
+    total = 0
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "asyncpg"
+    async with engine.begin() as conn:
+        for chunk in _chunks(rows, chunk_size):
+            fill_units(table, chunk)
+            # executemany вимагає однаковий набір ключів у всіх рядках порції
+            columns = list(dict.fromkeys(key for row in chunk for key in row))
+            if use_copy:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    table.name,
+                    records=[tuple(row.get(c) for c in columns) for row in chunk],
+                    columns=columns,
+                )
+            else:
+                await conn.execute(insert(table), [{c: row.get(c) for c in columns} for row in chunk])
+            total += len(chunk)
+        if use_copy and "id" in table.columns:
+            # після COPY з явними id послідовність треба підтягнути
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+                )
+            )
+    return total
+
+
+async def export_rows(engine: AsyncEngine, table: Table, stream, fmt: str, chunk_size: int = 5000) -> int:
+    writer = RowWriter(stream, fmt, list(table.columns.keys()))
+    async with engine.connect() as conn:
+        result = await conn.stream(select(table).order_by(table.c.id).execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions(chunk_size):
+            writer.write(partition)
+    return writer.count
+
+
+async def count_rows(engine: AsyncEngine, table: Table) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(select(func.count()).select_from(table))
+
+
+def _report(action: str, table: str, count: int, started: float, engine: AsyncEngine | None = None):
+    elapsed = time.perf_counter() - started
+    backend = f" [{engine.dialect.name}]" if engine is not None else ""
+    print(
+        f"✅ {action} {table}{backend}: {count:,} рядків за {elapsed:.2f} с ({count / elapsed if elapsed else 0:,.0f} рядків/с)",
+        file=sys.stderr,
+    )
+
+
+# --- CLI ---
+
+
+async def run(args):
+    table = TABLES[args.table]
+    engine = default_engine
+    started = time.perf_counter()
+
+    if args.command == "import":
+        fmt = _format(args.path, args.format)
+        with _open(args.path, "r") as stream:
+            count = await import_rows(engine, table, read_rows(stream, fmt, table), args.chunk_size)
+        _report("Імпорт", args.table, count, started, engine)
+
+    elif args.command == "export":
+        fmt = _format(args.output, args.format)
+        with _open(args.output, "w") as stream:
+            count = await export_rows(engine, table, stream, fmt, args.chunk_size)
+        _report("Експорт", args.table, count, started, engine)
+
+    elif args.command == "generate":
+        rows = FakeData(args.seed).rows(args.table, args.count)
+        if args.load:
+            count = await import_rows(engine, table, rows, args.chunk_size)
+            _report("Генерація + імпорт", args.table, count, started, engine)
+        else:
+            fmt = _format(args.output, args.format)
+            with _open(args.output, "w") as stream:
+                writer = RowWriter(stream, fmt, [c for c in table.columns.keys() if c != "id"])
+                for chunk in _chunks(rows, args.chunk_size):
+                    writer.write(fill_units(table, chunk))
+            _report("Генерація", args.table, writer.count, started)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масовий імпорт/експорт і генерація даних")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("table", choices=sorted(TABLES))
+        p.add_argument("--format", choices=("csv", "jsonl"))
+        p.add_argument("--chunk-size", type=int, default=5000)
+
+    p = sub.add_parser("import")
+    common(p)
+    p.add_argument("path")
+
+    p = sub.add_parser("export")
+    common(p)
+    p.add_argument("-o", "--output", default="-")
+
+    p = sub.add_parser("generate")
+    common(p)
+    p.add_argument("--count", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("--load", action="store_true", help="одразу вставити в БД замість запису у файл")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
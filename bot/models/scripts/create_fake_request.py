@@ -1,17 +1,18 @@
 # scripts/create_fake_request.py
 
 import asyncio
-import datetime
-from bot.models.shipment_request import ShipmentRequest
+import random
+from datetime import datetime, timedelta
+from bot.models.shipment_request import Shipment_request
 from bot.database.database import async_session
 from bot.services.notifier import notify_carriers
-from bot.main import bot  # якщо бот вже створений
 
 
 async def main():
-    fake = ShipmentRequest(
+    fake = Shipment_request(
+        client_telegram_id=random.randint(10**9, 2 * 10**9),
         route="Київ → Львів",
-        date=datetime(2025, 7, 20, 10, 0),
+        date=(datetime.now() + timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0),
         cargo_type="Побутова техніка, упакована на палетах",
         volume="6 палет",
         weight="2.2 т",
@@ -22,9 +23,9 @@ async def main():
 
     async with async_session() as session:
         session.add(fake)
+        await notify_carriers(session, fake)
         await session.commit()
-
-    await notify_carriers(bot, fake)
+    print(f"✅ Тестова заявка #{fake.id} створена")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+# bot/models/scripts/fake_data.py
+#
+# Генератор правдоподібних даних для навантажувальних тестів:
+# перевізники, клієнти і заявки між містами з газетира, ціна залежить від
+# відстані. Усе — генератори рядків-словників, пам'ять не росте з --count.
+
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from bot.geo.gazetteer import get_gazetteer
+from bot.geo.routes import make_route_key
+
+FIRST_NAMES = (
+    "Олександр", "Андрій", "Сергій", "Володимир", "Іван", "Микола", "Василь",
+    "Дмитро", "Юрій", "Петро", "Олена", "Наталія", "Оксана", "Тетяна", "Ірина",
+    "Марія", "Богдан", "Тарас", "Роман", "Максим",
+)
+LAST_NAMES = (
+    "Шевченко", "Коваленко", "Бондаренко", "Ткаченко", "Кравченко", "Олійник",
+    "Шевчук", "Поліщук", "Бойко", "Мельник", "Лисенко", "Руденко", "Савченко",
+    "Марченко", "Гончаренко", "Мороз", "Петренко", "Левченко", "Кравчук", "Федоренко",
+)
+CARGO_TYPES = (
+    "Побутова техніка, упакована на палетах", "Будматеріали", "Продукти харчування",
+    "Меблі", "Зерно", "Металопрокат", "Автозапчастини", "Одяг і взуття",
+    "Медичне обладнання", "Напої", "Хімія в каністрах", "Папір і картон",
+)
+LOADING = ("Рокла, рампа", "Рампа", "Ручне", "Навантажувач", "Верхнє", "Бокове")
+UNLOADING = ("Ручне", "Рампа", "Навантажувач", "Кран-маніпулятор", "Бокове")
+UAH_PER_KM = (28, 45)
+# типові кузови: бус, 5-тонник, 10-тонник, фура
+CAPACITIES = (
+    "1.5 т, 12 м³, 4 палети", "5 т, 36 м³, 15 палет",
+    "10 т, 45 м³, 18 палет", "22 т, 86 м³, 33 палети",
+)
+
+
+def _cities():
+    gazetteer = get_gazetteer()
+    keys, names, coords, weights = [], [], [], []
+    for rank, (key, lat, lon) in enumerate(gazetteer):
+        keys.append(key)
+        names.append(gazetteer.name(key))
+        coords.append((lat, lon))
+        # великі міста (на початку списку) частіше
+        weights.append(1 / (rank + 1) ** 0.7)
+    return keys, names, coords, weights
+
+
+def _km(a: tuple[float, float], b: tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * math.asin(math.sqrt(h)) * 1.25  # дорогами ~ на чверть довше
+
+
+class FakeData:
+    def __init__(self, seed: int = 0, now: datetime | None = None):
+        self.rng = random.Random(seed)
+        self.now = now or datetime.now().replace(minute=0, second=0, microsecond=0)
+        self.keys, self.names, self.coords, weights = _cities()
+        self._indices = range(len(self.keys))
+        self._cum_weights = list(itertools.accumulate(weights))
+
+    def _route(self) -> tuple[str, str, str, float]:
+        a, b = self.rng.choices(self._indices, cum_weights=self._cum_weights, k=2)
+        while a == b:
+            b = self.rng.choices(self._indices, cum_weights=self._cum_weights)[0]
+        route = f"{self.names[a]} → {self.names[b]}"
+        return route, self.keys[a], self.keys[b], _km(self.coords[a], self.coords[b])
+
+    def _person(self) -> tuple[str, str]:
+        name = f"{self.rng.choice(LAST_NAMES)} {self.rng.choice(FIRST_NAMES)}"
+        phone = f"+380{self.rng.choice((50, 63, 66, 67, 68, 73, 93, 95, 96, 97, 98, 99))}{self.rng.randrange(10**7):07d}"
+        return name, phone
+
+    def carriers(self, count: int, first_telegram_id: int = 100_000_000) -> Iterator[dict]:
+        for i in range(count):
+            name, phone = self._person()
+            route, origin, destination, _ = self._route()
+            yield {
+                "telegram_id": first_telegram_id + i,
+                "full_name": name,
+                "phone": phone,
+                "route": route,
+                "origin_key": origin,
+                "destination_key": destination,
+                "route_key": make_route_key(origin, destination),
+                "capacity": self.rng.choice(CAPACITIES),
+                "is_active": self.rng.random() > 0.03,
+            }
+
+    def clients(self, count: int, first_telegram_id: int = 500_000_000) -> Iterator[dict]:
+        for i in range(count):
+            name, phone = self._person()
+            yield {"telegram_id": first_telegram_id + i, "full_name": name, "phone": phone}
+
+    def requests(self, count: int, first_telegram_id: int = 500_000_000) -> Iterator[dict]:
+        for i in range(count):
+            route, origin, destination, km = self._route()
+            pallets = self.rng.randint(1, 33)
+            rate = self.rng.uniform(*UAH_PER_KM)
+            yield {
+                "client_telegram_id": first_telegram_id + i,
+                "route": route,
+                "origin_key": origin,
+                "destination_key": destination,
+                "route_key": make_route_key(origin, destination),
+                "date": self.now + timedelta(days=self.rng.randint(0, 30), hours=self.rng.randint(8, 18) - self.now.hour),
+                "cargo_type": self.rng.choice(CARGO_TYPES),
+                "volume": f"{pallets} палет",
+                "weight": f"{pallets * self.rng.uniform(0.3, 0.8):.1f} т",
+                "loading": self.rng.choice(LOADING),
+                "unloading": self.rng.choice(UNLOADING),
+                "price": int(max(1500, km * rate) // 100 * 100),
+            }
+
+    def rows(self, table: str, count: int) -> Iterator[dict]:
+        return {
+            "carriers": self.carriers,
+            "clients": self.clients,
+            "shipment_request": self.requests,
+        }[table](count)
@@ -1,42 +1,99 @@
 # bot/models/request.py
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, func
+from sqlalchemy import BigInteger, Column, String, DateTime, Float, Index, Integer, MetaData, Table, Text, event, func
 from datetime import datetime
-from bot.ai_helper.date_parser import normalize_date_with_groq
 from bot.database.database import Base
+from bot.database.partitions import HISTORY_VIEW, drop_history_view, refresh_history_view
+from bot.geo.routes import make_route_key, parse_route
+from bot.services.units import parse_price, parse_volume, parse_weight, whole
 from sqlalchemy.orm import validates
-import dateparser
 
 
 class Shipment_request(Base):
     __tablename__ = "shipment_request"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    client_telegram_id: Mapped[int] = mapped_column(unique=True, index=True)
+    # у клієнта може бути скільки завгодно заявок
+    client_telegram_id: Mapped[int] = mapped_column(index=True)
     route: Mapped[str] = mapped_column(String)
+    origin_key: Mapped[str] = mapped_column(String(64), nullable=True)
+    destination_key: Mapped[str] = mapped_column(String(64), nullable=True)
+    route_key: Mapped[str] = mapped_column(String(128), nullable=True, index=True)
     date: Mapped[datetime] = mapped_column(DateTime)
     cargo_type: Mapped[str] = mapped_column(String)
     volume: Mapped[str] = mapped_column(String)
     weight: Mapped[str] = mapped_column(String)
+    # розібрані з volume/weight (bot/services/units.py) — для фільтрів за місткістю
+    weight_kg: Mapped[float] = mapped_column(Float, nullable=True, index=True)
+    volume_m3: Mapped[float] = mapped_column(Float, nullable=True, index=True)
+    pallets: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
     loading: Mapped[str] = mapped_column(String)
     unloading: Mapped[str] = mapped_column(String)
     price: Mapped[int] = mapped_column(Integer)
+    price_currency: Mapped[str] = mapped_column(String(3), default="UAH", server_default="UAH")
     description: Mapped[str] = mapped_column(Text, nullable=True)
+    # open → taken | cancelled; version зростає з кожною зміною статусу/ціни,
+    # перехід робиться умовним UPDATE (bot/services/claims.py)
+    status: Mapped[str] = mapped_column(String(16), default="open", server_default="open")
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    carrier_telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=True, index=True)
+    # взяті заявки йдуть в архів через REQUEST_ARCHIVE_AFTER_DAYS після taken_at
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
-    @validates("date")
-    def validate_date(self, key, value):
-        if isinstance(value, str):
-            parsed = normalize_date_with_groq(value)
-            if parsed is None:
-                raise ValueError("Невалідна дата")
-            return parsed
+    __table_args__ = (
+        # keyset-пагінація стрічки відкритих заявок (bot/services/feed.py):
+        # по маршруту і без фільтра маршруту
+        Index("ix_shipment_request_route_date_id", "route_key", "date", "id"),
+        Index("ix_shipment_request_date_id", "date", "id"),
+        # id не перевикористовуються після архівації (міграція 0010)
+        {"sqlite_autoincrement": True},
+    )
+
+    @validates("route")
+    def validate_route(self, key, value):
+        self.origin_key, self.destination_key = parse_route(value)
+        self.route_key = make_route_key(self.origin_key, self.destination_key)
+        return value
+
+    @validates("weight")
+    def validate_weight(self, key, value):
+        self.weight_kg = parse_weight(value)
+        return value
+
+    @validates("volume")
+    def validate_volume(self, key, value):
+        self.volume_m3, self.pallets = parse_volume(value)
         return value
 
     @validates("price")
     def validate_price(self, key, value):
+        # "8 000.50 грн" → 8001, а не 800050; нерозібраний текст має відсіяти хендлер,
+        # заявка з ціною 0 до перевізників не йде
         if isinstance(value, str):
-            digits = "".join(filter(str.isdigit, value))
-            return int(digits or 0)
+            parsed = parse_price(value)
+            if parsed is None or whole(parsed.amount) <= 0:
+                raise ValueError(f"не вдалося розібрати ціну: {value!r}")
+            self.price_currency = parsed.currency
+            return whole(parsed.amount)
         return value
+
+
+# усі заявки — живі й заархівовані по місяцях (bot/database/partitions.py);
+# view, лише для читання, тому окрема MetaData: create_all його не створює
+shipment_request_history = Table(
+    HISTORY_VIEW,
+    MetaData(),
+    *(Column(c.name, c.type, primary_key=c.primary_key) for c in Shipment_request.__table__.columns),
+)
+
+
+@event.listens_for(Shipment_request.__table__, "after_create")
+def _create_history_view(table, connection, **kw):
+    refresh_history_view(connection, table)
+
+
+@event.listens_for(Shipment_request.__table__, "before_drop")
+def _drop_history_view(table, connection, **kw):
+    drop_history_view(connection)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey, Text, DateTime, func
+from sqlalchemy import BigInteger, Integer, String, Boolean, ForeignKey, Index, LargeBinary, Text, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from bot.database.database import Base
 from datetime import datetime
@@ -8,11 +8,20 @@ class SupportSession(Base):
     __tablename__ = "support_sessions"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(index=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, index=True)
     is_active: Mapped[bool] = mapped_column(default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    closed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, index=True)
 
-    messages: Mapped[list["SupportMessage"]] = relationship(back_populates="session")
+    # Історія може бути довгою — лише явні запити з пагінацією
+    # (bot/services/support.py) або selectinload; ліниве читання заборонене
+    messages: Mapped[list["SupportMessage"]] = relationship(back_populates="session", lazy="raise")
+
+    __table_args__ = (
+        Index("ix_support_sessions_user_active", "user_id", "is_active"),
+        # id сесії — ключ у support_archive, повторно видавати його не можна (міграція 0011)
+        {"sqlite_autoincrement": True},
+    )
 
 
 class SupportMessage(Base):
@@ -22,6 +31,24 @@ class SupportMessage(Base):
     session_id: Mapped[int] = mapped_column(ForeignKey("support_sessions.id"))
     from_admin: Mapped[bool] = mapped_column()
     text: Mapped[str] = mapped_column(Text)
+    # id копії в чаті підтримки — відповідь адміна (reply) знаходить сесію за ним
+    admin_message_id: Mapped[int] = mapped_column(BigInteger, nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     session: Mapped["SupportSession"] = relationship(back_populates="messages")
+
+    __table_args__ = (Index("ix_support_messages_session_id_id", "session_id", "id"),)
+
+
+class SupportArchive(Base):
+    # закриті сесії: уся історія одним стиснутим блоком (zlib + JSON),
+    # гарячі support_sessions / support_messages лишаються малими
+    __tablename__ = "support_archive"
+
+    session_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    closed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    message_count: Mapped[int] = mapped_column(Integer, default=0)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,214 @@
+# bot/services/broadcast.py
+#
+# Розсилка повідомлень з дотриманням лімітів Telegram:
+# - глобальний token bucket (~30 повідомлень/с на бота)
+# - не частіше 1 повідомлення/с в один чат
+# - пул воркерів замість послідовних await
+# - TelegramRetryAfter → чекаємо retry_after і пробуємо знову
+# - TelegramForbiddenError → користувач заблокував бота, збираємо в stats.blocked
+# - мережа і 5xx Telegram → повтор з паузою; будь-яка інша помилка — лише цей
+#   лист у stats.undelivered, решта розсилки (і облік outbox після неї) триває
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.types import InlineKeyboardMarkup
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        # після 429 від Telegram глобально пригальмовуємо всіх воркерів
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class ChatLimiter:
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._next_at: dict[int, float] = {}
+
+    async def acquire(self, chat_id: int):
+        now = time.monotonic()
+        next_at = self._next_at.get(chat_id, 0.0)
+        self._next_at[chat_id] = max(now, next_at) + self.interval
+        if next_at > now:
+            await asyncio.sleep(next_at - now)
+        if len(self._next_at) > 10_000:
+            self._cleanup()
+
+    def _cleanup(self):
+        now = time.monotonic()
+        self._next_at = {k: v for k, v in self._next_at.items() if v > now}
+
+
+@dataclass
+class OutgoingMessage:
+    chat_id: int
+    text: str
+    reply_markup: InlineKeyboardMarkup | None = None
+    parse_mode: str | None = "HTML"
+    # довільна мітка відправника (напр. id рядка outbox), Broadcaster її не чіпає
+    tag: object = None
+    # замість нового повідомлення — редагувати вже надіслане
+    edit_message_id: int | None = None
+    # id надісланого повідомлення (заповнює Broadcaster)
+    message_id: int | None = None
+
+
+@dataclass
+class BroadcastStats:
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    blocked: list[int] = field(default_factory=list)
+    # заблоковані + ті, що не вдалось доставити після всіх спроб
+    undelivered: list[OutgoingMessage] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"📨 Розсилка: {self.sent}/{self.total} доставлено, "
+            f"{len(self.blocked)} заблокували, {self.failed} помилок, "
+            f"{self.retries} повторів, {self.elapsed:.2f} с ({self.throughput:.1f} повід./с)"
+        )
+
+
+class Broadcaster:
+    def __init__(
+        self,
+        bot: Bot,
+        bucket: TokenBucket | None = None,
+        chat_limiter: ChatLimiter | None = None,
+        workers: int = 16,
+        max_retries: int = 3,
+    ):
+        self.bot = bot
+        self.bucket = bucket or TokenBucket(rate=30)
+        self.chat_limiter = chat_limiter or ChatLimiter(interval=1.0)
+        self.workers = workers
+        self.max_retries = max_retries
+
+    async def broadcast(self, messages: list[OutgoingMessage]) -> BroadcastStats:
+        stats = BroadcastStats(total=len(messages))
+        if not messages:
+            return stats
+
+        queue: asyncio.Queue[OutgoingMessage] = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+
+        async def worker():
+            while True:
+                try:
+                    message = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self._deliver(message, stats)
+                except Exception as e:
+                    # один зламаний лист не має зірвати gather і облік решти
+                    print(f"⛔️ Не вдалося надіслати {message.chat_id}: {e!r}")
+                    stats.failed += 1
+                    stats.undelivered.append(message)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(messages)))))
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    async def _deliver(self, message: OutgoingMessage, stats: BroadcastStats):
+        for attempt in range(self.max_retries + 1):
+            await self.chat_limiter.acquire(message.chat_id)
+            await self.bucket.acquire()
+            try:
+                if message.edit_message_id is not None:
+                    await self.bot.edit_message_text(
+                        message.text,
+                        chat_id=message.chat_id,
+                        message_id=message.edit_message_id,
+                        reply_markup=message.reply_markup,
+                        parse_mode=message.parse_mode,
+                    )
+                    message.message_id = message.edit_message_id
+                else:
+                    sent = await self.bot.send_message(
+                        message.chat_id,
+                        message.text,
+                        reply_markup=message.reply_markup,
+                        parse_mode=message.parse_mode,
+                    )
+                    message.message_id = sent.message_id
+                stats.sent += 1
+                return
+            except TelegramRetryAfter as e:
+                stats.retries += 1
+                self.bucket.pause(e.retry_after)
+                await asyncio.sleep(e.retry_after)
+            except TelegramForbiddenError:
+                stats.blocked.append(message.chat_id)
+                stats.undelivered.append(message)
+                return
+            except (TelegramNetworkError, TelegramServerError):
+                stats.retries += 1
+                await asyncio.sleep(min(2**attempt, 10))
+            except TelegramBadRequest as e:
+                if message.edit_message_id is not None and _edit_is_moot(e):
+                    # повідомлення вже змінене чи видалене — редагувати нічого
+                    stats.sent += 1
+                    return
+                print(f"⛔️ Не вдалося надіслати {message.chat_id}: {e.message}")
+                break
+            except TelegramAPIError as e:
+                # NotFound, Unauthorized, MigrateToChat тощо — повтор не допоможе
+                print(f"⛔️ Не вдалося надіслати {message.chat_id}: {e!r}")
+                break
+        stats.failed += 1
+        stats.undelivered.append(message)
+
+
+def _edit_is_moot(error: TelegramBadRequest) -> bool:
+    text = error.message.lower()
+    return "message is not modified" in text or "message to edit not found" in text
+
+
+_broadcasters: dict[int, Broadcaster] = {}
+
+
+def get_broadcaster(bot: Bot) -> Broadcaster:
+    # один token bucket на бота, спільний для всіх розсилок
+    broadcaster = _broadcasters.get(id(bot))
+    if broadcaster is None or broadcaster.bot is not bot:
+        broadcaster = _broadcasters[id(bot)] = Broadcaster(bot)
+    return broadcaster
@@ -0,0 +1,71 @@
+# bot/services/capacity.py
+#
+# Підбір за місткістю: діапазонні запити по розібраних колонках
+# (weight_kg / volume_m3 / pallets у заявках, capacity_* у перевізників),
+# які лежать в індексах, — замість читання рядків "6 палет" і розбору в Python.
+# Невказана місткість перевізника не відсікає його: краще зайве сповіщення,
+# ніж втрачений рейс.
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.models import Carrier, Shipment_request
+
+
+def carrier_fits(request: Shipment_request):
+    # умова на Carrier: авто вміщує заявку (або місткість невідома)
+    conditions = []
+    for limit, need in (
+        (Carrier.capacity_kg, request.weight_kg),
+        (Carrier.capacity_m3, request.volume_m3),
+        (Carrier.capacity_pallets, request.pallets),
+    ):
+        if need is not None:
+            conditions.append(or_(limit.is_(None), limit >= need))
+    return and_(*conditions) if conditions else None
+
+
+def fits(capacity: tuple | None, weight_kg: float | None, volume_m3: float | None, pallets: int | None) -> bool:
+    # те саме для індексу в пам'яті: capacity = (кг, м³, палети)
+    if capacity is None:
+        return True
+    for limit, need in zip(capacity, (weight_kg, volume_m3, pallets)):
+        if limit is not None and need is not None and need > limit:
+            return False
+    return True
+
+
+async def loads_within(
+    session: AsyncSession,
+    max_kg: float | None = None,
+    max_m3: float | None = None,
+    max_pallets: int | None = None,
+    min_kg: float | None = None,
+    route_key: str | None = None,
+    limit: int = 50,
+) -> list[Shipment_request]:
+    # заявки, які влазять в авто: weight_kg BETWEEN min_kg AND max_kg тощо
+    query = select(Shipment_request)
+    if route_key:
+        query = query.where(Shipment_request.route_key == route_key)
+    if max_kg is not None:
+        query = query.where(Shipment_request.weight_kg <= max_kg)
+    if min_kg is not None:
+        query = query.where(Shipment_request.weight_kg >= min_kg)
+    if max_m3 is not None:
+        query = query.where(Shipment_request.volume_m3 <= max_m3)
+    if max_pallets is not None:
+        query = query.where(Shipment_request.pallets <= max_pallets)
+    query = query.order_by(Shipment_request.id.desc()).limit(limit)
+    return list((await session.scalars(query)).all())
+
+
+async def loads_for_carrier(session: AsyncSession, carrier: Carrier, limit: int = 50) -> list[Shipment_request]:
+    return await loads_within(
+        session,
+        max_kg=carrier.capacity_kg,
+        max_m3=carrier.capacity_m3,
+        max_pallets=carrier.capacity_pallets,
+        route_key=carrier.route_key,
+        limit=limit,
+    )
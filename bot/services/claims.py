@@ -0,0 +1,176 @@
+# bot/services/claims.py
+#
+# "Хто перший натиснув «Прийняти» — того й рейс" без блокувань таблиці:
+# один умовний UPDATE … SET status='taken' WHERE id=:id AND status='open'.
+# БД виконує його атомарно (Postgres — блокування рядка, SQLite — запис
+# серіалізовано), тож rowcount == 1 отримує рівно один перевізник, решта — 0.
+# Повторне натискання переможця впізнаємо за carrier_telegram_id і відповідаємо
+# так само, без другого запису.
+# Після перемоги в тій самій транзакції:
+# - картки, які ще стоять у outbox, скасовуються;
+# - на вже надіслані ставимо в outbox редагування "рейс взято" — їх
+#   асинхронно виконає OutboxDispatcher, хендлер не чекає на Telegram.
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.models import NotificationOutbox, RequestResponse, Shipment_request
+
+Outbox = NotificationOutbox
+
+WON = "won"  # рейс щойно закріплено за перевізником
+REPEAT = "repeat"  # рейс уже його (повторне натискання)
+TAKEN = "taken"  # рейс забрав інший
+STALE = "stale"  # заявка змінилась після пропозиції (версія не збіглась)
+MISSING = "missing"  # заявки немає або її скасовано
+
+
+@dataclass(slots=True)
+class ClaimResult:
+    outcome: str
+    request_id: int
+    version: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome in (WON, REPEAT)
+
+
+async def claim_request(
+    session: AsyncSession,
+    request_id: int,
+    carrier_telegram_id: int,
+    expected_version: int | None = None,
+    price: int | None = None,
+) -> ClaimResult:
+    # Спершу дешеве читання: запізнілі й повторні натискання відповідають
+    # без запису. У SQLite кожен UPDATE (навіть без змінених рядків) чекає
+    # на єдиний write-lock, а читачів WAL не блокує.
+    current = await _current(session, request_id)
+    # читальну транзакцію закриваємо до UPDATE: у WAL її не можна підняти
+    # до запису, якщо інший писач уже закомітив (SQLITE_BUSY_SNAPSHOT)
+    await session.rollback()
+    if current is None or current[0] != "open" or (
+        expected_version is not None and current[2] != expected_version
+    ):
+        return _outcome(request_id, carrier_telegram_id, current)
+
+    conditions = [Shipment_request.id == request_id, Shipment_request.status == "open"]
+    if expected_version is not None:
+        conditions.append(Shipment_request.version == expected_version)
+    values = {
+        "status": "taken",
+        "carrier_telegram_id": carrier_telegram_id,
+        "taken_at": datetime.now(),
+        "version": Shipment_request.version + 1,
+    }
+    if price is not None:
+        values["price"] = price
+
+    result = await session.execute(
+        update(Shipment_request)
+        .where(*conditions)
+        .values(**values)
+        .returning(Shipment_request.version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar_one_or_none()
+    if version is not None:
+        await release_other_carriers(session, request_id, carrier_telegram_id)
+        await session.commit()
+        return ClaimResult(WON, request_id, version)
+
+    # між читанням і UPDATE рейс забрали — з'ясовуємо, хто
+    await session.rollback()
+    return _outcome(request_id, carrier_telegram_id, await _current(session, request_id))
+
+
+async def _current(session: AsyncSession, request_id: int):
+    return (
+        await session.execute(
+            select(
+                Shipment_request.status,
+                Shipment_request.carrier_telegram_id,
+                Shipment_request.version,
+            ).where(Shipment_request.id == request_id)
+        )
+    ).one_or_none()
+
+
+def _outcome(request_id: int, carrier_telegram_id: int, current) -> ClaimResult:
+    if current is None:
+        return ClaimResult(MISSING, request_id)
+    status, owner, version = current
+    if status == "taken" and owner == carrier_telegram_id:
+        return ClaimResult(REPEAT, request_id, version)
+    if status == "taken":
+        return ClaimResult(TAKEN, request_id, version)
+    if status == "open":
+        return ClaimResult(STALE, request_id, version)
+    return ClaimResult(MISSING, request_id, version)
+
+
+async def release_other_carriers(session: AsyncSession, request_id: int, winner: int):
+    mine = (Outbox.request_id == request_id) & (Outbox.kind == "new_request")
+    # ще не надіслані картки не надсилаємо взагалі
+    await session.execute(
+        update(Outbox)
+        .where(mine, Outbox.status == "pending", Outbox.locked_by.is_(None))
+        .values(status="cancelled")
+        .execution_options(synchronize_session=False)
+    )
+    await enqueue_taken_edits(session, mine & (Outbox.status == "sent"), winner)
+
+
+async def enqueue_taken_edits(session: AsyncSession, sent_rows, winner: int) -> int:
+    # надіслані картки решти перевізників → редагування на "рейс взято"
+    result = await session.execute(
+        Outbox.__table__.insert().from_select(
+            ["request_id", "chat_id", "kind", "status", "attempts", "message_id"],
+            select(
+                Outbox.request_id,
+                Outbox.chat_id,
+                literal("request_taken"),
+                literal("pending"),
+                literal(0),
+                Outbox.message_id,
+            ).where(sent_rows, Outbox.message_id.is_not(None), Outbox.chat_id != winner),
+        )
+    )
+    return result.rowcount
+
+
+async def record_response(
+    session: AsyncSession,
+    request_id: int,
+    carrier_telegram_id: int,
+    kind: str,
+    price: int | None = None,
+    request_version: int | None = None,
+) -> int:
+    # відмова / ставка перевізника; повтор оновлює той самий рядок
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    stmt = insert(RequestResponse).values(
+        request_id=request_id,
+        carrier_telegram_id=carrier_telegram_id,
+        kind=kind,
+        price=price,
+        request_version=request_version,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RequestResponse.request_id, RequestResponse.carrier_telegram_id],
+        set_={
+            "kind": stmt.excluded.kind,
+            "price": stmt.excluded.price,
+            "request_version": stmt.excluded.request_version,
+            "created_at": datetime.now(),
+        },
+    ).returning(RequestResponse.id)
+    return (await session.execute(stmt)).scalar_one()
@@ -0,0 +1,209 @@
+# bot/services/digest.py
+#
+# Зведення для перевізників, що ввімкнули /digest. Замість окремої картки на
+# кожну заявку (сплеск на популярному маршруті — десятки повідомлень і
+# десятки викликів Bot API на кожного перевізника) — одне повідомлення на
+# вікно DIGEST_WINDOW, яке OutboxDispatcher (bot/services/outbox.py) редагує
+# через edit_message_text, дописуючи нові заявки:
+# - перша заявка у вікні — send_message, далі — edit, не частіше ніж раз на
+#   DIGEST_EDIT_INTERVAL: рядки outbox, що прийшли раніше, відкладаються
+#   (send_after) і потрапляють в одне наступне редагування разом з рештою
+#   черги чату, навіть якщо диспетчер узяв її іншою пачкою;
+# - клавіатура — по кнопці на відкриту заявку сторінки (картка з кнопками
+#   відгуку окремим повідомленням, як у стрічці) і гортання digest_<id>_<сторінка>.
+# Тож викликів API на перевізника — не більше 1 + DIGEST_WINDOW / DIGEST_EDIT_INTERVAL
+# за вікно, скільки б заявок не прийшло. Рядки outbox, що увійшли у зведення,
+# отримують статус digested і message_id зведення; картку "рейс взято" їм не
+# редагуємо — взяті заявки закреслюються при наступному оновленні зведення.
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.models import Carrier, NotificationDigest, NotificationOutbox, Shipment_request
+from bot.services.broadcast import OutgoingMessage
+from bot.services.templates import digest_keyboard, render_digest
+
+Outbox = NotificationOutbox
+
+
+@dataclass(slots=True)
+class DigestDelivery:
+    # мітка OutgoingMessage зведення: які рядки outbox воно закриває
+    digest_id: int
+    row_ids: list[int]
+    request_ids: list[int] = field(default_factory=list)
+
+
+def parse_ids(value: str | None) -> list[int]:
+    return [int(part) for part in value.split(",") if part] if value else []
+
+
+def join_ids(ids: list[int]) -> str:
+    return ",".join(map(str, ids))
+
+
+def pages(total: int) -> int:
+    return max(1, -(-total // config.FEED_PAGE_SIZE))
+
+
+def render_page(digest_id: int, ids: list[int], requests: dict, page: int) -> tuple[str, InlineKeyboardMarkup]:
+    count = pages(len(ids))
+    page = min(max(page, 0), count - 1)
+    size = config.FEED_PAGE_SIZE
+    items = [requests.get(request_id) for request_id in ids[page * size : (page + 1) * size]]
+    return render_digest(items, len(ids), page, count), digest_keyboard(digest_id, items, page, count)
+
+
+async def digest_chats(session: AsyncSession, chat_ids: set[int]) -> set[int]:
+    if not chat_ids:
+        return set()
+    return set(
+        await session.scalars(
+            select(Carrier.telegram_id).where(Carrier.telegram_id.in_(chat_ids), Carrier.digest_mode)
+        )
+    )
+
+
+async def _fold_pending(
+    session: AsyncSession, chat_ids: list[int], claimed: set[int], token: str, now: datetime, until: datetime
+) -> list[NotificationOutbox]:
+    # решта черги цих чатів (інші пачки диспетчера, раніше відкладені рядки) — в те саме
+    # повідомлення, інакше велика черга розпадеться на редагування по пачці
+    ids = [
+        row_id
+        for row_id in await session.scalars(
+            select(Outbox.id)
+            .join(Shipment_request, Shipment_request.id == Outbox.request_id)
+            .where(
+                Outbox.chat_id.in_(chat_ids),
+                Outbox.kind == "new_request",
+                Outbox.status == "pending",
+                or_(Outbox.locked_until.is_(None), Outbox.locked_until < now),
+                or_(Outbox.send_after.is_(None), Outbox.send_after <= now),
+                Shipment_request.status == "open",
+            )
+        )
+        if row_id not in claimed
+    ]
+    if not ids:
+        return []
+    await session.execute(
+        update(Outbox)
+        .where(Outbox.id.in_(ids), Outbox.status == "pending", or_(Outbox.locked_until.is_(None), Outbox.locked_until < now))
+        .values(locked_by=token, locked_until=until)
+        .execution_options(synchronize_session=False)
+    )
+    return list(await session.scalars(select(Outbox).where(Outbox.id.in_(ids), Outbox.locked_by == token)))
+
+
+async def plan(
+    session: AsyncSession,
+    rows: list[NotificationOutbox],
+    requests: dict[int, Shipment_request],
+    now: datetime,
+    token: str,
+    until: datetime,
+) -> list[OutgoingMessage]:
+    # rows — орендовані (token) рядки new_request відкритих заявок для перевізників зі зведенням;
+    # повертає повідомлення (по одному на чат), рядки, яким ще рано, відкладає
+    by_chat: dict[int, list[NotificationOutbox]] = defaultdict(list)
+    for row in rows:
+        by_chat[row.chat_id].append(row)
+    opened = {
+        digest.chat_id: digest
+        for digest in await session.scalars(
+            select(NotificationDigest)
+            .where(NotificationDigest.chat_id.in_(by_chat), NotificationDigest.closes_at > now)
+            .order_by(NotificationDigest.id)
+        )
+    }
+
+    interval = timedelta(seconds=config.DIGEST_EDIT_INTERVAL)
+    deferred: list[dict] = []
+    planned: list[tuple[NotificationDigest, list[NotificationOutbox]]] = []
+    for chat_id, chat_rows in by_chat.items():
+        digest = opened.get(chat_id)
+        if digest is not None and digest.edited_at is not None and digest.edited_at + interval > now:
+            deferred += [{"row_id": row.id, "after": digest.edited_at + interval} for row in chat_rows]
+            continue
+        if digest is None:
+            digest = NotificationDigest(
+                chat_id=chat_id,
+                opened_at=now,
+                closes_at=now + timedelta(seconds=config.DIGEST_WINDOW),
+                request_ids="",
+            )
+            session.add(digest)
+        planned.append((digest, chat_rows))
+
+    if deferred:
+        table = Outbox.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(send_after=bindparam("after"), locked_by=None, locked_until=None),
+            deferred,
+        )
+    if not planned:
+        return []
+    extra = await _fold_pending(
+        session, [digest.chat_id for digest, _ in planned], {row.id for row in rows}, token, now, until
+    )
+    for row in extra:
+        by_chat[row.chat_id].append(row)
+    await session.flush()
+
+    # заявки, що вже є в зведеннях, — лише для першої сторінки
+    ids_of = {}
+    for digest, chat_rows in planned:
+        fresh = sorted({row.request_id for row in chat_rows}, reverse=True)
+        ids_of[digest.id] = list(dict.fromkeys(fresh + parse_ids(digest.request_ids)))
+    missing = {
+        request_id for ids in ids_of.values() for request_id in ids[: config.FEED_PAGE_SIZE]
+    } - requests.keys()
+    if missing:
+        requests = dict(requests)
+        for request in await session.scalars(select(Shipment_request).where(Shipment_request.id.in_(missing))):
+            requests[request.id] = request
+
+    messages = []
+    for digest, chat_rows in planned:
+        ids = ids_of[digest.id]
+        text, keyboard = render_page(digest.id, ids, requests, 0)
+        messages.append(
+            OutgoingMessage(
+                digest.chat_id,
+                text,
+                keyboard,
+                tag=DigestDelivery(digest.id, [row.id for row in chat_rows], ids),
+                # повідомлення ще немає (нове вікно або попередня відправка не вдалась) — надсилаємо
+                edit_message_id=digest.message_id,
+            )
+        )
+    return messages
+
+
+async def record(session: AsyncSession, token: str, delivered: list[OutgoingMessage], now: datetime):
+    # після розсилки: зведення пам'ятає своє повідомлення і заявки, рядки outbox — digested
+    if not delivered:
+        return
+    digests = NotificationDigest.__table__
+    await session.execute(
+        update(digests)
+        .where(digests.c.id == bindparam("digest_id"))
+        .values(message_id=bindparam("mid"), request_ids=bindparam("ids"), edited_at=now),
+        [{"digest_id": m.tag.digest_id, "mid": m.message_id, "ids": join_ids(m.tag.request_ids)} for m in delivered],
+    )
+    table = Outbox.__table__
+    await session.execute(
+        update(table)
+        .where(table.c.id == bindparam("row_id"), table.c.locked_by == token)
+        .values(status="digested", sent_at=now, locked_until=None, message_id=bindparam("mid")),
+        [{"row_id": row_id, "mid": m.message_id} for m in delivered for row_id in m.tag.row_ids],
+    )
@@ -0,0 +1,85 @@
+# bot/services/feed.py
+#
+# Стрічка відкритих заявок для перевізників: маршрут + вікно дат,
+# сторінки по FEED_PAGE_SIZE. Пагінація keyset по (route_key, date, id):
+# курсор — id першої/останньої заявки на сторінці (у callback_data лише id,
+# дату курсора дочитуємо по первинному ключу), наступна сторінка —
+# (date, id) > (дата курсора, id курсора). Запит іде по індексу
+# ix_shipment_request_route_date_id і читає лише limit + 1 рядків,
+# тож сторінка 10 000 коштує стільки ж, скільки перша (OFFSET читав би всі попередні).
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.models import Shipment_request
+
+
+@dataclass(slots=True)
+class FeedPage:
+    items: list[Shipment_request]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def first_id(self) -> int | None:
+        return self.items[0].id if self.items else None
+
+    @property
+    def last_id(self) -> int | None:
+        return self.items[-1].id if self.items else None
+
+
+async def open_loads(
+    session: AsyncSession,
+    route_key: str | None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    now: datetime | None = None,
+    days: int | None = None,
+    limit: int | None = None,
+) -> FeedPage:
+    now = now or datetime.now()
+    limit = limit or config.FEED_PAGE_SIZE
+    lower, upper = now, now + timedelta(days=days or config.FEED_WINDOW_DAYS)
+    query = select(Shipment_request).where(Shipment_request.status == "open")
+    if route_key:
+        query = query.where(Shipment_request.route_key == route_key)
+
+    cursor_id = before_id if before_id is not None else after_id
+    cursor_date = None
+    if cursor_id is not None:
+        cursor_date = await session.scalar(
+            select(Shipment_request.date).where(Shipment_request.id == cursor_id)
+        )
+    if cursor_date is None:
+        # немає курсора (або заявку з курсора видалили) — перша сторінка
+        before_id = after_id = None
+
+    # Межу курсора підставляємо в ту саму умову по date, що й вікно:
+    # (date, id) > (d, i) як date >= d AND (date > d OR id > i).
+    # Порівняння row values SQLite не вміє звузити в індексі — шукав би від
+    # початку вікна і відкидав усі попередні сторінки.
+    if before_id is not None:
+        # назад: у зворотному порядку від курсора, потім розвертаємо
+        query = query.where(
+            Shipment_request.date >= lower,
+            Shipment_request.date <= min(cursor_date, upper),
+            (Shipment_request.date < cursor_date) | (Shipment_request.id < before_id),
+        ).order_by(Shipment_request.date.desc(), Shipment_request.id.desc())
+        rows = list((await session.scalars(query.limit(limit + 1))).all())
+        return FeedPage(items=rows[:limit][::-1], has_prev=len(rows) > limit, has_next=True)
+
+    if after_id is not None:
+        query = query.where(
+            Shipment_request.date >= max(cursor_date, lower),
+            (Shipment_request.date > cursor_date) | (Shipment_request.id > after_id),
+        )
+    else:
+        query = query.where(Shipment_request.date >= lower)
+    query = query.where(Shipment_request.date < upper).order_by(Shipment_request.date, Shipment_request.id)
+    rows = list((await session.scalars(query.limit(limit + 1))).all())
+    return FeedPage(items=rows[:limit], has_prev=after_id is not None, has_next=len(rows) > limit)
@@ -0,0 +1,121 @@
+# bot/services/identity.py
+#
+# Хто пише боту: клієнт, перевізник (або обидва) чи ще ніхто.
+# Профіль кешується в процесі за telegram_id (TTL + LRU), включно з
+# негативним результатом "не зареєстрований" — повторні апдейти
+# зареєстрованого користувача не ходять у БД взагалі.
+# Після реєстрації кеш треба скинути: identity_cache.invalidate(telegram_id).
+# Оскільки webhook-воркери шардовані за chat id, реєстрація і подальші
+# апдейти користувача потрапляють в один процес.
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.models import Carrier, Client
+
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Identity:
+    telegram_id: int
+    client_id: int | None = None
+    carrier_id: int | None = None
+    full_name: str | None = None
+    phone: str | None = None
+    route_key: str | None = None
+
+    @property
+    def is_client(self) -> bool:
+        return self.client_id is not None
+
+    @property
+    def is_carrier(self) -> bool:
+        return self.carrier_id is not None
+
+    @property
+    def role(self) -> str | None:
+        if self.is_carrier:
+            return "carrier"
+        if self.is_client:
+            return "client"
+        return None
+
+
+class IdentityCache:
+    def __init__(self, ttl: float | None = None, maxsize: int | None = None):
+        self.ttl = ttl if ttl is not None else config.IDENTITY_CACHE_TTL
+        self.maxsize = maxsize or config.IDENTITY_CACHE_SIZE
+        self._data: OrderedDict[int, tuple[float, Identity]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, telegram_id: int):
+        item = self._data.get(telegram_id)
+        if item is None or item[0] < time.monotonic():
+            self.stats["misses"] += 1
+            return _MISSING
+        self._data.move_to_end(telegram_id)
+        self.stats["hits"] += 1
+        return item[1]
+
+    def set(self, identity: Identity):
+        self._data[identity.telegram_id] = (time.monotonic() + self.ttl, identity)
+        self._data.move_to_end(identity.telegram_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, telegram_id: int):
+        self.stats["invalidations"] += 1
+        self._data.pop(telegram_id, None)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self):
+        return len(self._data)
+
+    async def resolve(self, session: AsyncSession, telegram_id: int) -> Identity:
+        cached = self.get(telegram_id)
+        if cached is not _MISSING:
+            return cached
+        identity = await load_identity(session, telegram_id)
+        self.set(identity)
+        return identity
+
+
+async def load_identity(session: AsyncSession, telegram_id: int) -> Identity:
+    # клієнт і перевізник одним запитом
+    query = union_all(
+        select(
+            literal("client").label("kind"),
+            Client.id,
+            Client.full_name,
+            Client.phone,
+            null().label("route_key"),
+        ).where(Client.telegram_id == telegram_id),
+        select(
+            literal("carrier").label("kind"),
+            Carrier.id,
+            Carrier.full_name,
+            Carrier.phone,
+            Carrier.route_key,
+        ).where(Carrier.telegram_id == telegram_id),
+    )
+    fields = {"telegram_id": telegram_id}
+    for kind, row_id, full_name, phone, route_key in await session.execute(query):
+        fields[f"{kind}_id"] = row_id
+        fields["full_name"] = fields.get("full_name") or full_name
+        fields["phone"] = fields.get("phone") or phone
+        if kind == "carrier":
+            fields["route_key"] = route_key
+    return Identity(**fields)
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,254 @@
+# bot/services/metrics.py
+#
+# Метрики процесу у форматі Prometheus без сторонніх залежностей:
+# - bot_handler_seconds{handler,state} — хендлери aiogram (bot/middlewares/metrics.py);
+# - bot_db_query_seconds{query} — запити за "відбитком" SQL (bot/database/engine.py);
+# - bot_telegram_seconds{method}, bot_telegram_calls_total{method,result} — виклики
+#   Bot API, зокрема 429 (TelegramMetrics нижче);
+# - bot_throttled_total{kind} — апдейти, відхилені token bucket (bot/middlewares/throttle.py);
+# - пул БД і кеш профілів — знімаються в момент запиту /metrics.
+# Запис — це dict.get + bisect по кортежу меж + два додавання (жодних
+# блокувань: усе в одному event loop), рендер тексту — лише на запит.
+# Ендпоінт: http://METRICS_HOST:METRICS_PORT/metrics (webhook-воркер N — порт + N).
+
+import os
+import re
+import time
+from bisect import bisect_left
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiohttp import web
+
+from bot import config
+
+# секунди; від пів мілісекунди (кеш, dict) до 10 с (LLM, повільний Telegram)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, key: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, key: tuple = (), amount: float = 1):
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, key: tuple = ()) -> float:
+        return self._values.get(key, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = buckets
+        # на серію: лічильники по кошиках (останній — +Inf), потім сума
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, key: tuple, value: float):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, key: tuple) -> int:
+        series = self._series.get(key)
+        return sum(series[:-1]) if series else 0
+
+    def __len__(self):
+        return len(self._series)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in self._series.items():
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                total += count
+                le = 'le="' + str(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        # fn() → [(ім'я, help, значення)] — gauge, знятий у момент рендеру
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            try:
+                gauges = fn()
+            except Exception as e:
+                print(f"⛔️ Метрики: {fn.__name__}: {e!r}")
+                continue
+            for name, help, value in gauges:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HANDLER_SECONDS = registry.register(
+    Histogram("bot_handler_seconds", "Тривалість хендлера aiogram", ("handler", "state"))
+)
+HANDLER_ERRORS = registry.register(
+    Counter("bot_handler_errors_total", "Винятки в хендлерах", ("handler", "error"))
+)
+DB_QUERY_SECONDS = registry.register(
+    Histogram("bot_db_query_seconds", "Тривалість SQL-запиту за відбитком", ("query",))
+)
+TELEGRAM_SECONDS = registry.register(
+    Histogram("bot_telegram_seconds", "Тривалість виклику Bot API", ("method",))
+)
+TELEGRAM_CALLS = registry.register(
+    Counter("bot_telegram_calls_total", "Виклики Bot API за результатом", ("method", "result"))
+)
+THROTTLED = registry.register(
+    Counter("bot_throttled_total", "Апдейти, відхилені лімітом на користувача", ("kind",))
+)
+
+
+@registry.collector
+def process_gauges():
+    # пул БД (bot/database/engine.py) і кеш профілів (bot/services/identity.py)
+    from bot.database.database import engine
+    from bot.database.engine import pool_metrics
+    from bot.services.identity import identity_cache
+
+    pool = pool_metrics(engine).snapshot()
+    return [
+        ("bot_db_pool_in_use", "З'єднань пулу видано зараз", pool["in_use"]),
+        ("bot_db_pool_checkouts", "Видач з'єднань з пулу від старту", pool["checkouts"]),
+        ("bot_db_pool_wait_max_seconds", "Найдовше очікування з'єднання", pool["wait_max_ms"] / 1000),
+        ("bot_db_pool_timeouts", "Таймаути очікування з'єднання", pool["timeouts"]),
+        ("bot_db_slow_queries", "Запити, довші за DB_SLOW_QUERY_MS", pool["slow_queries"]),
+        ("bot_identity_cache_size", "Профілів у кеші", len(identity_cache)),
+        ("bot_identity_cache_hit_rate", "Частка влучань кешу профілів", identity_cache.hit_rate),
+    ]
+
+
+# --- відбитки SQL ---
+
+_PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)"
+# число, але не номер параметра asyncpg ($1) і не частина імені (c_1)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+_LISTS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_ROWS = re.compile(r"\(…\)(?:\s*,\s*\(…\))+")
+# номери, що лишились поза списками, залежать від довжини списків перед ними
+_NUMBERED = re.compile(r"\$\d+")
+_fingerprints: dict[str, str] = {}
+
+
+def fingerprint(statement: str) -> str:
+    # один і той самий запит з різною кількістю параметрів IN (…) / рядків VALUES
+    # і різними літералами → один відбиток; кеш за текстом (SQLAlchemy
+    # повторно використовує той самий рядок для закешованих запитів)
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    text = _LITERALS.sub("?", " ".join(statement.split()))
+    text = _NUMBERED.sub("?", _ROWS.sub("(…)", _LISTS.sub("(…)", text)))[:200]
+    if len(_fingerprints) >= config.METRICS_MAX_QUERIES * 10:
+        _fingerprints.clear()
+    _fingerprints[statement] = text
+    return text
+
+
+def observe_query(statement: str, elapsed: float):
+    key = (fingerprint(statement),)
+    if key not in DB_QUERY_SECONDS._series and len(DB_QUERY_SECONDS) >= config.METRICS_MAX_QUERIES:
+        # обмежуємо кардинальність: нові форми запитів після ліміту — в "other"
+        key = ("other",)
+    DB_QUERY_SECONDS.observe(key, elapsed)
+
+
+# --- Bot API ---
+
+
+class TelegramMetrics(BaseRequestMiddleware):
+    # bot.session.middleware(TelegramMetrics()) — кожен виклик Bot API
+    async def __call__(self, make_request, bot, method):
+        name = method.__api_method__
+        started = time.perf_counter()
+        result = "ok"
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter:
+            result = "429"
+            raise
+        except TelegramAPIError:
+            result = "error"
+            raise
+        except Exception:
+            result = "network"
+            raise
+        finally:
+            TELEGRAM_SECONDS.observe((name,), time.perf_counter() - started)
+            TELEGRAM_CALLS.inc((name, result))
+
+
+# --- HTTP ---
+
+
+def metrics_port(base: int | None = None) -> int:
+    # webhook-воркери — окремі процеси, кожен зі своїм портом
+    base = config.METRICS_PORT if base is None else base
+    return base + int(os.getenv("WEBHOOK_WORKER_INDEX", "0"))
+
+
+async def start_metrics_server(host: str | None = None, port: int | None = None) -> web.AppRunner | None:
+    port = metrics_port() if port is None else port
+    if not port:
+        return None
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host or config.METRICS_HOST, port).start()
+    except OSError as e:
+        print(f"⛔️ Метрики: порт {port} зайнятий ({e!r})")
+        await runner.cleanup()
+        return None
+    print(f"📈 Метрики: http://{host or config.METRICS_HOST}:{port}/metrics")
+    return runner
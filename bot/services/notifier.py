@@ -1,50 +1,89 @@
 # bot/services/notifier.py
 
-from aiogram import Bot
-from sqlalchemy import select
-from bot.models import Carrier
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.models import Carrier, NotificationOutbox
 from bot.models.shipment_request import Shipment_request
+from bot import config
 from bot.database.database import async_session
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from bot.services.capacity import carrier_fits
+from bot.services.route_index import route_index
+from bot.services.scoring import carrier_scorer, rank_batcher
+from bot.services.templates import render_request_card, request_keyboard
+from aiogram.types import InlineKeyboardMarkup
 
 
-async def notify_carriers(bot: Bot, request: Shipment_request):
-    async with async_session() as session:
-        carriers = await session.scalars(
-            select(Carrier).where(Carrier.route == request.route)
+async def notify_carriers(session: AsyncSession, request: Shipment_request) -> int:
+    # Не надсилаємо одразу, а ставимо в outbox у тій самій транзакції, що й заявку.
+    # Розсилає OutboxDispatcher (bot/services/outbox.py).
+    await session.flush()
+
+    if route_index.ready and request.route_key:
+        # пошук в індексі маршрутів і коридорів у пам'яті, з урахуванням місткості
+        chat_ids = route_index.match(
+            request.route_key, request.weight_kg, request.volume_m3, request.pallets
         )
+        if not chat_ids:
+            return 0
+        await session.execute(insert(NotificationOutbox), await _waves(request, chat_ids))
+        return len(chat_ids)
+
+    # Індекс ще не прогрітий — один INSERT … SELECT по індексованому route_key
+    if request.route_key:
+        matches = Carrier.route_key == request.route_key
+    else:
+        matches = Carrier.route == request.route
+    fits = carrier_fits(request)
+    if fits is not None:
+        matches = matches & fits
+    result = await session.execute(
+        insert(NotificationOutbox).from_select(
+            ["request_id", "chat_id", "kind", "status", "attempts"],
+            select(
+                literal(request.id),
+                Carrier.telegram_id,
+                literal("new_request"),
+                literal("pending"),
+                literal(0),
+            ).where(matches, Carrier.is_active),
+        )
+    )
+    return result.rowcount
+
 
-        for carrier in carriers:
-            await bot.send_message(
-                carrier.telegram_id,
-                f"""📦 <b>Нова заявка на перевезення:</b>
-Маршрут: {request.route}
-Дата подачі: {request.date.strftime("%d %B о %H:%M")}
-Тип вантажу: {request.cargo_type}
-Обʼєм: {request.volume}
-Орієнтовна вага: {request.weight}
-Завантаження: {request.loading}
-Вивантаження: {request.unloading}
-Ціна: {request.price:,} грн""",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="✅ Прийняти рейс",
-                                callback_data=f"accept_{request.id}",
-                            ),
-                            InlineKeyboardButton(
-                                text="❌ Відмовитись",
-                                callback_data=f"decline_{request.id}",
-                            ),
-                        ],
-                        [
-                            InlineKeyboardButton(
-                                text="💬 Запропонувати іншу ставку",
-                                callback_data=f"negotiate_{request.id}",
-                            )
-                        ],
-                    ]
-                ),
-                parse_mode="HTML",
-            )
+async def _waves(request: Shipment_request, chat_ids: set[int]) -> list[dict]:
+    # найкращі за балом — одразу, решта хвилями через MATCH_WAVE_DELAY;
+    # коли рейс заберуть, ще не надіслані хвилі скасує bot/services/claims.py
+    size = config.MATCH_WAVE_SIZE
+    if not size or len(chat_ids) <= size or not carrier_scorer.ready:
+        return [{"request_id": request.id, "chat_id": chat_id, "send_after": None} for chat_id in chat_ids]
+    # мікропачкою з заявками інших клієнтів (bot/services/scoring.py, RankBatcher)
+    ranked = await rank_batcher.rank(request, chat_ids)
+    now = datetime.now()
+    delay = timedelta(seconds=config.MATCH_WAVE_DELAY)
+    return [
+        {"request_id": request.id, "chat_id": chat_id, "send_after": now + delay * (i // size) if i >= size else None}
+        for i, chat_id in enumerate(ranked)
+    ]
+
+
+def render_request_notification(
+    request: Shipment_request,
+) -> tuple[str, InlineKeyboardMarkup]:
+    # текст і клавіатура спільні для всіх отримувачів (bot/services/templates.py)
+    return render_request_card(request), request_keyboard(request.id, request.version)
+
+
+async def deactivate_carriers(telegram_ids: list[int]):
+    async with async_session() as session:
+        await session.execute(
+            update(Carrier)
+            .where(Carrier.telegram_id.in_(telegram_ids))
+            .values(is_active=False)
+        )
+        await session.commit()
+    for telegram_id in telegram_ids:
+        route_index.remove(telegram_id)
+        carrier_scorer.remove(telegram_id)
@@ -0,0 +1,285 @@
+# bot/services/outbox.py
+#
+# Фоновий диспетчер outbox. Кілька процесів бота можуть розбирати чергу
+# одночасно: кожен забирає пачку рядків під свою "оренду" (lease) і
+# надсилає лише їх.
+# - Postgres: SELECT … FOR UPDATE SKIP LOCKED
+# - SQLite: атомарний UPDATE … WHERE id IN (SELECT … LIMIT n) з унікальним
+#   токеном оренди (SQLite серіалізує записи, тож два диспетчери не
+#   отримають той самий рядок)
+# Якщо процес впав посеред розсилки, оренда спливає і рядки підхоплює інший.
+# Види рядків: new_request — картка заявки (id надісланого повідомлення
+# зберігається), request_taken — редагування цієї картки, коли рейс забрали
+# (bot/services/claims.py). Картки вже не відкритих заявок не надсилаються,
+# а рядки наступних хвиль (send_after) чекають свого часу — якщо рейс заберуть
+# раніше, claims їх скасує. Перевізникам з /digest картки приходять
+# зведенням — одним повідомленням, що редагується (bot/services/digest.py).
+# Невдала спроба відкладає рядок (send_after) з експоненційною паузою, щоб
+# недоступний чат чи збій Telegram не крутили повтори без перерви.
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.database.database import async_session
+from bot.models import NotificationOutbox, Shipment_request
+from bot.services.broadcast import BroadcastStats, OutgoingMessage, get_broadcaster
+from bot.services.claims import enqueue_taken_edits
+from bot.services.digest import DigestDelivery, digest_chats
+from bot.services.digest import plan as plan_digests
+from bot.services.digest import record as record_digests
+from bot.services.notifier import deactivate_carriers, render_request_notification
+from bot.services.scoring import carrier_scorer
+from bot.services.templates import render_taken_card
+
+Outbox = NotificationOutbox
+
+
+def _row_ids(message: OutgoingMessage) -> list[int]:
+    # у зведення — кілька рядків outbox на одне повідомлення
+    return message.tag.row_ids if isinstance(message.tag, DigestDelivery) else [message.tag]
+
+
+def _claimable(now: datetime):
+    return (
+        (Outbox.status == "pending")
+        & or_(Outbox.locked_until.is_(None), Outbox.locked_until < now)
+        & or_(Outbox.send_after.is_(None), Outbox.send_after <= now)
+    )
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        bot: Bot,
+        batch_size: int | None = None,
+        lease_seconds: int | None = None,
+        poll_interval: float | None = None,
+        max_attempts: int | None = None,
+        retry_delay: float | None = None,
+    ):
+        self.bot = bot
+        self.batch_size = batch_size or config.OUTBOX_BATCH_SIZE
+        self.lease = timedelta(seconds=lease_seconds or config.OUTBOX_LEASE_SECONDS)
+        self.poll_interval = poll_interval if poll_interval is not None else config.OUTBOX_POLL_INTERVAL
+        self.max_attempts = max_attempts or config.OUTBOX_MAX_ATTEMPTS
+        self.retry_delay = retry_delay if retry_delay is not None else config.OUTBOX_RETRY_DELAY
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._stopped = asyncio.Event()
+
+    async def run(self):
+        print(f"📮 Outbox-диспетчер {self.worker_id} запущено")
+        while not self._stopped.is_set():
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                print(f"⛔️ Outbox: {e!r}")
+                processed = 0
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopped.set()
+
+    def backoff(self, attempts: int) -> timedelta:
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        return timedelta(seconds=min(delay, config.OUTBOX_RETRY_MAX_DELAY))
+
+    async def drain_once(self, now: datetime | None = None) -> int:
+        now = now or datetime.now()
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"
+        async with async_session() as session:
+            rows = await self.claim(session, token, now)
+            if not rows:
+                return 0
+            request_ids = {row.request_id for row in rows}
+            requests = {
+                r.id: r
+                for r in await session.scalars(
+                    select(Shipment_request).where(Shipment_request.id.in_(request_ids))
+                )
+            }
+            # перевізники зі зведенням: картки відкритих заявок — одним повідомленням на чат
+            digested = await digest_chats(session, {row.chat_id for row in rows if row.kind == "new_request"})
+            digest_rows = [
+                row
+                for row in rows
+                if row.chat_id in digested
+                and row.kind == "new_request"
+                and row.request_id in requests
+                and requests[row.request_id].status == "open"
+            ]
+            digests = (
+                await plan_digests(session, digest_rows, requests, now, token, now + self.lease) if digest_rows else []
+            )
+            await session.commit()
+
+        # сесію закрито — розсилаємо без відкритого з'єднання
+        skip = {row.id for row in digest_rows}
+        rendered = {rid: render_request_notification(r) for rid, r in requests.items()}
+        messages, cancelled = [], []
+        for row in rows:
+            if row.id in skip:
+                continue
+            request = requests.get(row.request_id)
+            if request is None:
+                # заявку вже перенесено в архів (bot/services/retention.py)
+                cancelled.append(row.id)
+            elif row.kind == "request_taken":
+                messages.append(
+                    OutgoingMessage(
+                        row.chat_id, render_taken_card(request), tag=row.id, edit_message_id=row.message_id
+                    )
+                )
+            elif request.status != "open":
+                cancelled.append(row.id)
+            else:
+                text, keyboard = rendered[row.request_id]
+                messages.append(OutgoingMessage(row.chat_id, text, keyboard, tag=row.id))
+
+        stats = await get_broadcaster(self.bot).broadcast(messages + digests)
+        await self.complete(token, messages, stats, cancelled, digests, now)
+        if stats.failed or stats.retries or stats.blocked:
+            # звичайний прохід мовчить — у лог лише проблеми
+            print(f"📮 Outbox: {stats}")
+        return len(rows)
+
+    async def claim(self, session: AsyncSession, token: str, now: datetime | None = None) -> list[NotificationOutbox]:
+        now = now or datetime.now()
+        until = now + self.lease
+
+        if session.bind.dialect.name == "postgresql":
+            ids = (
+                await session.scalars(
+                    select(Outbox.id)
+                    .where(_claimable(now))
+                    .order_by(Outbox.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            if not ids:
+                await session.rollback()
+                return []
+            await session.execute(
+                update(Outbox)
+                .where(Outbox.id.in_(ids))
+                .values(locked_by=token, locked_until=until)
+            )
+        else:
+            subquery = (
+                select(Outbox.id)
+                .where(_claimable(now))
+                .order_by(Outbox.id)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            await session.execute(
+                update(Outbox)
+                .where(Outbox.id.in_(subquery), _claimable(now))
+                .values(locked_by=token, locked_until=until)
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+
+        return list(
+            await session.scalars(
+                select(Outbox).where(Outbox.locked_by == token).order_by(Outbox.id)
+            )
+        )
+
+    async def complete(
+        self,
+        token: str,
+        messages: list[OutgoingMessage],
+        stats: BroadcastStats,
+        cancelled: list[int] | None = None,
+        digests: list[OutgoingMessage] | None = None,
+        now: datetime | None = None,
+    ):
+        blocked = set(stats.blocked)
+        undelivered = {id(m) for m in stats.undelivered}
+        sent = [m for m in messages if id(m) not in undelivered]
+        digested = [m for m in digests or () if id(m) not in undelivered]
+        blocked_ids = [row_id for m in stats.undelivered if m.chat_id in blocked for row_id in _row_ids(m)]
+        failed_ids = [row_id for m in stats.undelivered if m.chat_id not in blocked for row_id in _row_ids(m)]
+        mine = Outbox.locked_by == token
+
+        async with async_session() as session:
+            if sent:
+                table = Outbox.__table__
+                await session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("row_id"), table.c.locked_by == token)
+                    .values(status="sent", sent_at=datetime.now(), locked_until=None, message_id=bindparam("mid")),
+                    [{"row_id": m.tag, "mid": m.message_id} for m in sent],
+                )
+                # рейс могли забрати, поки картка летіла, — її теж треба відредагувати
+                cards = [m.tag for m in sent if m.edit_message_id is None]
+                if cards:
+                    just_sent = Outbox.id.in_(cards)
+                    taken = await session.execute(
+                        select(Shipment_request.id, Shipment_request.carrier_telegram_id)
+                        .join(Outbox, Outbox.request_id == Shipment_request.id)
+                        .where(just_sent, Shipment_request.status == "taken")
+                        .distinct()
+                    )
+                    for request_id, winner in taken.all():
+                        await enqueue_taken_edits(session, just_sent & (Outbox.request_id == request_id), winner)
+            await record_digests(session, token, digested, now or datetime.now())
+            if cancelled:
+                await session.execute(
+                    update(Outbox)
+                    .where(Outbox.id.in_(cancelled), mine)
+                    .values(status="cancelled", locked_until=None)
+                )
+            if blocked_ids:
+                await session.execute(
+                    update(Outbox)
+                    .where(Outbox.id.in_(blocked_ids), mine)
+                    .values(status="blocked", locked_until=None)
+                )
+            if failed_ids:
+                # знімаємо оренду і відкладаємо наступну спробу
+                retry_at = now or datetime.now()
+                retries = [
+                    {"row_id": row_id, "attempts": done + 1, "after": retry_at + self.backoff(done + 1)}
+                    for row_id, done in await session.execute(
+                        select(Outbox.id, Outbox.attempts).where(Outbox.id.in_(failed_ids), mine)
+                    )
+                ]
+                if retries:
+                    table = Outbox.__table__
+                    await session.execute(
+                        update(table)
+                        .where(table.c.id == bindparam("row_id"), table.c.locked_by == token)
+                        .values(
+                            attempts=bindparam("attempts"),
+                            send_after=bindparam("after"),
+                            locked_by=None,
+                            locked_until=None,
+                        ),
+                        retries,
+                    )
+                await session.execute(
+                    update(Outbox)
+                    .where(Outbox.id.in_(failed_ids), Outbox.attempts >= self.max_attempts)
+                    .values(status="failed")
+                )
+            await session.commit()
+
+        # нові картки і рядки зведень — знаменник частки прийнятих у ранжуванні
+        carrier_scorer.delivered(
+            [m.chat_id for m in sent if m.edit_message_id is None]
+            + [m.chat_id for m in digested for _ in m.tag.row_ids]
+        )
+        if blocked:
+            await deactivate_carriers(list(blocked))
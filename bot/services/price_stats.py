@@ -0,0 +1,289 @@
+# bot/services/price_stats.py
+#
+# Типова ціна маршруту для кроку price анкети клієнта ("зазвичай 7 500–9 000 грн").
+# Перцентилі по shipment_request на кожного клієнта — скан усіх цін маршруту, що
+# росте разом з таблицею. Натомість на кожен ключ маршруту — потоковий агрегат:
+# кількість, середнє і t-digest (злитий варіант: центроїди в масивах NumPy,
+# стиснення — один векторний прохід по відсортованих точках, два дайджести
+# зливаються так само). Підказка p25–p75 перераховується при додаванні ціни,
+# тож suggest — лише dict.get, незалежно від кількості заявок.
+# - нова заявка (finish_application) додається одразу після коміту;
+# - заявки інших процесів доганяються за id з shipment_request_history раз на
+#   PRICE_STATS_REFRESH с, тоді ж змінені маршрути пишуться знімком у route_price_stats;
+# - старт: знімок + заявки після нього; без знімка — перебудова з історії пачками.
+# Враховуються лише ціни в гривнях, більші за 0 (0 — лише у старих рядках, де ціну не розібрали).
+# Заявка, що закомітилась уже після того, як наздоганяння пройшло її id, не
+# врахується — для "типової ціни" це неважливо.
+
+import asyncio
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.database.database import async_session
+from bot.models import RoutePriceStats
+from bot.models import shipment_request_history as history
+
+# більше — точніші хвости і більший дайджест (≈ COMPRESSION / 2 центроїдів)
+COMPRESSION = 200
+HINT_QUANTILES = (0.25, 0.75)
+SAVE_CHUNK = 1000
+FOLD_BATCH = 2000
+
+
+class TDigest:
+    __slots__ = ("compression", "means", "weights", "min", "max")
+
+    def __init__(self, compression: float = COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min, self.max = math.inf, -math.inf
+
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        weights = np.ones(values.size) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate((self.means, values)), np.concatenate((self.weights, weights)))
+
+    def merge(self, other: "TDigest"):
+        if not other.means.size:
+            return
+        self.add(other.means, other.weights)
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # k1 = δ/2π · arcsin(2q − 1): на хвостах центроїди дрібні, в середині — великі;
+        # сусідні точки з однаковим цілим k зливаються в один центроїд
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        # лінійна інтерполяція між серединами центроїдів, краї — точні min/max
+        if not self.means.size:
+            return None
+        total = self.total
+        ranks = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(q) * total, np.r_[0, ranks, total], np.r_[self.min, self.means, self.max])
+
+    def to_bytes(self) -> bytes:
+        pairs = np.column_stack((self.means, self.weights)).ravel()
+        return np.r_[self.min, self.max, pairs].astype("<f8").tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, compression: float = COMPRESSION) -> "TDigest":
+        digest = cls(compression)
+        values = np.frombuffer(blob, dtype="<f8")
+        digest.min, digest.max = float(values[0]), float(values[1])
+        pairs = values[2:].reshape(-1, 2)
+        digest.means, digest.weights = pairs[:, 0].copy(), pairs[:, 1].copy()
+        return digest
+
+
+@dataclass(slots=True)
+class RouteStats:
+    digest: TDigest = field(default_factory=TDigest)
+    count: int = 0
+    mean: float = 0.0
+
+
+def _round(value: float) -> int:
+    step = 100 if value >= 1000 else 10
+    return int(round(value / step) * step)
+
+
+class PriceStats:
+    def __init__(self, min_count: int | None = None):
+        self.min_count = min_count or config.PRICE_HINT_MIN_COUNT
+        self._routes: dict[str, RouteStats] = {}
+        self._hints: dict[str, tuple[int, int]] = {}
+        self._dirty: set[str] = set()
+        # додані напряму з id після watermark — наздоганяння їх пропустить
+        self._seen: set[int] = set()
+        self.watermark = 0
+        self.ready = False
+
+    def __len__(self):
+        return len(self._routes)
+
+    def suggest(self, route_key: str | None) -> tuple[int, int] | None:
+        return self._hints.get(route_key) if route_key else None
+
+    def stats(self, route_key: str) -> RouteStats | None:
+        return self._routes.get(route_key)
+
+    def add(self, route_key: str | None, price: int | None, currency: str = "UAH", request_id: int | None = None):
+        if not route_key or not price or price <= 0 or currency != "UAH":
+            return
+        if request_id is not None:
+            if request_id <= self.watermark or request_id in self._seen:
+                return
+            self._seen.add(request_id)
+        self._fold(route_key, [price])
+
+    def _fold(self, route_key: str, prices: list, hint: bool = True):
+        stats = self._routes.get(route_key)
+        if stats is None:
+            stats = self._routes[route_key] = RouteStats()
+        values = np.asarray(prices, dtype=np.float64)
+        stats.count += values.size
+        stats.mean += (float(values.sum()) - values.size * stats.mean) / stats.count
+        stats.digest.add(values)
+        self._dirty.add(route_key)
+        if hint:
+            self._hint(route_key, stats)
+
+    def _hint(self, route_key: str, stats: RouteStats):
+        if stats.count < self.min_count:
+            self._hints.pop(route_key, None)
+            return
+        low, high = stats.digest.quantile(HINT_QUANTILES)
+        self._hints[route_key] = (_round(low), _round(high))
+
+    async def catch_up(self, session: AsyncSession, chunk_size: int = 50_000) -> int:
+        # заявки з id після watermark — і живі, і вже заархівовані
+        result = await session.stream(
+            select(history.c.id, history.c.route_key, history.c.price)
+            .where(
+                history.c.id > self.watermark,
+                history.c.price > 0,
+                history.c.price_currency == "UAH",
+                history.c.route_key.is_not(None),
+            )
+            .order_by(history.c.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        # ціни накопичуються по маршруту і зливаються в дайджест порціями FOLD_BATCH:
+        # стиснення на кожну пачку курсора для кожного з тисяч маршрутів коштувало б у рази більше
+        folded = 0
+        touched = set()
+        pending: dict[str, list] = defaultdict(list)
+        try:
+            async for rows in result.partitions(chunk_size):
+                seen = self._seen
+                for request_id, route_key, price in rows:
+                    if request_id not in seen:
+                        pending[route_key].append(price)
+                for route_key in [key for key, prices in pending.items() if len(prices) >= FOLD_BATCH]:
+                    prices = pending.pop(route_key)
+                    self._fold(route_key, prices, hint=False)
+                    folded += len(prices)
+                    touched.add(route_key)
+                self.watermark = max(self.watermark, rows[-1][0])
+        finally:
+            for route_key, prices in pending.items():
+                self._fold(route_key, prices, hint=False)
+                folded += len(prices)
+                touched.add(route_key)
+            self._seen = {request_id for request_id in self._seen if request_id > self.watermark}
+        for route_key in touched:
+            self._hint(route_key, self._routes[route_key])
+        return folded
+
+    async def load(self, session: AsyncSession) -> int:
+        # знімок + наздоганяння в окремий об'єкт, потім підміна; що додалось за цей
+        # час напряму, підхопить наступне наздоганяння (його id > watermark)
+        fresh = PriceStats(self.min_count)
+        for row in await session.scalars(select(RoutePriceStats)):
+            digest = TDigest.from_bytes(row.sketch)
+            fresh._routes[row.route_key] = RouteStats(digest, row.count, row.mean)
+            fresh.watermark = max(fresh.watermark, row.last_request_id)
+        for route_key, stats in fresh._routes.items():
+            fresh._hint(route_key, stats)
+        folded = await fresh.catch_up(session)
+        self._routes, self._hints, self._dirty = fresh._routes, fresh._hints, fresh._dirty
+        self._seen, self.watermark = fresh._seen, fresh.watermark
+        self.ready = True
+        return folded
+
+    async def save(self, session: AsyncSession) -> int:
+        # змінені маршрути; знімок повний до watermark
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        now = datetime.now()
+        rows = [
+            {
+                "route_key": route_key,
+                "count": stats.count,
+                "mean": stats.mean,
+                "sketch": stats.digest.to_bytes(),
+                "last_request_id": self.watermark,
+                "updated_at": now,
+            }
+            for route_key in dirty
+            if (stats := self._routes.get(route_key)) is not None
+        ]
+        try:
+            for start in range(0, len(rows), SAVE_CHUNK):
+                await session.execute(self._upsert(session, rows[start : start + SAVE_CHUNK]))
+            await session.commit()
+        except Exception:
+            self._dirty |= dirty
+            raise
+        return len(rows)
+
+    @staticmethod
+    def _upsert(session: AsyncSession, rows: list[dict]):
+        if session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(RoutePriceStats).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[RoutePriceStats.route_key],
+            set_={
+                "count": stmt.excluded.count,
+                "mean": stmt.excluded.mean,
+                "sketch": stmt.excluded.sketch,
+                "last_request_id": stmt.excluded.last_request_id,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
+
+price_stats = PriceStats()
+
+
+async def refresh_price_stats(interval: float, save: bool = True):
+    # прогрів у фоні, щоб не затримувати старт: до нього підказки просто немає.
+    # Агрегати в пам'яті потрібні кожному процесу, знімок пише лише один (save)
+    while not price_stats.ready:
+        try:
+            async with async_session() as session:
+                folded = await price_stats.load(session)
+                if save:
+                    await price_stats.save(session)
+            print(f"💰 Ціни маршрутів: {len(price_stats)} маршрутів, з історії донабрано {folded} заявок")
+        except Exception as e:
+            print(f"⛔️ Ціни маршрутів: {e!r}")
+            await asyncio.sleep(interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session() as session:
+                await price_stats.catch_up(session)
+                if save:
+                    await price_stats.save(session)
+        except Exception as e:
+            print(f"⛔️ Ціни маршрутів: {e!r}")
@@ -0,0 +1,125 @@
+# bot/services/retention.py
+#
+# Фонова задача: заявки, дата подачі яких минула більше ніж
+# REQUEST_ARCHIVE_AFTER_DAYS тому, і взяті в роботу раніше за цей строк, якщо
+# дата подачі вже настала (прийнятий рейс на майбутнє — жива бронь), переносяться
+# з shipment_request у місячні таблиці shipment_request_YYYYMM (bot/database/partitions.py). Гаряча таблиця лишається розміром з живі
+# заявки, і стрічка / claim / розсилка не гортають роки мертвих рядків.
+# Історію читають через view shipment_request_history.
+#
+# Пачка — одна коротка транзакція: id беруться по індексах (date, id) і taken_at,
+# рядки видаляються DELETE … RETURNING і вставляються в архів уже з Python,
+# тож два воркери, що взяли ту саму пачку, не задублюють рядки — другий
+# отримає з DELETE лише те, що ще лишилось. Між пачками — пауза, щоб
+# не тримати блокування запису (на SQLite — єдиний на всю БД).
+# Після перенесення — ущільнення: VACUUM ANALYZE на Postgres, на SQLite —
+# REINDEX гарячої таблиці і PRAGMA optimize (VACUUM усієї БД заблокував би
+# запис надовго; звільнені сторінки й так ідуть у freelist і дістаються новим заявкам).
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from bot import config
+from bot.database.database import async_session, engine
+from bot.database.partitions import archive_name, ensure_archive
+from bot.models import NotificationOutbox as Outbox
+from bot.models import Shipment_request
+
+# місячні таблиці, вже перевірені цим процесом
+_known_archives: set[str] = set()
+
+
+async def archive_batch(
+    session: AsyncSession,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> int:
+    # одна пачка → місячні таблиці; повертає кількість перенесених рядків
+    batch_size = batch_size or config.REQUEST_ARCHIVE_BATCH
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=config.REQUEST_ARCHIVE_AFTER_DAYS)
+    hot = Shipment_request.__table__
+
+    ids = (
+        await session.scalars(
+            select(hot.c.id).where(hot.c.date < cutoff).order_by(hot.c.date, hot.c.id).limit(batch_size)
+        )
+    ).all()
+    if not ids:
+        ids = (
+            await session.scalars(
+                select(hot.c.id)
+                .where(hot.c.taken_at < cutoff, hot.c.date < now)
+                .order_by(hot.c.taken_at)
+                .limit(batch_size)
+            )
+        ).all()
+    if not ids:
+        return 0
+
+    rows = (await session.execute(delete(hot).where(hot.c.id.in_(ids)).returning(*hot.c))).mappings().all()
+    by_month: dict[str, list[dict]] = defaultdict(list)
+    for row in rows:
+        by_month[archive_name(row["date"])].append(dict(row))
+    for name, month_rows in by_month.items():
+        table = await session.run_sync(
+            lambda sync_session, name=name: ensure_archive(sync_session.connection(), hot, name, _known_archives)
+        )
+        await session.execute(insert(table), month_rows)
+
+    # розсилка, що не встигла піти, вже нікому не потрібна
+    await session.execute(
+        update(Outbox)
+        .where(Outbox.request_id.in_(ids), Outbox.status == "pending", Outbox.locked_by.is_(None))
+        .values(status="cancelled")
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return len(rows)
+
+
+async def compact(bind: AsyncEngine | None = None):
+    bind = bind or engine
+    if bind.dialect.name == "postgresql":
+        async with bind.connect() as conn:
+            # VACUUM не працює всередині транзакції
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(f"VACUUM (ANALYZE) {Shipment_request.__tablename__}"))
+    else:
+        async with bind.begin() as conn:
+            # індекси після масового DELETE напівпорожні; перебудова лише живих рядків — частки секунди
+            await conn.execute(text(f"REINDEX {Shipment_request.__tablename__}"))
+            await conn.execute(text("PRAGMA optimize"))
+
+
+async def archive_once(now: datetime | None = None, pause: float | None = None) -> int:
+    pause = config.REQUEST_ARCHIVE_PAUSE if pause is None else pause
+    total = 0
+    while True:
+        async with async_session() as session:
+            moved = await archive_batch(session, now)
+        if not moved:
+            break
+        total += moved
+        await asyncio.sleep(pause)
+    if total:
+        await compact()
+    return total
+
+
+async def archive_expired_requests(interval: float):
+    while True:
+        try:
+            started = time.perf_counter()
+            moved = await archive_once()
+            if moved:
+                elapsed = time.perf_counter() - started
+                print(f"🗄 Заявки: в архів перенесено {moved} за {elapsed:.1f} с ({moved / elapsed:.0f}/с)")
+        except Exception as e:
+            print(f"⛔️ Архів заявок: {e!r}")
+        await asyncio.sleep(interval)
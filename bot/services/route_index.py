@@ -0,0 +1,130 @@
+# bot/services/route_index.py
+#
+# Інвертований індекс у пам'яті: ключ маршруту → telegram_id активних перевізників,
+# плюс просторовий індекс коридорів (bot/geo/corridors.py) для попутних вантажів:
+# перевізник Київ → Львів отримає і заявку Київ → Житомир, і Рівне → Львів.
+# Разом з маршрутом зберігається місткість авто — заявки, які не влазять,
+# відсікаються ще до outbox (bot/services/capacity.py).
+# Прогрівається при старті, оновлюється при реєстрації/деактивації і
+# періодично перечитується з БД (щоб побачити реєстрації з інших процесів) —
+# разом з масивами для ранжування (bot/services/scoring.py).
+
+import asyncio
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.database.database import async_session
+from bot.geo.corridors import CorridorIndex
+from bot.geo.gazetteer import get_gazetteer
+from bot.models import Carrier
+from bot.services.capacity import fits
+from bot.services.scoring import carrier_scorer
+
+
+class RouteIndex:
+    def __init__(self, corridor_km: float | None = None):
+        self.corridor_km = corridor_km or config.CORRIDOR_RADIUS_KM
+        self._by_route: dict[str, set[int]] = defaultdict(set)
+        self._route_of: dict[int, str] = {}
+        self._capacity_of: dict[int, tuple] = {}
+        self.corridors = CorridorIndex(buffer_km=self.corridor_km)
+        self.ready = False
+
+    async def load(self, session: AsyncSession):
+        rows = await session.execute(
+            select(
+                Carrier.telegram_id,
+                Carrier.route_key,
+                Carrier.capacity_kg,
+                Carrier.capacity_m3,
+                Carrier.capacity_pallets,
+            ).where(Carrier.is_active, Carrier.route_key.is_not(None))
+        )
+        fresh = RouteIndex(self.corridor_km)
+        for telegram_id, key, *capacity in rows:
+            fresh.add(telegram_id, key, tuple(capacity))
+        fresh.corridors.freeze()
+        self._by_route, self._route_of = fresh._by_route, fresh._route_of
+        self._capacity_of = fresh._capacity_of
+        self.corridors = fresh.corridors
+        self.ready = True
+
+    def add(self, telegram_id: int, route_key: str | None, capacity: tuple | None = None):
+        self.remove(telegram_id)
+        if not route_key:
+            return
+        self._by_route[route_key].add(telegram_id)
+        self._route_of[telegram_id] = route_key
+        if capacity is not None and any(value is not None for value in capacity):
+            self._capacity_of[telegram_id] = capacity
+
+        origin, destination = _coords(route_key)
+        if origin and destination:
+            self.corridors.add(telegram_id, origin, destination)
+
+    def remove(self, telegram_id: int):
+        key = self._route_of.pop(telegram_id, None)
+        self._capacity_of.pop(telegram_id, None)
+        if key is not None:
+            carriers = self._by_route[key]
+            carriers.discard(telegram_id)
+            if not carriers:
+                del self._by_route[key]
+            self.corridors.remove(telegram_id)
+
+    def lookup(self, route_key: str) -> set[int]:
+        return self._by_route.get(route_key, set())
+
+    def match(
+        self,
+        route_key: str,
+        weight_kg: float | None = None,
+        volume_m3: float | None = None,
+        pallets: int | None = None,
+    ) -> set[int]:
+        # точний маршрут + усі, чий коридор проходить повз обидва пункти
+        matched = set(self.lookup(route_key))
+        origin, destination = _coords(route_key)
+        if origin and destination:
+            matched.update(self.corridors.match(origin, destination))
+        if self._capacity_of and (weight_kg, volume_m3, pallets) != (None, None, None):
+            capacity_of = self._capacity_of
+            matched = {
+                telegram_id
+                for telegram_id in matched
+                if fits(capacity_of.get(telegram_id), weight_kg, volume_m3, pallets)
+            }
+        return matched
+
+    def __len__(self):
+        return len(self._route_of)
+
+
+def _coords(route_key: str):
+    origin, _, destination = route_key.partition(":")
+    gazetteer = get_gazetteer()
+    return gazetteer.coords(origin), gazetteer.coords(destination)
+
+
+route_index = RouteIndex()
+
+
+async def warm_route_index():
+    async with async_session() as session:
+        await route_index.load(session)
+        await carrier_scorer.load(session)
+    print(f"🧭 Індекс маршрутів: {len(route_index)} перевізників")
+
+
+async def refresh_route_index(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session() as session:
+                await route_index.load(session)
+                await carrier_scorer.load(session)
+        except Exception as e:
+            print(f"⛔️ Індекс маршрутів: {e!r}")
@@ -0,0 +1,371 @@
+# bot/services/scoring.py
+#
+# Ранжування перевізників під заявку: замість "усім одразу" спершу найкращі K,
+# далі хвилями (bot/services/notifier.py, send_after у outbox).
+# Атрибути перевізників лежать колонками в масивах NumPy — маршрут (код),
+# дім (звідки і куди їздить), місткість, частка прийнятих карток і час
+# останньої активності, — тож мікропачка з B заявок оцінюється проти всіх
+# N перевізників однією векторною операцією над матрицею B×N, а top-K
+# береться через argpartition без сортування всього рядка.
+# Масиви оновлюються на місці при реєстрації/деактивації (звільнені рядки
+# перевикористовуються), повністю перечитуються разом з індексом маршрутів.
+# У проді заявки різних клієнтів, що прийшли майже одночасно, збираються
+# RankBatcher у мікропачку на SCORING_BATCH_WINDOW с і ранжуються одним проходом
+# по об'єднанню їхніх кандидатів (rank_many).
+#
+# Бал = маршрут збігся + близькість кінцевих точок + частка прийнятих + свіжість.
+# Допуск: місткість вміщує заявку і або той самий маршрут, або обидва пункти
+# перевізника в межах CORRIDOR_RADIUS_KM від пунктів заявки (чи явний список
+# кандидатів — напр. з route_index.match, де є і попутні коридори).
+
+import asyncio
+import math
+import time
+from collections.abc import Iterable
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot import config
+from bot.geo.gazetteer import get_gazetteer
+from bot.models import Carrier, NotificationOutbox, RequestResponse, Shipment_request
+from bot.models import shipment_request_history as history
+
+EARTH_KM = 6371.0
+
+W_ROUTE = 1.0
+W_NEAR = 1.0
+W_ACCEPT = 2.0
+W_RECENT = 1.0
+# за скільки часу без активності бонус свіжості падає в e разів
+RECENT_TAU = 7 * 24 * 3600.0
+
+_FIELDS = {
+    "ids": np.int64,
+    "route": np.int32,
+    "origin_lat": np.float32,
+    "origin_lon": np.float32,
+    "dest_lat": np.float32,
+    "dest_lon": np.float32,
+    "cap_kg": np.float32,
+    "cap_m3": np.float32,
+    "cap_pallets": np.float32,
+    "sent": np.float32,
+    "accepted": np.float32,
+    "active": np.float64,
+    "alive": np.bool_,
+}
+
+
+def _endpoints(route_key: str | None) -> tuple[float, float, float, float]:
+    # координати пунктів маршруту в радіанах, NaN — місто не знайдено
+    origin, _, destination = (route_key or "").partition(":")
+    gazetteer = get_gazetteer()
+    points = []
+    for key in (origin, destination):
+        coords = gazetteer.coords(key) if key else None
+        points.extend((math.radians(coords[0]), math.radians(coords[1])) if coords else (math.nan, math.nan))
+    return tuple(points)
+
+
+def _limit(value) -> float:
+    # невідома місткість не обмежує
+    return math.inf if value is None else float(value)
+
+
+def _need(value) -> float:
+    return 0.0 if value is None else float(value)
+
+
+class CarrierScorer:
+    def __init__(self, radius_km: float | None = None, initial: int = 1024):
+        self.radius_km = radius_km or config.CORRIDOR_RADIUS_KM
+        self._size = 0
+        self._slot_of: dict[int, int] = {}
+        self._free: list[int] = []
+        self._routes: dict[str, int] = {}
+        self._allocate(initial)
+        self.ready = False
+
+    def _allocate(self, capacity: int):
+        old = getattr(self, "_arrays", None)
+        arrays = {}
+        for name, dtype in _FIELDS.items():
+            arrays[name] = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                arrays[name][: self._size] = old[name][: self._size]
+        self._arrays = arrays
+        self.__dict__.update(arrays)
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _route_code(self, route_key: str | None) -> int:
+        if not route_key:
+            return -1
+        return self._routes.setdefault(route_key, len(self._routes))
+
+    def add(
+        self,
+        telegram_id: int,
+        route_key: str | None,
+        capacity: tuple | None = None,
+        sent: int = 0,
+        accepted: int = 0,
+        last_active: float | None = None,
+    ):
+        slot = self._slot_of.get(telegram_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self.ids):
+                    self._allocate(len(self.ids) * 2)
+                slot = self._size
+                self._size += 1
+            self._slot_of[telegram_id] = slot
+
+        kg, m3, pallets = capacity or (None, None, None)
+        self.ids[slot] = telegram_id
+        self.route[slot] = self._route_code(route_key)
+        self.origin_lat[slot], self.origin_lon[slot], self.dest_lat[slot], self.dest_lon[slot] = _endpoints(route_key)
+        self.cap_kg[slot], self.cap_m3[slot], self.cap_pallets[slot] = _limit(kg), _limit(m3), _limit(pallets)
+        self.sent[slot], self.accepted[slot] = sent, accepted
+        self.active[slot] = last_active if last_active is not None else time.time()
+        self.alive[slot] = route_key is not None
+
+    def remove(self, telegram_id: int):
+        slot = self._slot_of.pop(telegram_id, None)
+        if slot is not None:
+            self.alive[slot] = False
+            self._free.append(slot)
+
+    def touch(self, telegram_id: int, accepted: bool = False, now: float | None = None):
+        # перевізник щось натиснув; accepted — прийняв рейс чи запропонував ставку
+        slot = self._slot_of.get(telegram_id)
+        if slot is None:
+            return
+        self.active[slot] = now if now is not None else time.time()
+        if accepted:
+            self.accepted[slot] += 1
+
+    def delivered(self, telegram_ids: Iterable[int]):
+        # картки (чи рядки зведення), що дійшли, — знаменник частки прийнятих
+        for telegram_id in telegram_ids:
+            slot = self._slot_of.get(telegram_id)
+            if slot is not None:
+                self.sent[slot] += 1
+
+    def _requests(self, requests: list[Shipment_request]) -> dict[str, np.ndarray]:
+        points = np.array([_endpoints(r.route_key) for r in requests], dtype=np.float32).reshape(-1, 4)
+        return {
+            "route": np.array([self._routes.get(r.route_key, -2) for r in requests], dtype=np.int32),
+            "origin_lat": points[:, 0],
+            "origin_lon": points[:, 1],
+            "dest_lat": points[:, 2],
+            "dest_lon": points[:, 3],
+            "kg": np.array([_need(r.weight_kg) for r in requests], dtype=np.float32),
+            "m3": np.array([_need(r.volume_m3) for r in requests], dtype=np.float32),
+            "pallets": np.array([_need(r.pallets) for r in requests], dtype=np.float32),
+        }
+
+    def scores(
+        self,
+        requests: list[Shipment_request],
+        candidates: Iterable[int] | None = None,
+        now: float | None = None,
+        slots: np.ndarray | None = None,
+    ) -> np.ndarray:
+        # матриця балів B×size (або B×len(slots) — лише ці рядки масивів), недопустимі пари — -inf
+        n = self._size
+        pick = (lambda values: values[:n]) if slots is None else (lambda values: values[slots])  # noqa: E731
+        q = self._requests(requests)
+        column = lambda name: pick(getattr(self, name))[None, :]  # noqa: E731
+        row = lambda name: q[name][:, None]  # noqa: E731
+
+        # рівнокутна проєкція: на відстанях у сотні км похибка мізерна
+        def distance(lat, lon, req_lat, req_lon):
+            x = (column(lon) - row(req_lon)) * np.cos((column(lat) + row(req_lat)) * 0.5)
+            return EARTH_KM * np.hypot(x, column(lat) - row(req_lat))
+
+        d_origin = distance("origin_lat", "origin_lon", "origin_lat", "origin_lon")
+        d_dest = distance("dest_lat", "dest_lon", "dest_lat", "dest_lon")
+        same_route = column("route") == row("route")
+
+        eligible = (
+            column("alive")
+            & (column("cap_kg") >= row("kg"))
+            & (column("cap_m3") >= row("m3"))
+            & (column("cap_pallets") >= row("pallets"))
+        )
+        if candidates is None:
+            eligible &= same_route | ((d_origin <= self.radius_km) & (d_dest <= self.radius_km))
+        else:
+            eligible &= np.isin(pick(self.ids), np.fromiter(candidates, dtype=np.int64))[None, :]
+
+        now = now if now is not None else time.time()
+        near = np.nan_to_num(np.exp(-(d_origin + d_dest) / (2 * self.radius_km)), nan=0.0)
+        # частка прийнятих зі згладжуванням: новачок без історії — 0.5; рейси, взяті
+        # зі стрічки без картки, не піднімають частку вище 1
+        sent, accepted = pick(self.sent), pick(self.accepted)
+        accept = (np.minimum(accepted, sent) + 1) / (sent + 2)
+        recent = np.exp(-np.maximum(now - pick(self.active), 0) / RECENT_TAU).astype(np.float32)
+
+        score = W_ROUTE * same_route + W_NEAR * near + (W_ACCEPT * accept + W_RECENT * recent)[None, :]
+        return np.where(eligible, score, -np.inf)
+
+    def top_k(
+        self,
+        requests: list[Shipment_request],
+        k: int,
+        candidates: Iterable[int] | None = None,
+        now: float | None = None,
+    ) -> list[list[int]]:
+        # для кожної заявки — до k telegram_id, найкращі першими
+        if not requests or not self._size:
+            return [[] for _ in requests]
+        score = self.scores(requests, candidates, now)
+        k = min(k, score.shape[1])
+        top = np.argpartition(score, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(score, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        return [self.ids[slots[np.isfinite(best)]].tolist() for slots, best in zip(top, top_scores)]
+
+    def rank(self, request: Shipment_request, candidates: set[int], now: float | None = None) -> list[int]:
+        return self.rank_many([request], [candidates], now)[0]
+
+    def rank_many(
+        self,
+        requests: list[Shipment_request],
+        candidates: list[set[int]],
+        now: float | None = None,
+    ) -> list[list[int]]:
+        # мікропачка заявок, у кожної свої кандидати: одна матриця B×U по об'єднанню
+        # кандидатів, а не по всіх N перевізниках. Кого scorer ще не бачив
+        # (зареєстровані в іншому процесі до перечитування) — у кінці
+        slot_of = self._slot_of
+        union = np.fromiter({slot_of[t] for group in candidates for t in group if t in slot_of}, dtype=np.int64)
+        ranked: list[list[int]] = [[] for _ in requests]
+        if union.size:
+            ids = self.ids[union]
+            # явні кандидати (route_index.match — і попутні коридори) — без фільтра радіуса
+            score = self.scores(requests, candidates=ids, now=now, slots=union)
+            for i, group in enumerate(candidates):
+                row = np.where(np.isin(ids, np.fromiter(group, dtype=np.int64)), score[i], -np.inf)
+                order = np.argsort(-row, kind="stable")
+                ranked[i] = ids[order[np.isfinite(row[order])]].tolist()
+        result = []
+        for group, best in zip(candidates, ranked):
+            seen = set(best)
+            result.append(best + [telegram_id for telegram_id in group if telegram_id not in seen])
+        return result
+
+    async def load(self, session: AsyncSession):
+        sent = dict(
+            (
+                await session.execute(
+                    select(NotificationOutbox.chat_id, func.count())
+                    .where(
+                        NotificationOutbox.kind == "new_request",
+                        NotificationOutbox.status.in_(("sent", "digested")),
+                    )
+                    .group_by(NotificationOutbox.chat_id)
+                )
+            ).all()
+        )
+        taken = (
+            await session.execute(
+                # разом із заархівованими заявками (bot/services/retention.py)
+                select(
+                    history.c.carrier_telegram_id,
+                    func.count(),
+                    func.max(history.c.taken_at),
+                )
+                .where(history.c.carrier_telegram_id.is_not(None))
+                .group_by(history.c.carrier_telegram_id)
+            )
+        ).all()
+        responses = (
+            await session.execute(
+                select(
+                    RequestResponse.carrier_telegram_id,
+                    func.count().filter(RequestResponse.kind == "offer"),
+                    func.max(RequestResponse.created_at),
+                ).group_by(RequestResponse.carrier_telegram_id)
+            )
+        ).all()
+        accepted: dict[int, int] = {}
+        last_seen: dict[int, object] = {}
+        for telegram_id, count, at in (*taken, *responses):
+            accepted[telegram_id] = accepted.get(telegram_id, 0) + count
+            if at is not None and (telegram_id not in last_seen or at > last_seen[telegram_id]):
+                last_seen[telegram_id] = at
+
+        rows = await session.execute(
+            select(
+                Carrier.telegram_id,
+                Carrier.route_key,
+                Carrier.capacity_kg,
+                Carrier.capacity_m3,
+                Carrier.capacity_pallets,
+                Carrier.created_at,
+            ).where(Carrier.is_active, Carrier.route_key.is_not(None))
+        )
+        fresh = CarrierScorer(self.radius_km)
+        for telegram_id, key, kg, m3, pallets, created_at in rows:
+            seen = last_seen.get(telegram_id) or created_at
+            fresh.add(
+                telegram_id,
+                key,
+                (kg, m3, pallets),
+                sent=sent.get(telegram_id, 0),
+                accepted=accepted.get(telegram_id, 0),
+                last_active=seen.timestamp() if seen else None,
+            )
+        self.__dict__.update(fresh.__dict__)
+        self.ready = True
+
+
+class RankBatcher:
+    # заявки з різних апдейтів, що прийшли в межах SCORING_BATCH_WINDOW с, ранжуються
+    # однією мікропачкою (rank_many); кожен notify_carriers чекає лише на свій рядок
+    def __init__(self, scorer: CarrierScorer, window: float | None = None, max_batch: int | None = None):
+        self.scorer = scorer
+        self.window = config.SCORING_BATCH_WINDOW if window is None else window
+        self.max_batch = max_batch or config.SCORING_BATCH_SIZE
+        self._pending: list[tuple[Shipment_request, set[int], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self.batches = 0
+
+    async def rank(self, request: Shipment_request, candidates: set[int]) -> list[int]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, candidates, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = [p for p in self._pending if not p[2].done()], []
+        if not batch:
+            return
+        self.batches += 1
+        try:
+            ranked = self.scorer.rank_many([p[0] for p in batch], [p[1] for p in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), order in zip(batch, ranked):
+            future.set_result(order)
+
+
+carrier_scorer = CarrierScorer()
+rank_batcher = RankBatcher(carrier_scorer)
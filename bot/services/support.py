@@ -0,0 +1,244 @@
+# bot/services/support.py
+#
+# Чат підтримки: користувач ↔ чат адмінів (bot/handlers/common/support.py).
+# - активну сесію шукаємо по індексу (user_id, is_active);
+# - історію гортаємо keyset по (session_id, id): сторінка "старіші за id"
+#   читає лише limit + 1 рядків з індексу ix_support_messages_session_id_id,
+#   ніколи не тягне всю історію через relationship (там lazy="raise");
+# - список відкритих сесій з останнім повідомленням — одним запитом, без N+1;
+# - фонова задача переносить закриті сесії в support_archive: уся історія
+#   одним стиснутим блоком, рядки з гарячих таблиць видаляються.
+#   Історію пачки сесій читає selectinload — один запит на пачку.
+
+import asyncio
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from bot import config
+from bot.database.database import async_session
+from bot.models import SupportArchive, SupportMessage, SupportSession
+
+
+@dataclass(slots=True)
+class HistoryPage:
+    # повідомлення від старіших до новіших
+    items: list
+    has_older: bool
+
+    @property
+    def oldest_id(self) -> int | None:
+        return self.items[0].id if self.items else None
+
+
+@dataclass(slots=True)
+class ArchivedMessage:
+    id: int
+    from_admin: bool
+    text: str
+    created_at: datetime | None
+
+
+async def active_session(session: AsyncSession, user_id: int) -> SupportSession | None:
+    return await session.scalar(
+        select(SupportSession)
+        .where(SupportSession.user_id == user_id, SupportSession.is_active)
+        .order_by(SupportSession.id.desc())
+        .limit(1)
+    )
+
+
+async def open_session(session: AsyncSession, user_id: int) -> tuple[SupportSession, bool]:
+    # (сесія, чи щойно створена)
+    current = await active_session(session, user_id)
+    if current is not None:
+        return current, False
+    current = SupportSession(user_id=user_id)
+    session.add(current)
+    await session.flush()
+    return current, True
+
+
+async def add_message(
+    session: AsyncSession,
+    session_id: int,
+    text: str,
+    from_admin: bool = False,
+    admin_message_id: int | None = None,
+) -> SupportMessage:
+    message = SupportMessage(
+        session_id=session_id, text=text, from_admin=from_admin, admin_message_id=admin_message_id
+    )
+    session.add(message)
+    await session.flush()
+    return message
+
+
+async def session_by_admin_message(session: AsyncSession, admin_message_id: int) -> SupportSession | None:
+    return await session.scalar(
+        select(SupportSession)
+        .join(SupportMessage, SupportMessage.session_id == SupportSession.id)
+        .where(SupportMessage.admin_message_id == admin_message_id)
+        .limit(1)
+    )
+
+
+async def close_session(session: AsyncSession, session_id: int) -> bool:
+    result = await session.execute(
+        update(SupportSession)
+        .where(SupportSession.id == session_id, SupportSession.is_active)
+        .values(is_active=False, closed_at=datetime.now())
+    )
+    return result.rowcount > 0
+
+
+async def history(
+    session: AsyncSession,
+    session_id: int,
+    before_id: int | None = None,
+    limit: int | None = None,
+    user_id: int | None = None,
+) -> HistoryPage:
+    limit = limit or config.SUPPORT_PAGE_SIZE
+    query = select(SupportMessage).where(SupportMessage.session_id == session_id)
+    if before_id is not None:
+        query = query.where(SupportMessage.id < before_id)
+    rows = list((await session.scalars(query.order_by(SupportMessage.id.desc()).limit(limit + 1))).all())
+    if not rows:
+        # гарячих рядків немає: або сесія ще порожня, або її вже заархівовано
+        if await session.scalar(select(SupportSession.id).where(SupportSession.id == session_id)) is not None:
+            return HistoryPage([], False)
+        archived = await archived_messages(session, session_id, user_id)
+        if before_id is not None:
+            archived = [m for m in archived if m.id < before_id]
+        return HistoryPage(archived[-limit:], len(archived) > limit)
+    return HistoryPage(rows[:limit][::-1], len(rows) > limit)
+
+
+async def open_sessions(session: AsyncSession, limit: int = 20) -> list[tuple[SupportSession, SupportMessage | None]]:
+    # відкриті сесії з останнім повідомленням кожної — один запит замість 1 + N
+    active_ids = select(SupportSession.id).where(SupportSession.is_active)
+    last_ids = (
+        select(func.max(SupportMessage.id).label("last_id"), SupportMessage.session_id)
+        .where(SupportMessage.session_id.in_(active_ids))
+        .group_by(SupportMessage.session_id)
+        .subquery()
+    )
+    rows = (
+        await session.execute(
+            select(SupportSession, SupportMessage)
+            .where(SupportSession.is_active)
+            .outerjoin(last_ids, last_ids.c.session_id == SupportSession.id)
+            .outerjoin(SupportMessage, SupportMessage.id == last_ids.c.last_id)
+            .order_by(SupportSession.id.desc())
+            .limit(limit)
+        )
+    ).all()
+    return [(support_session, last) for support_session, last in rows]
+
+
+def pack_messages(messages: list[SupportMessage]) -> bytes:
+    return zlib.compress(
+        json.dumps(
+            [
+                [m.id, m.from_admin, m.text, m.created_at.isoformat() if m.created_at else None]
+                for m in messages
+            ],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode(),
+        level=6,
+    )
+
+
+def unpack_messages(payload: bytes) -> list[ArchivedMessage]:
+    return [
+        ArchivedMessage(id, from_admin, text, datetime.fromisoformat(at) if at else None)
+        for id, from_admin, text, at in json.loads(zlib.decompress(payload))
+    ]
+
+
+async def archived_messages(
+    session: AsyncSession, session_id: int, user_id: int | None = None
+) -> list[ArchivedMessage]:
+    # user_id — лише сесії цього користувача
+    query = select(SupportArchive.payload).where(SupportArchive.session_id == session_id)
+    if user_id is not None:
+        query = query.where(SupportArchive.user_id == user_id)
+    payload = await session.scalar(query)
+    return unpack_messages(payload) if payload is not None else []
+
+
+async def archive_closed(
+    session: AsyncSession,
+    older_than: datetime,
+    batch_size: int | None = None,
+) -> int:
+    # одна пачка закритих сесій → support_archive; повертає кількість сесій
+    batch_size = batch_size or config.SUPPORT_ARCHIVE_BATCH
+    sessions = (
+        await session.scalars(
+            select(SupportSession)
+            .where(SupportSession.is_active.is_(False), SupportSession.closed_at < older_than)
+            .order_by(SupportSession.closed_at)
+            .limit(batch_size)
+            # історії всієї пачки — одним SELECT … WHERE session_id IN (…)
+            .options(selectinload(SupportSession.messages))
+        )
+    ).all()
+    if not sessions:
+        return 0
+    ids = [s.id for s in sessions]
+
+    await session.execute(
+        insert(SupportArchive),
+        [
+            {
+                "session_id": s.id,
+                "user_id": s.user_id,
+                "created_at": s.created_at,
+                "closed_at": s.closed_at,
+                "message_count": len(s.messages),
+                "payload": pack_messages(sorted(s.messages, key=lambda m: m.id)),
+            }
+            for s in sessions
+        ],
+    )
+    await session.execute(
+        delete(SupportMessage)
+        .where(SupportMessage.session_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        delete(SupportSession).where(SupportSession.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return len(ids)
+
+
+async def archive_once(now: datetime | None = None) -> int:
+    older_than = (now or datetime.now()) - timedelta(days=config.SUPPORT_ARCHIVE_AFTER_DAYS)
+    total = 0
+    while True:
+        # кожна пачка — своя коротка транзакція, щоб не тримати запис надовго
+        async with async_session() as session:
+            archived = await archive_closed(session, older_than)
+        if not archived:
+            return total
+        total += archived
+
+
+async def archive_support_sessions(interval: float):
+    while True:
+        try:
+            archived = await archive_once()
+            if archived:
+                print(f"🗄 Підтримка: заархівовано {archived} сесій")
+        except Exception as e:
+            print(f"⛔️ Архів підтримки: {e!r}")
+        await asyncio.sleep(interval)
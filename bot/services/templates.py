@@ -0,0 +1,201 @@
+# bot/services/templates.py
+#
+# Шаблони повідомлень про заявку: текст рендериться один раз на заявку,
+# клавіатура кешується за id заявки — розсилка на 1000 перевізників
+# використовує ті самі об'єкти, а не будує 1000 копій.
+# Дати й суми форматуються без locale: strftime("%B") залежить від
+# системної локалі і на сервері дає "July" замість "липня".
+
+import html
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+MONTHS_GENITIVE = (
+    "січня", "лютого", "березня", "квітня", "травня", "червня",
+    "липня", "серпня", "вересня", "жовтня", "листопада", "грудня",
+)
+
+REQUEST_CARD = (
+    "📦 <b>Нова заявка на перевезення:</b>\n"
+    "Маршрут: {route}\n"
+    "Дата подачі: {date}\n"
+    "Тип вантажу: {cargo_type}\n"
+    "Обʼєм: {volume}\n"
+    "Орієнтовна вага: {weight}\n"
+    "Завантаження: {loading}\n"
+    "Вивантаження: {unloading}\n"
+    "Ціна: {price} {currency}"
+)
+CURRENCY_LABELS = {"UAH": "грн", "USD": "$", "EUR": "€"}
+TAKEN_CARD = (
+    "🚫 <b>Рейс уже взяв інший перевізник</b>\n"
+    "Маршрут: {route}\n"
+    "Дата подачі: {date}"
+)
+WON_CARD = REQUEST_CARD.replace("📦 <b>Нова заявка на перевезення:</b>", "✅ <b>Рейс ваш!</b>") + (
+    "\n\n👤 Клієнт: {client_name}\n📱 {client_phone}"
+)
+
+
+def format_date(value: datetime, with_year: bool = False) -> str:
+    # 20 липня о 10:00 / 20 липня 2025 о 10:00
+    year = f" {value.year}" if with_year else ""
+    return f"{value.day} {MONTHS_GENITIVE[value.month - 1]}{year} о {value.hour:02d}:{value.minute:02d}"
+
+
+def format_money(value: int | float | None) -> str:
+    # 8000 → "8 000"
+    if value is None:
+        return "—"
+    return f"{value:,.0f}".replace(",", " ")
+
+
+class RenderCache:
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+        self.stats = {"hits": 0, "renders": 0}
+
+    def get(self, key: tuple) -> str | None:
+        text = self._data.get(key)
+        if text is not None:
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+        return text
+
+    def set(self, key: tuple, text: str):
+        self._data[key] = text
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_cards = RenderCache()
+
+
+def _card_fields(request) -> dict:
+    e = html.escape
+    return {
+        "route": e(request.route),
+        "date": format_date(request.date),
+        "cargo_type": e(request.cargo_type),
+        "volume": e(request.volume),
+        "weight": e(request.weight),
+        "loading": e(request.loading),
+        "unloading": e(request.unloading),
+        "price": format_money(request.price),
+        "currency": CURRENCY_LABELS.get(getattr(request, "price_currency", None) or "UAH", "грн"),
+    }
+
+
+def render_request_card(request) -> str:
+    # у ключі — поля, які можуть змінитися після створення (перенесення дати, торг, виправлення валюти)
+    key = (request.id, request.date, request.price, getattr(request, "price_currency", None))
+    text = _cards.get(key)
+    if text is None:
+        text = REQUEST_CARD.format_map(_card_fields(request))
+        _cards.stats["renders"] += 1
+        if request.id is not None:
+            _cards.set(key, text)
+    return text
+
+
+def render_taken_card(request) -> str:
+    if request is None:
+        return "🚫 <b>Заявку знято</b>"
+    return TAKEN_CARD.format_map(_card_fields(request))
+
+
+def render_won_card(request, client_name: str | None, client_phone: str | None) -> str:
+    fields = _card_fields(request)
+    fields["client_name"] = html.escape(client_name or "—")
+    fields["client_phone"] = html.escape(client_phone or "—")
+    return WON_CARD.format_map(fields)
+
+
+@lru_cache(maxsize=4096)
+def request_keyboard(request_id: int, version: int) -> InlineKeyboardMarkup:
+    # одна й та сама розмітка для всіх отримувачів заявки; версія в кнопках —
+    # щоб стара картка не спрацювала на заявку, що вже змінилась
+    ref = f"{request_id}_{version}"
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Прийняти рейс", callback_data=f"accept_{ref}"),
+                InlineKeyboardButton(text="❌ Відмовитись", callback_data=f"decline_{ref}"),
+            ],
+            [
+                InlineKeyboardButton(
+                    text="💬 Запропонувати іншу ставку",
+                    callback_data=f"negotiate_{ref}",
+                )
+            ],
+        ]
+    )
+
+
+FEED_LINE = "<b>#{id}</b> · {date} · {route}\n      {weight} · {volume} · {price} {currency}"
+
+
+def render_feed_page(items) -> str:
+    header = "📋 <b>Відкриті заявки</b>"
+    if not items:
+        return header + "\n\nНа найближчі дні заявок немає."
+    lines = []
+    for request in items:
+        fields = _card_fields(request)
+        fields["id"] = request.id
+        lines.append(FEED_LINE.format_map(fields))
+    return header + "\n\n" + "\n".join(lines)
+
+
+def feed_keyboard(page) -> InlineKeyboardMarkup:
+    # по кнопці на заявку (повна картка з кнопками відгуку) + навігація
+    rows = [
+        [InlineKeyboardButton(text=f"🔎 #{request.id}", callback_data=f"feed_show_{request.id}")]
+        for request in page.items
+    ]
+    navigation = []
+    if page.has_prev:
+        navigation.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"feed_prev_{page.first_id}"))
+    if page.has_next:
+        navigation.append(InlineKeyboardButton(text="Далі ➡️", callback_data=f"feed_next_{page.last_id}"))
+    if navigation:
+        rows.append(navigation)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def render_digest(items, total: int, page: int, pages: int) -> str:
+    # зведення (bot/services/digest.py): items — заявки сторінки, None — вже в архіві
+    header = f"📬 <b>Нові заявки на вашому маршруті: {total}</b>"
+    if pages > 1:
+        header += f" · стор. {page + 1}/{pages}"
+    lines = []
+    for request in items:
+        if request is None:
+            continue
+        fields = _card_fields(request)
+        fields["id"] = request.id
+        line = FEED_LINE.format_map(fields)
+        lines.append(line if request.status == "open" else f"<s>{line}</s> — взято")
+    return header + "\n\n" + "\n".join(lines)
+
+
+def digest_keyboard(digest_id: int, items, page: int, pages: int) -> InlineKeyboardMarkup:
+    # як у стрічці: кнопка на відкриту заявку, картка з кнопками відгуку — окремим повідомленням
+    rows = [
+        [InlineKeyboardButton(text=f"🔎 #{request.id}", callback_data=f"feed_show_{request.id}")]
+        for request in items
+        if request is not None and request.status == "open"
+    ]
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"digest_{digest_id}_{page - 1}"))
+    if page + 1 < pages:
+        navigation.append(InlineKeyboardButton(text="Далі ➡️", callback_data=f"digest_{digest_id}_{page + 1}"))
+    if navigation:
+        rows.append(navigation)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
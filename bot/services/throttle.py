@@ -0,0 +1,96 @@
+# bot/services/throttle.py
+#
+# Token bucket на користувача у формі GCRA: замість пари (токени, час)
+# зберігається одне число — "теоретичний час прибуття" (TAT), момент, коли
+# відро знову стане повним. Запит ціною cost проходить, якщо
+#     max(TAT, now) + cost / rate - now <= burst / rate,
+# і тоді TAT зсувається вперед; інакше відмова без зміни стану.
+# Користувач з TAT <= now має повне відро — його запис нічого не означає,
+# тож витіснення таких записів нічого не губить.
+#
+# Таблиця — множинно-асоціативна, як кеш процесора: sets наборів по WAYS
+# слотів у плоских масивах array('q') / array('d') (24 байти на користувача,
+# без Python-об'єктів на запис). Користувач живе лише в наборі id % sets;
+# новий витісняє слот з найменшим TAT (найдавніше повне відро) — O(1),
+# розмір фіксований незалежно від кількості різних користувачів.
+# Як і identity_cache — окремо в кожному процесі (webhook-воркери
+# шардовані за chat id, тож користувач завжди потрапляє в один).
+
+import time
+from array import array
+
+from bot import config
+
+WAYS = 4
+
+
+class TokenBuckets:
+    def __init__(self, rate: float | None = None, burst: float | None = None, capacity: int | None = None):
+        self.rate = rate or config.THROTTLE_RATE
+        self.burst = burst or config.THROTTLE_BURST
+        self.sets = max(1, (capacity or config.THROTTLE_CAPACITY) // WAYS)
+        size = self.sets * WAYS
+        self._ids = array("q", bytes(8 * size))  # 0 — порожній слот
+        self._tat = array("d", bytes(8 * size))
+        # до якого моменту користувачу вже відповіли "зачекайте"
+        self._warned = array("d", bytes(8 * size))
+        self.stats = {"allowed": 0, "rejected": 0, "evicted": 0}
+
+    @property
+    def capacity(self) -> int:
+        return self.sets * WAYS
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self._ids, self._tat, self._warned))
+
+    def __len__(self):
+        now = time.monotonic()
+        return sum(1 for user_id, tat in zip(self._ids, self._tat) if user_id and tat > now)
+
+    def _slot(self, user_id: int) -> int:
+        ids, tat = self._ids, self._tat
+        base = (user_id % self.sets) * WAYS
+        victim = base
+        for slot in range(base, base + WAYS):
+            if ids[slot] == user_id:
+                return slot
+            if tat[slot] < tat[victim]:
+                victim = slot
+        if ids[victim]:
+            self.stats["evicted"] += 1
+        ids[victim] = user_id
+        tat[victim] = 0.0
+        self._warned[victim] = 0.0
+        return victim
+
+    def acquire(self, user_id: int, cost: float = 1, now: float | None = None) -> float:
+        # 0 — пропущено; інакше скільки секунд чекати, поки вистачить токенів
+        now = time.monotonic() if now is None else now
+        slot = self._slot(user_id)
+        tat = self._tat[slot]
+        new_tat = (tat if tat > now else now) + cost / self.rate
+        wait = new_tat - now - self.burst / self.rate
+        if wait > 0:
+            self.stats["rejected"] += 1
+            return wait
+        self._tat[slot] = new_tat
+        self.stats["allowed"] += 1
+        return 0.0
+
+    def should_warn(self, user_id: int, wait: float, now: float | None = None) -> bool:
+        # одна відповідь "зачекайте" на вікно відмови, а не на кожне відхилене повідомлення
+        now = time.monotonic() if now is None else now
+        slot = self._slot(user_id)
+        if self._warned[slot] > now:
+            return False
+        self._warned[slot] = now + wait
+        return True
+
+    def reset(self, user_id: int):
+        slot = self._slot(user_id)
+        self._tat[slot] = 0.0
+        self._warned[slot] = 0.0
+
+
+token_buckets = TokenBuckets()
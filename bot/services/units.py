@@ -0,0 +1,169 @@
+# bot/services/units.py
+#
+# Розбір вільного тексту у числа з одиницями:
+#   вага   "2.2 т", "1 500 кг", "15 ц", "1,5-2 т"   → кілограми
+#   обʼєм  "82 м³", "6 палет", "500 л", "33 пал"   → м³ і/або кількість палет
+#   ціна   "8 000.50 грн", "8.000,50", "$500"      → сума і валюта
+# Діапазон ("1,5-2 т") дає верхню межу — для підбору авто важлива саме вона.
+# Для бекфілу колонки є parse_batch: однакові рядки ("6 палет", "20 т")
+# у таблиці повторюються тисячами, тож кожне унікальне значення розбирається раз.
+
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Callable, Iterable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+_NUMBER = r"\d+(?:[.,'’]\d+)*(?:[ \u00a0\u202f]\d{3}(?!\d))*(?:[.,]\d+)?"
+_QUANTITY = re.compile(
+    rf"(?P<number>{_NUMBER})\s*(?P<range>-|–|—|до)?\s*"
+    r"(?P<unit>тонн\w*|тон\w*|tons?\b|т\b|t\b|кілограм\w*|кг|kg|центнер\w*|ц\b"
+    r"|м³|м3|m³|m3|куб\w*|cbm\b|літр\w*|л\b|l\b|палет\w*|піддон\w*|pallets?\b|пал\b)?"
+)
+_CURRENCIES = (
+    ("UAH", re.compile(r"грн|гривн\w*|uah|₴")),
+    ("USD", re.compile(r"\$|usd|дол\w*")),
+    ("EUR", re.compile(r"€|eur\w*|євро")),
+)
+
+# одиниця → (величина, множник до базової: кг / м³ / палета)
+_UNITS = (
+    ("тон", "kg", 1000), ("т", "kg", 1000), ("t", "kg", 1000),
+    ("кілограм", "kg", 1), ("кг", "kg", 1), ("kg", "kg", 1),
+    ("центнер", "kg", 100), ("ц", "kg", 100),
+    ("м³", "m3", 1), ("м3", "m3", 1), ("m³", "m3", 1), ("m3", "m3", 1),
+    ("куб", "m3", 1), ("cbm", "m3", 1),
+    ("літр", "m3", Decimal("0.001")), ("л", "m3", Decimal("0.001")), ("l", "m3", Decimal("0.001")),
+    ("палет", "pallets", 1), ("піддон", "pallets", 1), ("pallet", "pallets", 1), ("пал", "pallets", 1),
+)
+# одиниці, у яких три цифри після розділювача — це тисячі ("1.500 кг"), а не дріб
+_GROUPED_UNITS = {"kg"}
+# вага без одиниці — лише коли весь текст і є числом ("2.2", "1500"): до 40 — тонни
+# (фура — до ~24 т), більше — кілограми. "3 ящики" чи "20 шт" вагою не є
+_BARE_TONNES_LIMIT = 40
+_BARE_NUMBER = re.compile(rf"\s*{_NUMBER}\s*")
+
+
+class Volume(NamedTuple):
+    m3: float | None
+    pallets: int | None
+
+
+class Price(NamedTuple):
+    amount: Decimal
+    currency: str
+
+
+def _unit(token: str | None) -> tuple[str, int | Decimal] | None:
+    if not token:
+        return None
+    for prefix, kind, factor in _UNITS:
+        if token.startswith(prefix):
+            return kind, factor
+    return None
+
+
+def to_decimal(raw: str, grouped: bool = False) -> Decimal | None:
+    # "8 000.50", "8,000.50", "8.000,50", "2,2"; grouped — одиночний розділювач
+    # перед рівно трьома цифрами вважається розділювачем тисяч
+    number = re.sub(r"[ \u00a0\u202f'’]", "", raw)
+    separators = [c for c in number if c in ".,"]
+    if separators:
+        decimal_sep = separators[-1]
+        thousands = len(separators) > 1 and len(set(separators)) == 1
+        if not thousands and len(separators) == 1 and grouped:
+            thousands = len(number) - number.rfind(decimal_sep) - 1 == 3
+        if thousands:
+            number = number.replace(decimal_sep, "")
+        else:
+            head, _, tail = number.rpartition(decimal_sep)
+            number = head.replace(".", "").replace(",", "") + "." + tail
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        return None
+
+
+def _quantities(text: str) -> dict[str, Decimal]:
+    # найбільше значення кожної величини; число без одиниці перед діапазоном
+    # ("1,5-2 т") отримує одиницю наступного
+    found: dict[str, Decimal] = {}
+    pending: list[str] = []
+    for match in _QUANTITY.finditer(text.lower()):
+        unit = _unit(match["unit"])
+        if unit is None:
+            if match["range"]:
+                pending.append(match["number"])
+            else:
+                pending.clear()
+                found.setdefault("bare", to_decimal(match["number"]))
+            continue
+        kind, factor = unit
+        for raw in pending + [match["number"]]:
+            value = to_decimal(raw, grouped=kind in _GROUPED_UNITS)
+            if value is not None:
+                value *= factor
+                found[kind] = max(found.get(kind, value), value)
+        pending.clear()
+    return found
+
+
+def parse_weight(text: str | None) -> float | None:
+    # кілограми
+    if not text:
+        return None
+    found = _quantities(text)
+    if "kg" in found:
+        return float(found["kg"])
+    bare = found.get("bare")
+    if bare is None or bare <= 0 or not _BARE_NUMBER.fullmatch(text):
+        return None
+    return float(bare * 1000 if bare <= _BARE_TONNES_LIMIT else bare)
+
+
+def parse_volume(text: str | None) -> Volume:
+    if not text:
+        return Volume(None, None)
+    found = _quantities(text)
+    m3 = found.get("m3")
+    pallets = found.get("pallets")
+    return Volume(
+        float(m3) if m3 is not None else None,
+        int(pallets) if pallets is not None else None,
+    )
+
+
+def parse_price(text: str | int | float | None, default_currency: str = "UAH") -> Price | None:
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return Price(Decimal(str(text)), default_currency)
+    lowered = text.lower()
+    currency = next((code for code, pattern in _CURRENCIES if pattern.search(lowered)), default_currency)
+    match = re.search(_NUMBER, lowered)
+    if match is None:
+        return None
+    amount = to_decimal(match.group(), grouped=True)
+    if amount is None:
+        return None
+    if re.search(r"\d\s*(?:тис\w*|k\b|к\b)", lowered):
+        amount *= 1000
+    return Price(amount, currency)
+
+
+def whole(amount: Decimal) -> int:
+    # ціни в БД — цілі гривні
+    return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def parse_batch(values: Iterable[str | None], parser: Callable[[str | None], T]) -> list[T]:
+    # розбір цілої колонки: кожне унікальне значення — один раз
+    parsed: dict[str | None, T] = {}
+    result = []
+    for value in values:
+        try:
+            item = parsed[value]
+        except KeyError:
+            item = parsed[value] = parser(value)
+        result.append(item)
+    return result
@@ -0,0 +1,293 @@
+# bot/webhook.py
+#
+# Webhook-режим: фронтовий aiohttp-процес приймає апдейти від Telegram і
+# розкладає їх по N воркер-процесах за консистентним хешем chat id.
+# Усі апдейти одного чату потрапляють в один процес і там обробляються
+# строго по черзі (FSM-кроки не перемішуються), різні чати — паралельно.
+# Консистентний хеш, а не chat_id % N: при зміні кількості воркерів
+# переїжджає лише ~1/N чатів, решта зберігає теплий кеш FSM-сховища.
+#
+# Запуск: python -m bot.webhook [--workers 4] [--port 8080]
+# Ендпоінти: POST WEBHOOK_PATH, GET /healthz (процес живий + лічильники),
+# GET /readyz (усі воркери запущені і черги не переповнені).
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+
+from aiohttp import web
+
+from bot import config
+
+WORKER_RESTART_INTERVAL = 1.0
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, nodes: int, replicas: int = 128):
+        points = sorted((_hash(f"worker-{node}:{r}"), node) for node in range(nodes) for r in range(replicas))
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, chat_id: int) -> int:
+        i = bisect.bisect(self._points, _hash(str(chat_id)))
+        return self._nodes[i % len(self._nodes)]
+
+
+def chat_of(update: dict) -> int:
+    # message/edited_message/channel_post → chat; callback_query → message.chat;
+    # inline_query/pre_checkout_query тощо → from
+    for value in update.values():
+        if not isinstance(value, dict):
+            continue
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        user = value.get("from") or value.get("user")
+        if user:
+            return user["id"]
+    return 0
+
+
+# --- воркер ---
+
+
+class ChatSerializer:
+    # одна задача на чат, що має необроблені апдейти; загальна кількість
+    # одночасно оброблюваних чатів обмежена семафором
+    def __init__(self, handle, concurrency: int):
+        self._handle = handle
+        self._pending: dict[int, deque] = {}
+        self._limit = asyncio.Semaphore(concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, chat_id: int, item):
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            pending.append(item)
+            return
+        self._pending[chat_id] = deque([item])
+        task = asyncio.create_task(self._drain(chat_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, chat_id: int):
+        pending = self._pending[chat_id]
+        async with self._limit:
+            while pending:
+                try:
+                    await self._handle(pending.popleft())
+                except Exception as e:
+                    print(f"⛔️ Апдейт чату {chat_id}: {e!r}")
+        del self._pending[chat_id]
+
+    async def join(self):
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+
+def _load_factory(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _worker_main(index: int, inbox, ready, processed, factory_path: str, concurrency: int):
+    # свій порт метрик у кожного воркера (bot/services/metrics.py)
+    os.environ["WEBHOOK_WORKER_INDEX"] = str(index)
+    try:
+        asyncio.run(_worker_loop(index, inbox, ready, processed, factory_path, concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_loop(index, inbox, ready, processed, factory_path, concurrency):
+    loop = asyncio.get_running_loop()
+    local: asyncio.Queue = asyncio.Queue()
+
+    def reader():
+        # mp.Queue.get блокує — читаємо в окремому потоці і передаємо в event loop
+        while True:
+            item = inbox.get()
+            loop.call_soon_threadsafe(local.put_nowait, item)
+            if item is None:
+                return
+
+    threading.Thread(target=reader, name=f"webhook-inbox-{index}", daemon=True).start()
+
+    async with _load_factory(factory_path)() as (bot, dp):
+
+        async def handle(body: bytes):
+            await dp.feed_raw_update(bot, json.loads(body))
+            processed.value += 1
+
+        serializer = ChatSerializer(handle, concurrency)
+        ready.set()
+        print(f"✅ Webhook-воркер {index} готовий")
+        while (item := await local.get()) is not None:
+            chat_id, body = item
+            serializer.submit(chat_id, body)
+        await serializer.join()
+
+
+class WorkerHandle:
+    def __init__(self, ctx, index: int, factory_path: str, queue_size: int, concurrency: int):
+        self.ctx = ctx
+        self.index = index
+        self.factory_path = factory_path
+        self.concurrency = concurrency
+        self.inbox = ctx.Queue(maxsize=queue_size)
+        self.processed = ctx.Value("q", 0, lock=False)
+        self.ready = ctx.Event()
+        self.process = None
+        self.restarts = 0
+
+    def start(self):
+        self.ready.clear()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(self.index, self.inbox, self.ready, self.processed, self.factory_path, self.concurrency),
+            name=f"webhook-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+
+    def queued(self) -> int:
+        try:
+            return self.inbox.qsize()
+        except NotImplementedError:  # macOS
+            return -1
+
+    def status(self) -> dict:
+        return {
+            "worker": self.index,
+            "alive": self.process.is_alive(),
+            "ready": self.ready.is_set(),
+            "queued": self.queued(),
+            "processed": self.processed.value,
+            "restarts": self.restarts,
+        }
+
+
+# --- фронт ---
+
+
+def create_app(
+    workers: int | None = None,
+    factory_path: str = "bot.main:webhook_worker",
+    path: str | None = None,
+    secret: str | None = None,
+    queue_size: int | None = None,
+    concurrency: int | None = None,
+) -> web.Application:
+    workers = workers or config.WEBHOOK_WORKERS
+    path = path or config.WEBHOOK_PATH
+    secret = secret if secret is not None else config.WEBHOOK_SECRET
+    queue_size = queue_size or config.WEBHOOK_QUEUE_SIZE
+    concurrency = concurrency or config.WEBHOOK_WORKER_CONCURRENCY
+
+    # spawn: воркери не успадковують ні event loop, ні з'єднання фронту
+    ctx = multiprocessing.get_context("spawn")
+    handles = [WorkerHandle(ctx, i, factory_path, queue_size, concurrency) for i in range(workers)]
+    ring = HashRing(workers)
+    app = web.Application()
+    app["workers"] = handles
+    app["ring"] = ring
+    app["stats"] = {"accepted": 0, "rejected": 0}
+
+    async def receive(request: web.Request) -> web.Response:
+        if secret and request.headers.get("X-Telegram-Bot-Api-Secret-Token") != secret:
+            return web.Response(status=401)
+        body = await request.read()
+        try:
+            chat_id = chat_of(json.loads(body))
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+        try:
+            handles[ring.node(chat_id)].inbox.put_nowait((chat_id, body))
+        except queue.Full:
+            # Telegram повторить доставку пізніше
+            app["stats"]["rejected"] += 1
+            return web.Response(status=503)
+        app["stats"]["accepted"] += 1
+        return web.Response()
+
+    async def healthz(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", **app["stats"], "workers": [h.status() for h in handles]})
+
+    async def readyz(request: web.Request) -> web.Response:
+        ready = all(
+            h.process.is_alive() and h.ready.is_set() and h.queued() < queue_size * 0.9 for h in handles
+        )
+        return web.json_response({"ready": ready}, status=200 if ready else 503)
+
+    async def supervise():
+        # впалий воркер перезапускаємо; його черга зберігається
+        while True:
+            await asyncio.sleep(WORKER_RESTART_INTERVAL)
+            for handle in handles:
+                if not handle.process.is_alive():
+                    print(f"⛔️ Webhook-воркер {handle.index} впав (код {handle.process.exitcode}), перезапуск")
+                    handle.restarts += 1
+                    handle.start()
+
+    async def on_startup(app: web.Application):
+        for handle in handles:
+            handle.start()
+        app["supervisor"] = asyncio.create_task(supervise())
+        if config.WEBHOOK_URL:
+            await _set_webhook(config.WEBHOOK_URL.rstrip("/") + path, secret)
+
+    async def on_cleanup(app: web.Application):
+        app["supervisor"].cancel()
+        for handle in handles:
+            handle.inbox.put(None)
+        loop = asyncio.get_running_loop()
+        for handle in handles:
+            await loop.run_in_executor(None, handle.process.join, 30)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+    app.router.add_post(path, receive)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+async def _set_webhook(url: str, secret: str | None):
+    from aiogram import Bot
+
+    bot = Bot(token=config.BOT_TOKEN)
+    try:
+        await bot.set_webhook(url, secret_token=secret)
+        print(f"✅ Webhook встановлено: {url}")
+    finally:
+        await bot.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=config.WEBHOOK_WORKERS)
+    parser.add_argument("--host", default=config.WEBHOOK_HOST)
+    parser.add_argument("--port", type=int, default=config.WEBHOOK_PORT)
+    parser.add_argument("--factory", default="bot.main:webhook_worker")
+    args = parser.parse_args()
+
+    app = create_app(workers=args.workers, factory_path=args.factory)
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,9 @@
 import asyncio
 from bot.main import main as bot_main
-from bot.database.database import engine, Base
-
-
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
 
 async def run():
-    await init_db()
+    # схему перевіряє bot.main.background_services (ensure_schema: відбиток замість create_all + upgrade на кожному старті)
     await bot_main()
 
 